@@ -1,26 +1,123 @@
 import asyncio
 import logging
 import os
-from typing import Dict, Any, Optional
-from dotenv import load_dotenv # type: ignore
+import re
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, fields, replace
+from enum import IntFlag
+from typing import Dict, Any, List, Optional, Tuple
 from portia import Config, Portia, DefaultToolRegistry, LogLevel # type: ignore
 
-import config
-from tools.ai_tools_portia import ai_manager
+from config import get_config
+from tools.ai_tools_portia import ensure_gemini_configured, get_ai_manager
 from tools.weaviate_tools_portia import weaviate_manager
 from tools.discord_tools_portia import discord_manager, TriageClarification
-from tools.github_tools_portia import github_manager
+from tools.github_tools_portia import TriageAction, github_manager
 
-load_dotenv()
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+_app_config = get_config()
+
+# Gemini SDK config and os.environ are process-global, so set them up once
+# no matter how many agents are constructed
+_GLOBALS_CONFIGURED = False
+_GLOBALS_LOCK = threading.Lock()
+
+def _ensure_globals_configured() -> None:
+    global _GLOBALS_CONFIGURED
+    if _GLOBALS_CONFIGURED:
+        return
+    with _GLOBALS_LOCK:
+        if _GLOBALS_CONFIGURED:
+            return
+        if _app_config.gemini_api_key:
+            ensure_gemini_configured()
+        if _app_config.portia_api_key:
+            os.environ["PORTIA_API_KEY"] = _app_config.portia_api_key
+        _GLOBALS_CONFIGURED = True
+
+_SEVERITY_EMOJI = {
+    "Critical": "🔴", "High": "🟠", "Medium": "🟡",
+    "Low": "🟢", "Info": "🔵"
+}
+
+_SUMMARY_TEMPLATE = """## {emoji} AI Triage Analysis
+
+**Severity Classification:** {severity_label}
+
+**Analysis Summary:**
+{summary}
+
+**Recommended Actions:**
+- Issue has been classified as **{severity_label}** priority
+- Appropriate severity label has been applied
+- Issue details have been recorded in the knowledge base
+
+*This analysis was generated by AI and approved by a human triager.*"""
+
+# Per-service limits on in-flight calls. They are acquired inside the worker
+# threads that run the blocking SDK calls, and the legacy Flask path runs each
+# webhook on its own event loop, so these are thread primitives rather than
+# asyncio ones. Gemini calls are limited inside tools.ai_tools_portia.
+_GITHUB_SEM = threading.BoundedSemaphore(_app_config.github_max_concurrency)
+_WEAVIATE_SEM = threading.BoundedSemaphore(_app_config.weaviate_max_concurrency)
+
+# Markdown noise stripped from issue bodies before embedding
+_CODE_BLOCK = re.compile(r'```.*?```', re.DOTALL)
+_HTML_COMMENT = re.compile(r'<!--.*?-->', re.DOTALL)
+_MD_LINK = re.compile(r'\[([^\]]+)\]\([^)]+\)')
+
+# Below this many characters of title + body a semantic match is meaningless
+_MIN_DUPLICATE_TEXT_LEN = 32
+
+# Triages in progress keyed by (repository, issue number). Webhooks normally
+# share the bot's loop, but the legacy Flask path gives each one its own thread
+# and loop, so use thread-safe futures that any loop can wait on.
+_INFLIGHT: Dict[Tuple[str, int], Future] = {}
+_INFLIGHT_LOCK = threading.Lock()
+
+# Background completion notifications. The send blocks on Discord, and on the
+# Flask path the webhook's loop is torn down as soon as triage returns.
+_NOTIFY_EXECUTOR = ThreadPoolExecutor(max_workers=4, thread_name_prefix="triage-notify")
+
+
+async def _call_limited(semaphore, func, *args, **kwargs):
+    """Run a blocking SDK call in a worker thread, bounded by the service's concurrency limit."""
+    def _run():
+        with semaphore:
+            return func(*args, **kwargs)
+    return await asyncio.to_thread(_run)
+
+
+class Action(IntFlag):
+    """Actions taken on an issue; the lowercase names are the public result keys."""
+    COMMENT_POSTED = 1
+    DUPLICATE_LABEL_ADDED = 2
+    ISSUE_CLOSED = 4
+    SEVERITY_LABEL_ADDED = 8
+    SUMMARY_POSTED = 16
+    ADDED_TO_KNOWLEDGE_BASE = 32
+    REJECTED = 64
+    TIMED_OUT = 128
+
 
 class TriageState:
+    __slots__ = (
+        'issue_id', 'issue_title', 'issue_body', 'issue_body_clean', 'issue_url', 'repository',
+        'severity', 'ai_summary', 'is_duplicate', 'similarity_score',
+        'duplicate_issue_id', 'issue_embedding', 'proposed_comment', 'human_decision',
+        'actions_executed', 'errors', 'completion_message_sent'
+    )
+    
     def __init__(self, issue_data: Dict[str, Any]):
         self.issue_id = issue_data.get('number', 0)
         self.issue_title = issue_data.get('title', 'Unknown')
-        self.issue_body = issue_data.get('body', '')
+        self.issue_body = issue_data.get('body') or ''
+        # Code blocks, template comments and link targets only add noise to
+        # embeddings, so strip them once here
+        self.issue_body_clean = _MD_LINK.sub(r'\1', _HTML_COMMENT.sub('', _CODE_BLOCK.sub('', self.issue_body))).strip()
         self.issue_url = issue_data.get('html_url', '')
         self.repository = issue_data.get('repository', {}).get('full_name', 'unknown/repo')
         self.severity: Optional[str] = None
@@ -28,12 +125,46 @@ class TriageState:
         self.is_duplicate: bool = False
         self.similarity_score: Optional[float] = None
         self.duplicate_issue_id: Optional[int] = None
+        # Kept from duplicate detection so the knowledge-base insert reuses it
+        self.issue_embedding: Optional[List[float]] = None
         self.proposed_comment: Optional[str] = None
         self.human_decision: Optional[Dict[str, Any]] = None
-        self.actions_executed: Dict[str, bool] = {}
+        self.actions_executed: Action = Action(0)
+        self.errors: List[str] = []
         self.completion_message_sent: bool = False
 
 
+@dataclass(slots=True)
+class TriageResult:
+    """Outcome of a triage run; `to_dict()` gives the JSON shape returned to callers."""
+    success: bool
+    issue_number: Optional[int] = None
+    severity: Optional[str] = None
+    ai_summary: Optional[str] = None
+    is_duplicate: bool = False
+    similarity_score: Optional[float] = None
+    human_decision: Optional[Dict[str, Any]] = None
+    actions_executed: Action = Action(0)
+    action_error: Optional[str] = None
+    error: Optional[str] = None
+    skipped: bool = False
+    reason: Optional[str] = None
+    webhook_action: Optional[str] = None
+    
+    def to_dict(self) -> Dict[str, Any]:
+        result = {}
+        for field in fields(self):
+            value = getattr(self, field.name)
+            if value is not None and field.name not in ('actions_executed', 'action_error'):
+                result[field.name] = value
+        if self.success and not self.skipped:
+            actions: Dict[str, Any] = {a.name.lower(): True for a in Action if self.actions_executed & a}
+            if self.action_error:
+                actions["error"] = self.action_error
+            result['actions_executed'] = actions
+        return result
+
+
 class SophisticatedTriageAgent:
     def __init__(self):
         self.portia = None
@@ -41,14 +172,7 @@ class SophisticatedTriageAgent:
     
     def _setup_portia(self):
         try:
-            # Set the API key for Gemini
-            if config.GEMINI_API_KEY:
-                import google.generativeai as genai # type: ignore
-                genai.configure(api_key=config.GEMINI_API_KEY)
-            
-            if config.PORTIA_API_KEY:
-                os.environ["PORTIA_API_KEY"] = config.PORTIA_API_KEY
-            
+            _ensure_globals_configured()
             portia_config = Config.from_default(default_log_level=LogLevel.INFO)
             self.portia = Portia(
                 config=portia_config,
@@ -56,67 +180,77 @@ class SophisticatedTriageAgent:
             )
             logger.info("Portia agent initialized")
         except Exception as e:
-            logger.error(f"Portia setup failed: {e}")
+            logger.error("Portia setup failed: %s", e)
             self.portia = None
 
-    async def triage_new_issue(self, issue_data: Dict[str, Any]) -> Dict[str, Any]:
+    async def triage_new_issue(self, issue_data: Dict[str, Any]) -> TriageResult:
         state = TriageState(issue_data)
-        logger.info(f"Starting triage for issue #{state.issue_id}: {state.issue_title}")
+        # Duplicate search only needs the title and body, so start it before
+        # anything else; it touches disjoint fields on state from AI analysis
+        dup_task = asyncio.create_task(self._perform_duplicate_detection(state))
+        logger.info("Starting triage for issue #%s: %s", state.issue_id, state.issue_title)
         
         try:
             await self._perform_ai_analysis(state)
-            await self._perform_duplicate_detection(state)
+            await dup_task
             await self._request_human_clarification(state)
             await self._execute_decision(state)
-            await self._send_completion_notification(state)
+            # The completion message is best-effort, so don't hold the webhook
+            # response for the Discord round trip. On the Flask path asyncio.run()
+            # cancels pending tasks when triage returns, so hand it to a thread
+            # pool instead of an event-loop task.
+            _NOTIFY_EXECUTOR.submit(self._send_completion_notification, state)
             
-            return {
-                'success': True,
-                'issue_number': state.issue_id,
-                'severity': state.severity,
-                'ai_summary': state.ai_summary,
-                'is_duplicate': state.is_duplicate,
-                'similarity_score': state.similarity_score,
-                'human_decision': state.human_decision,
-                'actions_executed': state.actions_executed,
-                'completion_notification_sent': state.completion_message_sent
-            }
+            return TriageResult(
+                success=True,
+                issue_number=state.issue_id,
+                severity=state.severity,
+                ai_summary=state.ai_summary,
+                is_duplicate=state.is_duplicate,
+                similarity_score=state.similarity_score,
+                human_decision=state.human_decision,
+                actions_executed=state.actions_executed,
+                action_error=state.errors[-1] if state.errors else None
+            )
         except Exception as e:
-            logger.error(f"Triage failed for issue #{state.issue_id}: {e}")
-            return {
-                'success': False,
-                'issue_number': state.issue_id,
-                'error': str(e)
-            }
+            logger.error("Triage failed for issue #%s: %s", state.issue_id, e)
+            dup_task.cancel()
+            return TriageResult(success=False, issue_number=state.issue_id, error=str(e))
     
     async def _perform_ai_analysis(self, state: TriageState):
+        # AIManager.analyze_all memoizes complete Gemini results, so repeats of
+        # the same issue are served from its cache
         try:
-            state.severity = ai_manager.classify_severity(state.issue_title, state.issue_body)
-            logger.info(f"AI Severity Classification: {state.severity}")
-            state.ai_summary = ai_manager.summarize_issue(state.issue_title, state.issue_body)
-            logger.info(f"AI Summary generated: {state.ai_summary[:100]}...")
+            state.severity, state.ai_summary = await get_ai_manager().analyze_issue(state.issue_title, state.issue_body)
+            logger.info("AI Severity Classification: %s", state.severity)
+            logger.info("AI Summary generated: %.100s...", state.ai_summary)
         except Exception as e:
-            logger.error(f"AI analysis failed: {e}")
+            logger.error("AI analysis failed: %s", e)
             state.severity = "Medium"
             state.ai_summary = f"Issue: {state.issue_title}"
 
     async def _perform_duplicate_detection(self, state: TriageState):
+        body = state.issue_body_clean
+        if not body or len(f"{state.issue_title} {body}".strip()) < _MIN_DUPLICATE_TEXT_LEN:
+            logger.info("Skipping duplicate check for issue #%s: too short", state.issue_id)
+            return
+        
         try:
-            duplicate_id, similarity_score = weaviate_manager.find_duplicate(
-                state.issue_title, state.issue_body, threshold=0.85
+            duplicate_id, similarity_score, state.issue_embedding = await _call_limited(
+                _WEAVIATE_SEM, weaviate_manager.find_duplicate_with_embedding, state.issue_title, body, threshold=0.85
             )
             if duplicate_id and similarity_score:
                 state.is_duplicate = True
                 state.similarity_score = similarity_score
                 state.duplicate_issue_id = duplicate_id
-                state.proposed_comment = ai_manager.draft_duplicate_comment(
+                state.proposed_comment = get_ai_manager().draft_duplicate_comment(
                     duplicate_id, similarity_score
                 )
-                logger.warning(f"Duplicate detected: #{duplicate_id} (Similarity: {similarity_score:.1%})")
+                logger.warning("Duplicate detected: #%s (Similarity: %.3f)", duplicate_id, similarity_score)
             else:
                 logger.info("No duplicates found")
         except Exception as e:
-            logger.error(f"Duplicate detection failed: {e}")
+            logger.error("Duplicate detection failed: %s", e)
             state.is_duplicate = False
 
     async def _request_human_clarification(self, state: TriageState):
@@ -132,86 +266,96 @@ class SophisticatedTriageAgent:
                 duplicate_issue_id=state.duplicate_issue_id
             )
             state.human_decision = await discord_manager.send_triage_request(clarification)
-            logger.info(f"👤 Human decision received: {state.human_decision.get('decision')}")
+            logger.info("👤 Human decision received: %s", state.human_decision.get('decision'))
         except Exception as e:
-            logger.error(f"Human clarification failed: {e}")
+            logger.error("Human clarification failed: %s", e)
             raise Exception(f"Human clarification required but failed: {e}")
 
     async def _execute_decision(self, state: TriageState):
         decision = state.human_decision.get("decision")
         modified_data = state.human_decision.get("data", {})
         if decision == "approve":
-            logger.info(f"Executing approved plan for issue #{state.issue_id}")
+            logger.info("Executing approved plan for issue #%s", state.issue_id)
             comment = modified_data.get("comment", state.proposed_comment)
             
             if state.is_duplicate:
                 try:
-                    success = github_manager.post_comment(state.issue_id, comment)
-                    state.actions_executed["comment_posted"] = success
-                    success = github_manager.add_label(state.issue_id, "duplicate")
-                    state.actions_executed["duplicate_label_added"] = success
-                    success = github_manager.close_issue(state.issue_id, "duplicate")
-                    state.actions_executed["issue_closed"] = success
+                    # Comment, label and close go to GitHub as one batched mutation
+                    results = await _call_limited(_GITHUB_SEM, github_manager.apply_triage_batch, [
+                        TriageAction("comment", state.issue_id, comment),
+                        TriageAction("label", state.issue_id, "duplicate"),
+                        TriageAction("close", state.issue_id, "duplicate"),
+                    ])
+                    self._record_actions(
+                        state, (Action.COMMENT_POSTED, Action.DUPLICATE_LABEL_ADDED, Action.ISSUE_CLOSED), results
+                    )
                 except Exception as e:
-                    logger.error(f"Error executing duplicate actions: {e}")
-                    state.actions_executed["error"] = str(e)
+                    logger.error("Error executing duplicate actions: %s", e)
+                    state.errors.append(str(e))
             else:
                 severity_label = modified_data.get("severity", state.severity)
                 summary = modified_data.get("summary", state.ai_summary)
                 
                 try:
-                    success = github_manager.add_label(state.issue_id, severity_label)
-                    state.actions_executed["severity_label_added"] = success
-                    
-                    severity_emoji = {
-                        "Critical": "🔴", "High": "🟠", "Medium": "🟡",
-                        "Low": "🟢", "Info": "🔵"
-                    }.get(severity_label, "📋")
-                    
-                    summary_comment = f"""## {severity_emoji} AI Triage Analysis
-
-**Severity Classification:** {severity_label}
-
-**Analysis Summary:**
-{summary}
-
-**Recommended Actions:**
-- Issue has been classified as **{severity_label}** priority
-- Appropriate severity label has been applied
-- Issue details have been recorded in the knowledge base
-
-*This analysis was generated by AI and approved by a human triager.*"""
+                    summary_comment = _SUMMARY_TEMPLATE.format(
+                        emoji=_SEVERITY_EMOJI.get(severity_label, "📋"),
+                        severity_label=severity_label,
+                        summary=summary
+                    )
                     
-                    success = github_manager.post_comment(state.issue_id, summary_comment)
-                    state.actions_executed["summary_posted"] = success
-                    
-                    # Add to Weaviate now that it's confirmed not a duplicate
-                    weaviate_manager.add_issue(state.issue_id, state.issue_title, state.issue_body)
-                    state.actions_executed["added_to_knowledge_base"] = True
+                    # The GitHub label and comment go as one batched mutation, alongside
+                    # the knowledge-base insert (now that it's confirmed not a duplicate)
+                    github_results, kb_result = await asyncio.gather(
+                        _call_limited(_GITHUB_SEM, github_manager.apply_triage_batch, [
+                            TriageAction("label", state.issue_id, severity_label),
+                            TriageAction("comment", state.issue_id, summary_comment),
+                        ]),
+                        _call_limited(_WEAVIATE_SEM, weaviate_manager.add_issue, state.issue_id, state.issue_title, state.issue_body_clean,
+                                      embedding=state.issue_embedding),
+                        return_exceptions=True
+                    )
+                    if isinstance(github_results, Exception):
+                        github_results = [github_results, github_results]
+                    results = [*github_results, kb_result]
+                    self._record_actions(
+                        state, (Action.SEVERITY_LABEL_ADDED, Action.SUMMARY_POSTED, Action.ADDED_TO_KNOWLEDGE_BASE), results
+                    )
                     
                 except Exception as e:
-                    logger.error(f"Error executing new issue actions: {e}")
-                    state.actions_executed["error"] = str(e)
+                    logger.error("Error executing new issue actions: %s", e)
+                    state.errors.append(str(e))
                     
         elif decision == "reject":
-            logger.info(f"Plan rejected for issue #{state.issue_id}. No actions taken.")
-            state.actions_executed["rejected"] = True
+            logger.info("Plan rejected for issue #%s. No actions taken.", state.issue_id)
+            state.actions_executed |= Action.REJECTED
             
         elif decision == "timeout":
-            logger.warning(f"⏰ Action timed out for issue #{state.issue_id}. No actions taken.")
-            state.actions_executed["timed_out"] = True
+            logger.warning("⏰ Action timed out for issue #%s. No actions taken.", state.issue_id)
+            state.actions_executed |= Action.TIMED_OUT
+    
+    @staticmethod
+    def _record_actions(state: TriageState, actions, results):
+        """Record the outcome of concurrently executed actions on the state."""
+        for action, result in zip(actions, results):
+            if isinstance(result, Exception):
+                logger.error("Action '%s' failed for issue #%s: %s", action.name.lower(), state.issue_id, result)
+                state.errors.append(str(result))
+            elif result is not False:
+                # add_issue returns None on success
+                state.actions_executed |= action
     
-    async def _send_completion_notification(self, state: TriageState):
-        """Phase 5: Send completion notification with audit trail."""
+    def _send_completion_notification(self, state: TriageState):
+        """Phase 5: Send completion notification with audit trail (runs in the background)."""
         try:
             approver_name = "Discord User"  # In real implementation, get from Discord interaction
             
             # Create action summary
-            executed_actions = [k for k, v in state.actions_executed.items() if v]
-            action_summary = f"Issue #{state.issue_id} processed: " + ", ".join(executed_actions)
+            action_summary = f"Issue #{state.issue_id} processed: " + ", ".join(
+                a.name.lower() for a in Action if state.actions_executed & a
+            )
             
             # Send completion message
-            success = discord_manager.send_completion_message(
+            success = discord_manager.send_completion_message_sync(
                 channel_id="general",  # Would use actual channel ID
                 original_message_id=f"triage-{state.issue_id}",
                 approver_name=approver_name,
@@ -221,43 +365,80 @@ class SophisticatedTriageAgent:
             state.completion_message_sent = success
             
             if success:
-                logger.info(f"📬 Completion notification sent for issue #{state.issue_id}")
+                logger.info("📬 Completion notification sent for issue #%s", state.issue_id)
             
         except Exception as e:
-            logger.error(f"Failed to send completion notification: {e}")
+            logger.error("Failed to send completion notification: %s", e)
 
 
 _sophisticated_agent = None
 
+def _warmup() -> None:
+    """Open one connection per external service so the first triage skips the handshakes."""
+    probes = {}
+    model = get_ai_manager().model
+    if model:
+        probes["Gemini"] = lambda: model.count_tokens("x")
+    if weaviate_manager.client:
+        probes["Weaviate"] = weaviate_manager.client.is_ready
+    if github_manager.github_client:
+        probes["GitHub"] = github_manager.github_client.get_rate_limit
+    
+    with ThreadPoolExecutor(max_workers=max(1, len(probes)), thread_name_prefix="triage-warmup") as pool:
+        futures = {name: pool.submit(probe) for name, probe in probes.items()}
+    for name, future in futures.items():
+        error = future.exception()
+        if error:
+            logger.warning("Warmup for %s failed: %s", name, error)
+    logger.info("Warmed up connections: %s", ", ".join(probes) or "none")
+
 def get_agent():
     global _sophisticated_agent
     if _sophisticated_agent is None:
         _sophisticated_agent = SophisticatedTriageAgent()
+        # The warmup probes are blocking SDK calls and get_agent may run before
+        # any event loop, so warm the connection pools from a background thread
+        threading.Thread(target=_warmup, name="triage-warmup", daemon=True).start()
     return _sophisticated_agent
 
-async def process_webhook(webhook_data: Dict[str, Any]) -> Dict[str, Any]:
+async def process_webhook(webhook_data: Dict[str, Any]) -> TriageResult:
     try:
         action = webhook_data.get('action', '')
         if action != 'opened':
-            return {
-                'success': True,
-                'skipped': True,
-                'reason': f'Only processing "opened" issues, got: {action}'
-            }
+            return TriageResult(
+                success=True,
+                skipped=True,
+                reason=f'Only processing "opened" issues, got: {action}'
+            )
         
         issue_data = webhook_data.get('issue', {})
-        agent = get_agent()
-        result = await agent.triage_new_issue(issue_data)
-        result['webhook_action'] = action
+        result = await triage_issue(issue_data)
+        result.webhook_action = action
         return result
     except Exception as e:
-        logger.error(f"Webhook processing failed: {e}")
-        return {
-            'success': False,
-            'error': str(e),
-            'webhook_processed': False
-        }
-
-async def triage_issue(issue_data: Dict[str, Any]) -> Dict[str, Any]:
-    agent = get_agent()
-    return await agent.triage_new_issue(issue_data)
+        logger.error("Webhook processing failed: %s", e)
+        return TriageResult(success=False, error=str(e))
+
+async def triage_issue(issue_data: Dict[str, Any]) -> TriageResult:
+    # GitHub redelivers webhooks on timeout; let a concurrent delivery for the
+    # same issue share the running triage instead of posting twice
+    key = (issue_data.get('repository_url', ''), issue_data.get('number', 0))
+    with _INFLIGHT_LOCK:
+        inflight = _INFLIGHT.get(key)
+        if inflight is None:
+            future: Future = Future()
+            _INFLIGHT[key] = future
+    if inflight is not None:
+        logger.info("Triage already in progress for issue #%s, awaiting its result", key[1])
+        return replace(await asyncio.wrap_future(inflight))
+    
+    try:
+        result = await get_agent().triage_new_issue(issue_data)
+        future.set_result(result)
+        return result
+    except BaseException as e:
+        future.set_exception(e)
+        raise
+    finally:
+        with _INFLIGHT_LOCK:
+            del _INFLIGHT[key]
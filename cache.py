@@ -0,0 +1,394 @@
+"""
+In-process caching helpers for Support-Triage Ninja.
+Provides a thread-safe LRU cache with per-entry TTL, cosine-similarity
+vector caches (in-memory and SQLite-backed), an in-memory nearest-neighbour
+index of recent embeddings, and content hashing.
+"""
+import functools
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+try:
+    import sqlite_vec
+    SQLITE_VEC_AVAILABLE = True
+except ImportError:
+    SQLITE_VEC_AVAILABLE = False
+
+try:
+    import simsimd
+    SIMSIMD_AVAILABLE = True
+except ImportError:
+    SIMSIMD_AVAILABLE = False
+
+try:
+    import numba
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Above this many rows NumPy's BLAS matvec beats the Numba loop
+_NUMBA_MAX_ROWS = 4096
+
+if NUMBA_AVAILABLE:
+    @functools.lru_cache(maxsize=None)
+    def _int8_cosine_kernel(dim: int):
+        """
+        Return a kernel scoring a float32 query against int8 rows of width dim.
+        
+        dim is a closure constant, so Numba compiles the inner loop with a
+        fixed trip count that LLVM can fully unroll and vectorize. The
+        explicit signature compiles it here, when the index is built, rather
+        than on the first lookup.
+        """
+        @numba.njit("float32[::1](float32[::1], int8[:, ::1], float32[::1], float32)",
+                    fastmath=True, boundscheck=False)
+        def _int8_cosine(query, matrix, norms, query_norm):
+            n = matrix.shape[0]
+            sims = np.empty(n, dtype=np.float32)
+            for i in range(n):
+                dot = np.float32(0.0)
+                for j in range(dim):
+                    dot += query[j] * np.float32(matrix[i, j])
+                sims[i] = dot / (norms[i] * query_norm)
+            return sims
+        return _int8_cosine
+
+
+def content_hash(*parts: str) -> str:
+    """Return a stable SHA-256 hex digest for the given text parts."""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update((part or "").encode("utf-8"))
+        digest.update(b"\x00")
+    return digest.hexdigest()
+
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries expire after `ttl` seconds."""
+
+    def __init__(self, maxsize: int = 4096, ttl: float = 86400.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value for key, or None on a miss or expired entry."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Store value under key, evicting the least recently used entry if full."""
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + self.ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop all cached entries."""
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class VectorCache:
+    """
+    Thread-safe LRU cache of (embedding -> value) entries.
+    
+    Lookups return the value of the most similar cached embedding when its
+    cosine similarity reaches the requested threshold. Embeddings are stored
+    L2-normalized, so a lookup's cosine scan is a single matrix-vector product.
+    """
+
+    def __init__(self, max_entries: int = 10_000, dim: int = 768):
+        self.max_entries = max_entries
+        self.dim = dim
+        self.hits = 0
+        self.misses = 0
+        self._size = 0
+        self._tick = 0
+        self._matrix = np.zeros((0, dim), dtype=np.float32)
+        self._last_used = np.zeros(0, dtype=np.int64)
+        self._values: List[Any] = []
+        self._lock = threading.Lock()
+
+    def lookup(self, vector: Sequence[float], threshold: float) -> Optional[Any]:
+        """Return the value of the closest cached vector if similarity >= threshold."""
+        query = np.asarray(vector, dtype=np.float32)
+        query_norm = float(np.linalg.norm(query))
+        with self._lock:
+            if self._size == 0 or query_norm == 0.0:
+                self.misses += 1
+                return None
+            sims = self._matrix[:self._size] @ (query / query_norm)
+            best = int(np.argmax(sims))
+            if sims[best] < threshold:
+                self.misses += 1
+                return None
+            self._tick += 1
+            self._last_used[best] = self._tick
+            self.hits += 1
+            return self._values[best]
+
+    def add(self, vector: Sequence[float], value: Any) -> None:
+        """Insert a vector, evicting the least recently used entry when full."""
+        if self.max_entries <= 0:
+            return
+        row = np.asarray(vector, dtype=np.float32)
+        norm = float(np.linalg.norm(row))
+        if norm == 0.0:
+            return
+        row = row / norm
+        with self._lock:
+            self._tick += 1
+            if self._size < self.max_entries:
+                index = self._size
+                if index == len(self._matrix):
+                    self._grow()
+                self._values.append(value)
+                self._size += 1
+            else:
+                index = int(np.argmin(self._last_used[:self._size]))
+                self._values[index] = value
+            self._matrix[index] = row
+            self._last_used[index] = self._tick
+
+    def clear(self) -> None:
+        """Drop all cached entries."""
+        with self._lock:
+            self._size = 0
+            self._values.clear()
+
+    def _grow(self) -> None:
+        """Double the backing arrays (capped at max_entries)."""
+        capacity = min(self.max_entries, max(64, len(self._matrix) * 2))
+        matrix = np.zeros((capacity, self.dim), dtype=np.float32)
+        last_used = np.zeros(capacity, dtype=np.int64)
+        matrix[:self._size] = self._matrix[:self._size]
+        last_used[:self._size] = self._last_used[:self._size]
+        self._matrix, self._last_used = matrix, last_used
+
+    def __len__(self) -> int:
+        return self._size
+
+
+class VectorIndex:
+    """
+    Thread-safe fixed-capacity index of (embedding, id) pairs.
+    
+    Embeddings are stored as int8 with a per-vector scale (SQ8), a quarter of
+    the float32 footprint; cosine similarity is scale-invariant, so the
+    scales cancel and only the int8 rows are scanned. `nearest` returns the
+    id and cosine similarity of the closest stored embedding, using SimSIMD's
+    int8 cosine kernel when installed, then a Numba-compiled loop for small
+    indexes, and a NumPy matrix-vector product otherwise. When full, the
+    oldest entry is overwritten.
+    """
+
+    def __init__(self, capacity: int = 2048, dim: int = 768):
+        self.capacity = capacity
+        self.dim = dim
+        self._size = 0
+        self._next = 0
+        self._matrix = np.zeros((capacity, dim), dtype=np.int8)
+        self._norms = np.zeros(capacity, dtype=np.float32)
+        self._ids: List[Any] = [None] * capacity
+        self._kernel = _int8_cosine_kernel(dim) if NUMBA_AVAILABLE else None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _quantize(vector: np.ndarray) -> Optional[np.ndarray]:
+        """Scale a vector so its largest component is +/-127 and round to int8."""
+        peak = float(np.max(np.abs(vector)))
+        if peak == 0.0:
+            return None
+        return np.round(vector * (127.0 / peak)).astype(np.int8)
+
+    def add(self, vector: Sequence[float], item_id: Any) -> None:
+        """Insert an embedding, replacing the oldest one when full."""
+        row = self._quantize(np.asarray(vector, dtype=np.float32))
+        if row is None or self.capacity == 0:
+            return
+        norm = float(np.linalg.norm(row.astype(np.float32)))
+        with self._lock:
+            index = self._next
+            self._matrix[index] = row
+            self._norms[index] = norm
+            self._ids[index] = item_id
+            self._next = (index + 1) % self.capacity
+            self._size = min(self._size + 1, self.capacity)
+
+    def nearest(self, vector: Sequence[float]) -> Optional[Tuple[Any, float]]:
+        """Return (id, cosine similarity) of the closest stored embedding, or None if empty."""
+        query = np.ascontiguousarray(vector, dtype=np.float32)
+        query_norm = float(np.linalg.norm(query))
+        with self._lock:
+            if self._size == 0 or query_norm == 0.0:
+                return None
+            n = self._size
+            if SIMSIMD_AVAILABLE:
+                sims = 1.0 - np.asarray(simsimd.cdist(self._quantize(query)[None, :], self._matrix[:n], metric="cosine"))[0]
+            elif self._kernel is not None and n < _NUMBA_MAX_ROWS:
+                sims = self._kernel(query, self._matrix[:n], self._norms[:n], np.float32(query_norm))
+            else:
+                sims = (self._matrix[:n].astype(np.float32) @ query) / (self._norms[:n] * query_norm)
+            best = int(np.argmax(sims))
+            return self._ids[best], float(sims[best])
+
+    def clear(self) -> None:
+        """Drop all entries."""
+        with self._lock:
+            self._size = 0
+            self._next = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+
+class SQLiteVectorCache:
+    """
+    SQLite-backed (embedding -> value) cache shared across processes.
+    
+    Uses a sqlite-vec `vec0` table for nearest-neighbour lookups when the
+    extension is installed, otherwise falls back to a brute-force cosine scan.
+    Values must be JSON-serialisable. `generation` is bumped on every clear so
+    in-memory caches layered on top can tell when to drop their entries. At
+    most `max_entries` rows are kept; the oldest are deleted on insert.
+    """
+
+    def __init__(self, path: str, dim: int = 768, max_entries: int = 10_000):
+        self.dim = dim
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA busy_timeout=5000")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache_meta ("
+            "rowid INTEGER PRIMARY KEY, embedding BLOB NOT NULL, value TEXT NOT NULL, ts REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache_generation (id INTEGER PRIMARY KEY CHECK (id = 0), generation INTEGER NOT NULL)"
+        )
+        self._conn.execute("INSERT OR IGNORE INTO cache_generation (id, generation) VALUES (0, 0)")
+        self.use_vec = False
+        if SQLITE_VEC_AVAILABLE:
+            try:
+                self._conn.enable_load_extension(True)
+                sqlite_vec.load(self._conn)
+                self._conn.enable_load_extension(False)
+                self._conn.execute(
+                    f"CREATE VIRTUAL TABLE IF NOT EXISTS triage_cache "
+                    f"USING vec0(embedding float[{dim}] distance_metric=cosine)"
+                )
+                self.use_vec = True
+            except (AttributeError, sqlite3.Error) as e:
+                logger.warning(f"sqlite-vec unavailable, using brute-force cache lookups: {e}")
+
+    def generation(self) -> int:
+        """Return the current cache generation."""
+        with self._lock:
+            row = self._conn.execute("SELECT generation FROM cache_generation WHERE id = 0").fetchone()
+        return row[0] if row else 0
+
+    def lookup(self, vector: Sequence[float], threshold: float) -> Optional[Any]:
+        """Return the value of the closest stored vector if similarity >= threshold."""
+        query = np.asarray(vector, dtype=np.float32)
+        query_norm = float(np.linalg.norm(query))
+        if query_norm == 0.0:
+            return None
+        with self._lock:
+            if self.use_vec:
+                nearest = self._conn.execute(
+                    "SELECT rowid, distance FROM triage_cache WHERE embedding MATCH ? ORDER BY distance LIMIT 1",
+                    (query.tobytes(),),
+                ).fetchone()
+                if nearest is None or 1.0 - nearest[1] < threshold:
+                    return None
+                row = self._conn.execute("SELECT value FROM cache_meta WHERE rowid = ?", (nearest[0],)).fetchone()
+                return json.loads(row[0]) if row else None
+
+            rows = self._conn.execute("SELECT embedding, value FROM cache_meta").fetchall()
+        if not rows:
+            return None
+        matrix = np.frombuffer(b"".join(r[0] for r in rows), dtype=np.float32).reshape(len(rows), self.dim)
+        sims = (matrix @ query) / (np.linalg.norm(matrix, axis=1) * query_norm)
+        best = int(np.argmax(sims))
+        if sims[best] < threshold:
+            return None
+        return json.loads(rows[best][1])
+
+    def add(self, vector: Sequence[float], value: Any) -> None:
+        """Persist a vector and its value, deleting the oldest rows beyond max_entries."""
+        row = np.asarray(vector, dtype=np.float32)
+        if self.max_entries <= 0 or float(np.linalg.norm(row)) == 0.0:
+            return
+        blob = row.tobytes()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                cursor = self._conn.execute(
+                    "INSERT INTO cache_meta (embedding, value, ts) VALUES (?, ?, ?)",
+                    (blob, json.dumps(value), time.time()),
+                )
+                if self.use_vec:
+                    self._conn.execute(
+                        "INSERT INTO triage_cache (rowid, embedding) VALUES (?, ?)",
+                        (cursor.lastrowid, blob),
+                    )
+                excess = self._conn.execute("SELECT COUNT(*) FROM cache_meta").fetchone()[0] - self.max_entries
+                if excess > 0:
+                    stale = self._conn.execute(
+                        "SELECT rowid FROM cache_meta ORDER BY ts, rowid LIMIT ?", (excess,)
+                    ).fetchall()
+                    self._conn.executemany("DELETE FROM cache_meta WHERE rowid = ?", stale)
+                    if self.use_vec:
+                        self._conn.executemany("DELETE FROM triage_cache WHERE rowid = ?", stale)
+                self._conn.execute("COMMIT")
+            except sqlite3.Error:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def clear(self) -> None:
+        """Drop all stored entries and bump the generation."""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute("DELETE FROM cache_meta")
+                if self.use_vec:
+                    self._conn.execute("DELETE FROM triage_cache")
+                self._conn.execute("UPDATE cache_generation SET generation = generation + 1 WHERE id = 0")
+                self._conn.execute("COMMIT")
+            except sqlite3.Error:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM cache_meta").fetchone()[0]
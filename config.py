@@ -3,40 +3,133 @@ Configuration module for Support-Triage Ninja.
 Loads environment variables and provides them as constants.
 Built for AgentHack 2025 with Portia AI framework.
 """
+import functools
 import os
+from dataclasses import dataclass
 from typing import Optional
 from dotenv import load_dotenv
 
-# Load environment variables from .env file
-load_dotenv()
+
+@dataclass(slots=True, frozen=True)
+class AppConfig:
+    """Immutable snapshot of the environment-driven configuration."""
+    # Portia AI Configuration
+    portia_api_key: str
+    # Google Gemini Configuration
+    gemini_api_key: str
+    # GitHub Configuration
+    github_repo: str
+    github_token: str
+    # Discord Configuration
+    discord_bot_token: str
+    discord_channel_id: str
+    discord_webhook_url: str
+    # Weaviate Vector Database Configuration
+    weaviate_url: str
+    weaviate_api_key: str
+    weaviate_index_type: str
+    # Webhook Security
+    webhook_secret: str
+    github_webhook_secret: str
+    # Caching Configuration
+    ai_cache_maxsize: int
+    ai_cache_ttl: float
+    duplicate_cache_max_entries: int
+    duplicate_cache_threshold: float
+    duplicate_cache_db: str
+    duplicate_index_max_entries: int
+    decision_store_db: str
+    # Outbound API Limits
+    gemini_max_concurrency: int
+    gemini_requests_per_minute: int
+    github_max_concurrency: int
+    weaviate_max_concurrency: int
+    # Flask Configuration
+    flask_host: str
+    flask_port: int
+    flask_debug: bool
+
+
+@functools.cache
+def get_config() -> AppConfig:
+    """Load the .env file once and return the process-wide configuration."""
+    load_dotenv()
+    return AppConfig(
+        portia_api_key=os.getenv("PORTIA_API_KEY", ""),
+        gemini_api_key=os.getenv("GEMINI_API_KEY", ""),
+        github_repo=os.getenv("GITHUB_REPO", ""),
+        github_token=os.getenv("GITHUB_TOKEN", ""),
+        discord_bot_token=os.getenv("DISCORD_BOT_TOKEN", ""),
+        discord_channel_id=os.getenv("DISCORD_CHANNEL_ID", ""),
+        discord_webhook_url=os.getenv("DISCORD_WEBHOOK_URL", ""),
+        weaviate_url=os.getenv("WEAVIATE_URL", ""),
+        weaviate_api_key=os.getenv("WEAVIATE_API_KEY", ""),
+        weaviate_index_type=os.getenv("WEAVIATE_INDEX_TYPE", "hnsw").lower(),
+        webhook_secret=os.getenv("WEBHOOK_SECRET", ""),
+        github_webhook_secret=os.getenv("GITHUB_WEBHOOK_SECRET", ""),
+        ai_cache_maxsize=int(os.getenv("AI_CACHE_MAXSIZE", "4096")),
+        ai_cache_ttl=float(os.getenv("AI_CACHE_TTL", "86400")),
+        duplicate_cache_max_entries=int(os.getenv("DUPLICATE_CACHE_MAX_ENTRIES", "10000")),
+        duplicate_cache_threshold=float(os.getenv("DUPLICATE_CACHE_THRESHOLD", "0.86")),
+        duplicate_cache_db=os.getenv("DUPLICATE_CACHE_DB", "triage_cache.db"),
+        duplicate_index_max_entries=int(os.getenv("DUPLICATE_INDEX_MAX_ENTRIES", "2048")),
+        decision_store_db=os.getenv("DECISION_STORE_DB", "triage_decisions.db"),
+        gemini_max_concurrency=int(os.getenv("GEMINI_MAX_CONCURRENCY", "8")),
+        gemini_requests_per_minute=int(os.getenv("GEMINI_REQUESTS_PER_MINUTE", "60")),
+        github_max_concurrency=int(os.getenv("GITHUB_MAX_CONCURRENCY", "16")),
+        weaviate_max_concurrency=int(os.getenv("WEAVIATE_MAX_CONCURRENCY", "32")),
+        flask_host=os.getenv("FLASK_HOST", "0.0.0.0"),
+        flask_port=int(os.getenv("FLASK_PORT", "5000")),
+        flask_debug=os.getenv("FLASK_DEBUG", "False").lower() == "true",
+    )
+
+
+# Module-level constants kept for existing `config.NAME` call sites
+_app_config = get_config()
 
 # Portia AI Configuration
-PORTIA_API_KEY: str = os.getenv("PORTIA_API_KEY", "")
+PORTIA_API_KEY: str = _app_config.portia_api_key
 
 # Google Gemini Configuration
-GEMINI_API_KEY: str = os.getenv("GEMINI_API_KEY", "")
+GEMINI_API_KEY: str = _app_config.gemini_api_key
 
 # GitHub Configuration
-GITHUB_REPO: str = os.getenv("GITHUB_REPO", "")
-GITHUB_TOKEN: str = os.getenv("GITHUB_TOKEN", "")
+GITHUB_REPO: str = _app_config.github_repo
+GITHUB_TOKEN: str = _app_config.github_token
 
 # Discord Configuration
-DISCORD_BOT_TOKEN: str = os.getenv("DISCORD_BOT_TOKEN", "")
-DISCORD_CHANNEL_ID: str = os.getenv("DISCORD_CHANNEL_ID", "")
-DISCORD_WEBHOOK_URL: str = os.getenv("DISCORD_WEBHOOK_URL", "")
+DISCORD_BOT_TOKEN: str = _app_config.discord_bot_token
+DISCORD_CHANNEL_ID: str = _app_config.discord_channel_id
+DISCORD_WEBHOOK_URL: str = _app_config.discord_webhook_url
 
 # Weaviate Vector Database Configuration  
-WEAVIATE_URL: str = os.getenv("WEAVIATE_URL", "")
-WEAVIATE_API_KEY: str = os.getenv("WEAVIATE_API_KEY", "")
+WEAVIATE_URL: str = _app_config.weaviate_url
+WEAVIATE_API_KEY: str = _app_config.weaviate_api_key
+WEAVIATE_INDEX_TYPE: str = _app_config.weaviate_index_type
 
 # Webhook Security
-WEBHOOK_SECRET: str = os.getenv("WEBHOOK_SECRET", "")
-GITHUB_WEBHOOK_SECRET: str = os.getenv("GITHUB_WEBHOOK_SECRET", "")
+WEBHOOK_SECRET: str = _app_config.webhook_secret
+GITHUB_WEBHOOK_SECRET: str = _app_config.github_webhook_secret
+
+# Caching Configuration
+AI_CACHE_MAXSIZE: int = _app_config.ai_cache_maxsize
+AI_CACHE_TTL: float = _app_config.ai_cache_ttl
+DUPLICATE_CACHE_MAX_ENTRIES: int = _app_config.duplicate_cache_max_entries
+DUPLICATE_CACHE_THRESHOLD: float = _app_config.duplicate_cache_threshold
+DUPLICATE_CACHE_DB: str = _app_config.duplicate_cache_db
+DUPLICATE_INDEX_MAX_ENTRIES: int = _app_config.duplicate_index_max_entries
+DECISION_STORE_DB: str = _app_config.decision_store_db
+
+# Outbound API Limits
+GEMINI_MAX_CONCURRENCY: int = _app_config.gemini_max_concurrency
+GEMINI_REQUESTS_PER_MINUTE: int = _app_config.gemini_requests_per_minute
+GITHUB_MAX_CONCURRENCY: int = _app_config.github_max_concurrency
+WEAVIATE_MAX_CONCURRENCY: int = _app_config.weaviate_max_concurrency
 
 # Flask Configuration
-FLASK_HOST: str = os.getenv("FLASK_HOST", "0.0.0.0")
-FLASK_PORT: int = int(os.getenv("FLASK_PORT", "5000"))
-FLASK_DEBUG: bool = os.getenv("FLASK_DEBUG", "False").lower() == "true"
+FLASK_HOST: str = _app_config.flask_host
+FLASK_PORT: int = _app_config.flask_port
+FLASK_DEBUG: bool = _app_config.flask_debug
 
 def validate_config() -> None:
     """Validate that all required environment variables are set."""
@@ -69,9 +162,6 @@ class Config:
     
     def __init__(self):
         """Initialize configuration from environment variables."""
-        # Load environment variables from .env file
-        load_dotenv()
-        
         # Store all config as instance variables
         self.PORTIA_API_KEY = PORTIA_API_KEY
         self.GEMINI_API_KEY = GEMINI_API_KEY
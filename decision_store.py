@@ -0,0 +1,95 @@
+"""
+Durable store for pending Discord triage decisions.
+Keeps outstanding triage requests and their recorded decisions in SQLite so
+they survive bot restarts.
+"""
+import json
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, NamedTuple, Optional
+
+
+class PendingDecision(NamedTuple):
+    issue_number: int
+    issue_title: str
+    severity: str
+    ai_text: str
+    is_duplicate: bool
+    channel_id: Optional[int]
+    message_id: Optional[int]
+    expires_at: float
+    decision: Optional[Dict[str, Any]]
+
+
+class DecisionStore:
+    """Thread-safe SQLite table of triage requests awaiting a human decision."""
+
+    def __init__(self, path: str):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA busy_timeout=5000")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS pending ("
+            "issue_number INTEGER PRIMARY KEY, issue_title TEXT NOT NULL, severity TEXT NOT NULL, "
+            "ai_text TEXT NOT NULL, is_duplicate INTEGER NOT NULL, channel_id INTEGER, message_id INTEGER, "
+            "expires_at REAL NOT NULL, decision TEXT)"
+        )
+
+    def add_pending(self, issue_number: int, issue_title: str, severity: str, ai_text: str,
+                    is_duplicate: bool, expires_at: float) -> None:
+        """Record a triage request before its message is sent."""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO pending "
+                "(issue_number, issue_title, severity, ai_text, is_duplicate, expires_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (issue_number, issue_title, severity, ai_text, int(is_duplicate), expires_at),
+            )
+
+    def set_message(self, issue_number: int, channel_id: int, message_id: int) -> None:
+        """Attach the sent Discord message to a pending request."""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE pending SET channel_id = ?, message_id = ? WHERE issue_number = ?",
+                (channel_id, message_id, issue_number),
+            )
+
+    def record_decision(self, issue_number: int, decision: Dict[str, Any]) -> None:
+        """Store the human decision so it isn't lost if nothing is waiting for it."""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE pending SET decision = ? WHERE issue_number = ?",
+                (json.dumps(decision), issue_number),
+            )
+
+    def get(self, issue_number: int) -> Optional[PendingDecision]:
+        """Return the stored request for an issue, if any."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM pending WHERE issue_number = ?", (issue_number,)
+            ).fetchone()
+        return self._to_pending(row) if row else None
+
+    def pending(self) -> List[PendingDecision]:
+        """Return undecided requests that haven't expired, purging expired ones."""
+        with self._lock:
+            self._conn.execute("DELETE FROM pending WHERE expires_at < ?", (time.time(),))
+            rows = self._conn.execute(
+                "SELECT * FROM pending WHERE decision IS NULL AND message_id IS NOT NULL"
+            ).fetchall()
+        return [self._to_pending(row) for row in rows]
+
+    def delete(self, issue_number: int) -> None:
+        """Forget a request once its decision has been consumed."""
+        with self._lock:
+            self._conn.execute("DELETE FROM pending WHERE issue_number = ?", (issue_number,))
+
+    @staticmethod
+    def _to_pending(row) -> PendingDecision:
+        (issue_number, issue_title, severity, ai_text, is_duplicate,
+         channel_id, message_id, expires_at, decision) = row
+        return PendingDecision(
+            issue_number, issue_title, severity, ai_text, bool(is_duplicate),
+            channel_id, message_id, expires_at, json.loads(decision) if decision else None,
+        )
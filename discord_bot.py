@@ -1,11 +1,18 @@
 import asyncio
+import functools
 import logging
-from typing import Dict, Any
+import threading
+import time
+from typing import Dict, Any, Optional, Tuple
 
 import discord
 from discord.ext import commands
+from dotenv import load_dotenv
 
 import config
+from decision_store import DecisionStore
+from rate_limit import RateLimiter
+from severity import IMPACT_LEVEL, SEVERITY_COLORS, SEVERITY_DESCRIPTIONS, SEVERITY_OPTIONS
 from tools.github_tools_portia import github_manager
 
 logging.basicConfig(level=logging.INFO)
@@ -17,42 +24,100 @@ intents.members = False
 intents.presences = False
 bot = commands.Bot(command_prefix='!', intents=intents)
 
-pending_decisions: Dict[str, asyncio.Future] = {}
+pending_decisions: Dict[int, asyncio.Future] = {}
+
+# Outstanding requests and decisions, persisted so a restart doesn't drop them
+decision_store = DecisionStore(config.DECISION_STORE_DB)
+DECISION_TIMEOUT = 3600.0  # 1 hour
+
+# Read once; call refresh_config() to pick up a changed .env without a restart
+CHANNEL_ID: int = int(config.DISCORD_CHANNEL_ID or 0)
+_config_lock = threading.Lock()
+
+
+def refresh_config() -> None:
+    """Re-read the Discord channel ID from the environment and .env file."""
+    global CHANNEL_ID
+    with _config_lock:
+        load_dotenv(override=True)
+        config.get_config.cache_clear()
+        CHANNEL_ID = int(config.get_config().discord_channel_id or 0)
+    logger.info("Reloaded Discord configuration (channel %s)", CHANNEL_ID)
+
+
+# Discord embed limits (characters)
+EMBED_TITLE_LIMIT = 256
+EMBED_DESCRIPTION_LIMIT = 4096
+EMBED_FIELD_NAME_LIMIT = 256
+EMBED_FIELD_VALUE_LIMIT = 1024
+EMBED_FOOTER_LIMIT = 2048
+EMBED_TOTAL_LIMIT = 6000
+
+
+def _truncate(text: str, limit: int) -> str:
+    """Cut text to at most `limit` characters, marking the cut with an ellipsis."""
+    if len(text) <= limit:
+        return text
+    return text[:max(limit - 1, 0)] + "…"
+
+
+def _embed_length(data: Dict[str, Any]) -> int:
+    """Count the characters Discord charges against the total embed limit."""
+    return (
+        len(data.get("title", ""))
+        + len(data.get("description", ""))
+        + sum(len(f["name"]) + len(f["value"]) for f in data.get("fields", ()))
+        + len(data.get("footer", {}).get("text", ""))
+    )
+
+
+def _fit_embed(data: Dict[str, Any], flexible_field: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Clamp an embed dict to Discord's documented limits so sending it can't fail with a 400.
+    
+    Each part is cut to its own limit first; if the total is still too long the
+    `flexible_field` value is shrunk to fit.
+    """
+    before = _embed_length(data)
+    if "title" in data:
+        data["title"] = _truncate(data["title"], EMBED_TITLE_LIMIT)
+    if "description" in data:
+        data["description"] = _truncate(data["description"], EMBED_DESCRIPTION_LIMIT)
+    for field in data.get("fields", ()):
+        field["name"] = _truncate(field["name"], EMBED_FIELD_NAME_LIMIT)
+        field["value"] = _truncate(field["value"], EMBED_FIELD_VALUE_LIMIT)
+    if "footer" in data:
+        data["footer"]["text"] = _truncate(data["footer"]["text"], EMBED_FOOTER_LIMIT)
+    
+    overflow = _embed_length(data) - EMBED_TOTAL_LIMIT
+    fields = data.get("fields", [])
+    if overflow > 0 and flexible_field is not None and flexible_field < len(fields):
+        value = fields[flexible_field]["value"]
+        fields[flexible_field]["value"] = _truncate(value, max(len(value) - overflow, 1))
+    
+    after = _embed_length(data)
+    if after != before:
+        logger.warning("Truncated embed '%s' from %d to %d characters", data.get('title'), before, after)
+    return data
+
+
+@functools.lru_cache(maxsize=None)
+def _severity_select_options(current_severity: str) -> Tuple[discord.SelectOption, ...]:
+    """Build the severity options once per preselected severity."""
+    return tuple(
+        discord.SelectOption(
+            label=label,
+            description=description,
+            emoji=emoji,
+            default=(current_severity == label)
+        )
+        for label, description, emoji in SEVERITY_OPTIONS
+    )
+
 
 class SeveritySelect(discord.ui.Select):
     def __init__(self, current_severity: str):
-        options = [
-            discord.SelectOption(
-                label="Critical", 
-                description="System down, data loss, security vulnerability",
-                emoji="🔴",
-                default=(current_severity == "Critical")
-            ),
-            discord.SelectOption(
-                label="High", 
-                description="Major functionality broken, performance issues",
-                emoji="🟠",
-                default=(current_severity == "High")
-            ),
-            discord.SelectOption(
-                label="Medium", 
-                description="Minor bugs with workarounds, feature requests",
-                emoji="🟡",
-                default=(current_severity == "Medium")
-            ),
-            discord.SelectOption(
-                label="Low", 
-                description="Cosmetic issues, typos, documentation",
-                emoji="🟢",
-                default=(current_severity == "Low")
-            ),
-            discord.SelectOption(
-                label="Info", 
-                description="Questions, discussions, feedback",
-                emoji="🔵",
-                default=(current_severity == "Info")
-            )
-        ]
+        options = list(_severity_select_options(current_severity))
         super().__init__(placeholder="Select severity level...", options=options, row=0)
         self.selected_severity = current_severity
     
@@ -61,6 +126,26 @@ class SeveritySelect(discord.ui.Select):
         await interaction.response.defer()
 
 
+def _resolve_decision(issue_number: int, response: Dict[str, Any]) -> None:
+    """Record a human decision and hand it to the triage waiting on it, if any."""
+    decision_store.record_decision(issue_number, response)
+    future = pending_decisions.get(issue_number)
+    if future is not None and not future.done():
+        future.set_result(response)
+
+
+_SEVERITY_LABEL = "Severity Level"
+_SEVERITY_PLACEHOLDER = "Critical, High, Medium, Low, or Info"
+_SUMMARY_LABEL = "Summary"
+_COMMENT_LABEL = "Comment"
+
+# (label, placeholder) for the text input, indexed by is_duplicate
+_MODAL_TEXT = (
+    (_SUMMARY_LABEL, "Modify the AI-generated summary..."),
+    (_COMMENT_LABEL, "Modify the AI-generated comment..."),
+)
+
+
 class ModifyModal(discord.ui.Modal, title="Modify Triage Plan"):
     """Modal for modifying triage decisions."""
     
@@ -71,19 +156,19 @@ class ModifyModal(discord.ui.Modal, title="Modify Triage Plan"):
         
         # Severity input
         self.severity = discord.ui.TextInput(
-            label="Severity Level",
-            placeholder="Critical, High, Medium, Low, or Info",
+            label=_SEVERITY_LABEL,
+            placeholder=_SEVERITY_PLACEHOLDER,
             default=current_severity,
             max_length=20
         )
         self.add_item(self.severity)
         
         # Comment/summary input
-        label = "Comment" if is_duplicate else "Summary"
+        label, placeholder = _MODAL_TEXT[is_duplicate]
         self.text_content = discord.ui.TextInput(
             label=label,
             style=discord.TextStyle.paragraph,
-            placeholder=f"Modify the AI-generated {label.lower()}...",
+            placeholder=placeholder,
             default=current_text,
             max_length=2000
         )
@@ -103,10 +188,7 @@ class ModifyModal(discord.ui.Modal, title="Modify Triage Plan"):
             }
             
             # Find and resolve the pending decision
-            decision_key = f"issue_{self.issue_number}"
-            if decision_key in pending_decisions:
-                if not pending_decisions[decision_key].done():
-                    pending_decisions[decision_key].set_result(modified_data)
+            _resolve_decision(self.issue_number, modified_data)
             
             await interaction.response.send_message(
                 f"Modifications saved for Issue #{self.issue_number}! The agent will proceed with your changes.", 
@@ -114,286 +196,328 @@ class ModifyModal(discord.ui.Modal, title="Modify Triage Plan"):
             )
             
         except Exception as e:
-            logger.error(f"Error handling modal submission: {e}")
+            logger.error("Error handling modal submission: %s", e)
             await interaction.response.send_message(
                 f"Error processing modifications: {e}",
                 ephemeral=True
             )
 
 
-class TriageView(discord.ui.View):
-    """Interactive view with Approve/Reject/Modify buttons."""
+# (label, style, emoji) for each triage button action
+TRIAGE_BUTTONS = {
+    "approve": ("Approve", discord.ButtonStyle.success, "✅"),
+    "reject": ("Reject", discord.ButtonStyle.danger, "❌"),
+    "modify": ("Modify", discord.ButtonStyle.secondary, "✏️"),
+}
+
+
+class TriageButton(discord.ui.DynamicItem[discord.ui.Button],
+                   template=r"triage:(?P<issue_number>[0-9]+):(?P<action>approve|reject|modify)"):
+    """
+    Approve/Reject/Modify button whose only state is its custom_id.
     
-    def __init__(self, issue_number: int, issue_title: str, severity: str, ai_text: str, is_duplicate: bool):
-        super().__init__(timeout=3600.0)  # 1 hour timeout
+    Registered once with bot.add_dynamic_items, so clicks on messages sent
+    before a restart are still routed here; the rest of the triage request
+    is read from decision_store on click.
+    """
+    
+    def __init__(self, issue_number: int, action: str):
+        label, style, emoji = TRIAGE_BUTTONS[action]
+        super().__init__(discord.ui.Button(
+            label=label, style=style, emoji=emoji, custom_id=f"triage:{issue_number}:{action}"
+        ))
         self.issue_number = issue_number
-        self.issue_title = issue_title
-        self.severity = severity
-        self.ai_text = ai_text
-        self.is_duplicate = is_duplicate
+        self.action = action
     
-    @discord.ui.button(label="Approve", style=discord.ButtonStyle.success, emoji="✅")
-    async def approve_button(self, interaction: discord.Interaction, button: discord.ui.Button):
-        """Handle approve button click."""
-        try:
-            response_data = {"decision": "approve", "data": {}}
-            
-            # Find and resolve the pending decision
-            decision_key = f"issue_{self.issue_number}"
-            if decision_key in pending_decisions:
-                if not pending_decisions[decision_key].done():
-                    pending_decisions[decision_key].set_result(response_data)
-            
-            # Update the message
-            embed = discord.Embed(
-                title="✅ Approved",
-                description=f"Issue #{self.issue_number} approved by {interaction.user.mention}\n\nExecuting actions on GitHub...",
-                color=discord.Color.green()
-            )
-            
-            # Disable all buttons
-            for item in self.children:
-                item.disabled = True
-            
-            await interaction.response.edit_message(embed=embed, view=self)
-            
-        except Exception as e:
-            logger.error(f"Error handling approve button: {e}")
-            await interaction.response.send_message(f"❌ Error: {e}", ephemeral=True)
+    @classmethod
+    async def from_custom_id(cls, interaction: discord.Interaction, item: discord.ui.Button, match):
+        return cls(int(match["issue_number"]), match["action"])
     
-    @discord.ui.button(label="Reject", style=discord.ButtonStyle.danger, emoji="❌")
-    async def reject_button(self, interaction: discord.Interaction, button: discord.ui.Button):
-        """Handle reject button click."""
-        try:
-            response_data = {"decision": "reject", "data": {}}
-            
-            # Find and resolve the pending decision
-            decision_key = f"issue_{self.issue_number}"
-            if decision_key in pending_decisions:
-                if not pending_decisions[decision_key].done():
-                    pending_decisions[decision_key].set_result(response_data)
-            
-            # Update the message
-            embed = discord.Embed(
-                title="❌ Rejected",
-                description=f"Issue #{self.issue_number} rejected by {interaction.user.mention}\n\nNo actions will be taken.",
-                color=discord.Color.red()
+    async def callback(self, interaction: discord.Interaction):
+        request = decision_store.get(self.issue_number)
+        if request is None or request.decision is not None:
+            await interaction.response.send_message(
+                f"Issue #{self.issue_number} is no longer awaiting a decision.", ephemeral=True
             )
-            
-            # Disable all buttons
-            for item in self.children:
-                item.disabled = True
-            
-            await interaction.response.edit_message(embed=embed, view=self)
-            
-        except Exception as e:
-            logger.error(f"Error handling reject button: {e}")
-            await interaction.response.send_message(f"❌ Error: {e}", ephemeral=True)
+            return
+        
+        if self.action == "approve":
+            await self._resolve(
+                interaction, "✅ Approved",
+                f"Issue #{self.issue_number} approved by {interaction.user.mention}\n\nExecuting actions on GitHub...",
+                discord.Color.green()
+            )
+        elif self.action == "reject":
+            await self._resolve(
+                interaction, "❌ Rejected",
+                f"Issue #{self.issue_number} rejected by {interaction.user.mention}\n\nNo actions will be taken.",
+                discord.Color.red()
+            )
+        else:
+            try:
+                modal = ModifyModal(self.issue_number, request.severity, request.ai_text, request.is_duplicate)
+                await interaction.response.send_modal(modal)
+                
+            except Exception as e:
+                logger.error("Error showing modify modal: %s", e)
+                await interaction.response.send_message(f"❌ Error: {e}", ephemeral=True)
     
-    @discord.ui.button(label="Modify", style=discord.ButtonStyle.secondary, emoji="✏️")
-    async def modify_button(self, interaction: discord.Interaction, button: discord.ui.Button):
-        """Handle modify button click - show modal."""
+    async def _resolve(self, interaction: discord.Interaction, title: str, description: str, color: discord.Color):
+        """Resolve the pending decision and replace the buttons with the outcome."""
         try:
-            modal = ModifyModal(self.issue_number, self.severity, self.ai_text, self.is_duplicate)
-            await interaction.response.send_modal(modal)
+            _resolve_decision(self.issue_number, {"decision": self.action, "data": {}})
+            
+            embed = discord.Embed(title=title, description=description, color=color)
+            view = self.view
+            for item in view.children:
+                # DynamicItem wrappers hold the real Button in .item
+                getattr(item, "item", item).disabled = True
+            view.stop()
+            await interaction.response.edit_message(embed=embed, view=view)
             
         except Exception as e:
-            logger.error(f"Error showing modify modal: {e}")
+            logger.error("Error handling %s button: %s", self.action, e)
             await interaction.response.send_message(f"❌ Error: {e}", ephemeral=True)
+
+
+class TriageView(discord.ui.View):
+    """Interactive view with Approve/Reject/Modify buttons."""
     
-    async def on_timeout(self):
-        """Handle view timeout."""
+    def __init__(self, issue_number: int):
+        # No view timeout; send_triage_request enforces the 1 hour limit
+        super().__init__(timeout=None)
+        for action in TRIAGE_BUTTONS:
+            self.add_item(TriageButton(issue_number, action))
+
+
+# Triage messages are sent by a single worker on the bot loop so that bursts
+# of webhooks are paced instead of all hitting the channel at once. Each
+# message carries its own view, so embeds can't be merged into one message.
+_SEND_BATCH_SIZE = 10
+_SEND_SPACING = 0.2  # seconds between sends within a batch
+_send_queue: Optional[asyncio.Queue] = None
+_send_worker_task: Optional[asyncio.Task] = None
+
+# Stay under Discord's 5 messages / 5s per channel and 50 requests/s global limits
+_GLOBAL_SEND_RATE = RateLimiter(45, period=1.0)
+_channel_send_rates: Dict[int, RateLimiter] = {}
+_MAX_SEND_ATTEMPTS = 3
+
+
+async def _rate_limited(channel_id: int, call):
+    """Await call() within the channel and global send budgets, retrying on 429."""
+    limiter = _channel_send_rates.get(channel_id)
+    if limiter is None:
+        limiter = _channel_send_rates[channel_id] = RateLimiter(5, period=5.0)
+    for attempt in range(1, _MAX_SEND_ATTEMPTS + 1):
+        await limiter.acquire_async()
+        await _GLOBAL_SEND_RATE.acquire_async()
         try:
-            # Set timeout response
-            decision_key = f"issue_{self.issue_number}"
-            if decision_key in pending_decisions:
-                if not pending_decisions[decision_key].done():
-                    pending_decisions[decision_key].set_result({
-                        "decision": "timeout", 
-                        "data": {}
-                    })
-            
-            logger.warning(f"Triage action expired for issue #{self.issue_number}")
-            
-        except Exception as e:
-            logger.error(f"Error handling timeout: {e}")
+            return await call()
+        except discord.HTTPException as e:
+            if e.status != 429 or attempt == _MAX_SEND_ATTEMPTS:
+                raise
+            retry_after = float(e.response.headers.get("Retry-After", 1)) if e.response is not None else 1.0
+            logger.warning("Discord rate limited on channel %s, retrying in %.1fs", channel_id, retry_after + 1)
+            await asyncio.sleep(retry_after + 1)
+
+
+async def _send_worker(queue: asyncio.Queue):
+    """Drain queued sends in batches of up to _SEND_BATCH_SIZE."""
+    while True:
+        batch = [await queue.get()]
+        while len(batch) < _SEND_BATCH_SIZE and not queue.empty():
+            batch.append(queue.get_nowait())
+        
+        for index, (channel, kwargs, result) in enumerate(batch):
+            if index:
+                await asyncio.sleep(_SEND_SPACING)
+            if result.done():
+                continue
+            try:
+                result.set_result(await _rate_limited(channel.id, lambda: channel.send(**kwargs)))
+            except Exception as e:
+                result.set_exception(e)
+
+
+async def queue_send(channel, **kwargs) -> discord.Message:
+    """Queue channel.send(**kwargs) on the shared sender and return the message."""
+    global _send_queue, _send_worker_task
+    if _send_queue is None:
+        _send_queue = asyncio.Queue()
+        _send_worker_task = asyncio.create_task(_send_worker(_send_queue))
+    result = asyncio.get_running_loop().create_future()
+    await _send_queue.put((channel, kwargs, result))
+    return await result
 
 
 @bot.event
 async def on_ready():
     """Bot ready event."""
-    logger.info(f'Triage Discord Bot ready! Logged in as {bot.user}')
-    logger.info(f'Serving {len(bot.guilds)} servers')
+    logger.info("Triage Discord Bot ready! Logged in as %s", bot.user)
+    logger.info("Serving %d servers", len(bot.guilds))
+    
+    # Route button clicks by custom_id, including on messages sent before a restart
+    bot.add_dynamic_items(TriageButton)
+    logger.info("Open triage requests: %d", len(decision_store.pending()))
+
+
+def _build_triage_embed(issue_data: Dict[str, Any]) -> Tuple[discord.Embed, str]:
+    """Build the triage request embed and the AI text offered for editing."""
+    issue_number = issue_data.get('issue_number', 0)
+    # Extract data
+    issue_title = issue_data.get('issue_title', 'Unknown')
+    issue_body = issue_data.get('issue_body', '')
+    severity = issue_data.get('severity', 'Medium')
+    ai_summary = issue_data.get('ai_summary', '')
+    is_duplicate = issue_data.get('is_duplicate', False)
+    similarity_score = issue_data.get('similarity_score')
+    duplicate_issue_id = issue_data.get('duplicate_issue_id')
+
+    # Add duplicate or summary field with more details
+    if is_duplicate and similarity_score and duplicate_issue_id:
+        analysis = {
+            "name": "🔍 Duplicate Analysis",
+            "value": f"**Duplicate Found ({similarity_score:.1%} Similarity)**\n"
+                     f"Similar to Issue #{duplicate_issue_id}\n"
+                     f"💡 *Recommend closing as duplicate*",
+            "inline": False
+        }
+        ai_text = f"This issue appears to be a duplicate of #{duplicate_issue_id} with {similarity_score:.1%} similarity. Consider closing this issue and directing the user to the original issue for updates."
+    else:
+        analysis = {
+            "name": "📝 Detailed AI Analysis",
+            "value": ai_summary[:800] + ("..." if len(ai_summary) > 800 else ""),
+            "inline": False
+        }
+        ai_text = ai_summary
+
+    # Add recommended actions
+    if is_duplicate:
+        recommended_actions = "🔄 Close as duplicate\n📝 Add explanatory comment\n🔗 Link to original issue"
+    elif severity in ["Critical", "High"]:
+        recommended_actions = f"🏷️ Add '{severity}' severity label\n📝 Post AI analysis\n🔔 Notify relevant team\n📊 Track in knowledge base"
+    else:
+        recommended_actions = f"🏷️ Add '{severity}' severity label\n📝 Post AI analysis\n📊 Add to knowledge base"
+
+    # Build the embed in one go; the analysis field (index 2) is the one
+    # shortened if the embed runs over Discord's total limit
+    embed = discord.Embed.from_dict(_fit_embed({
+        "title": f"🥷 Triage Required: Issue #{issue_number}",
+        "description": f"**{issue_title}**\n{issue_body[:200] + ('...' if len(issue_body) > 200 else '')}",
+        "color": SEVERITY_COLORS.get(severity, discord.Color.blue()).value,
+        "fields": [
+            {
+                "name": "AI Severity Classification",
+                "value": f"**{severity}**\n{SEVERITY_DESCRIPTIONS.get(severity, '')}",
+                "inline": True
+            },
+            {
+                "name": "⚡ Impact Assessment",
+                "value": IMPACT_LEVEL.get(severity, "📋 Standard workflow"),
+                "inline": True
+            },
+            analysis,
+            {
+                "name": "Recommended Actions",
+                "value": recommended_actions,
+                "inline": False
+            }
+        ],
+        "footer": {"text": "⏱️ Action required within 1 hour • Built with Portia AI"}
+    }, flexible_field=2))
+    return embed, ai_text
 
 
 async def send_triage_request(issue_data: Dict[str, Any]) -> Dict[str, Any]:
     """Send interactive triage request and wait for human decision."""
-    # Initialize decision_key early to avoid UnboundLocalError
     issue_number = issue_data.get('issue_number', 0)
-    decision_key = f"issue_{issue_number}"
+    
+    # A decision clicked while no triage was waiting (e.g. across a restart)
+    stored = decision_store.get(issue_number)
+    if stored and stored.decision:
+        logger.info("Using recorded decision for issue #%s", issue_number)
+        decision_store.delete(issue_number)
+        return stored.decision
     
     try:
-        # Reload config to get latest values
-        import importlib
-        importlib.reload(config)
-        
-        channel_id = int(config.DISCORD_CHANNEL_ID)
-        logger.info(f"Looking for Discord channel: {channel_id}")
+        channel_id = CHANNEL_ID
+        logger.info("Looking for Discord channel: %s", channel_id)
         
         # Make sure bot is ready
         if not bot.is_ready():
             logger.warning("Bot is not ready, waiting...")
             await bot.wait_until_ready()
         
-        channel = bot.get_channel(channel_id)
+        # Fall back to a REST fetch when the channel isn't cached yet
+        try:
+            channel = bot.get_channel(channel_id) or await bot.fetch_channel(channel_id)
+        except (discord.NotFound, discord.Forbidden):
+            channel = None
         
         if not channel:
-            logger.error(f"Discord channel {channel_id} not found")
-            logger.info(f"Available channels:")
-            for guild in bot.guilds:
-                logger.info(f"  Guild: {guild.name}")
-                for ch in guild.text_channels:
-                    logger.info(f"    #{ch.name} (ID: {ch.id})")
+            logger.error("Discord channel %s not found", channel_id)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Available channels:")
+                for guild in bot.guilds:
+                    logger.debug("  Guild: %s", guild.name)
+                    for ch in guild.text_channels:
+                        logger.debug("    #%s (ID: %s)", ch.name, ch.id)
             # DO NOT AUTO-APPROVE - Raise error instead
             raise Exception(f"Discord channel {channel_id} not accessible - HUMAN INPUT REQUIRED")
         
-        # Extract data
-        issue_title = issue_data.get('issue_title', 'Unknown')
-        issue_body = issue_data.get('issue_body', '')
-        severity = issue_data.get('severity', 'Medium')
-        ai_summary = issue_data.get('ai_summary', '')
-        is_duplicate = issue_data.get('is_duplicate', False)
-        similarity_score = issue_data.get('similarity_score')
-        duplicate_issue_id = issue_data.get('duplicate_issue_id')
-        
-        # Create enhanced embed with more details
-        severity_colors = {
-            "Critical": discord.Color.red(),
-            "High": discord.Color.orange(),
-            "Medium": discord.Color.yellow(),
-            "Low": discord.Color.green(),
-            "Info": discord.Color.blue()
-        }
-        
-        embed = discord.Embed(
-            title=f"🥷 Triage Required: Issue #{issue_number}",
-            description=f"**{issue_title}**\n{issue_body[:200] + ('...' if len(issue_body) > 200 else '')}",
-            color=severity_colors.get(severity, discord.Color.blue())
-        )
-        
-        # Add severity with reasoning
-        severity_descriptions = {
-            "Critical": "🔴 System down, data loss, security vulnerability",
-            "High": "🟠 Major functionality broken, performance issues",
-            "Medium": "🟡 Minor bugs with workarounds, feature requests",
-            "Low": "🟢 Cosmetic issues, typos, documentation",
-            "Info": "🔵 Questions, discussions, feedback"
-        }
-        
-        embed.add_field(
-            name="AI Severity Classification",
-            value=f"**{severity}**\n{severity_descriptions.get(severity, '')}",
-            inline=True
-        )
-        
-        # Add impact assessment
-        impact_level = {
-            "Critical": "🔥 Immediate action required",
-            "High": "⚡ High priority - address soon",
-            "Medium": "📋 Standard workflow",
-            "Low": "📝 Low priority - can be scheduled",
-            "Info": "💬 Informational - review when convenient"
-        }.get(severity, "📋 Standard workflow")
+        # Register the future before sending so an immediate click can't be missed
+        decision = pending_decisions[issue_number] = asyncio.get_running_loop().create_future()
         
-        embed.add_field(
-            name="⚡ Impact Assessment",
-            value=impact_level,
-            inline=True
-        )
-        
-        # Add duplicate or summary field with more details
-        if is_duplicate and similarity_score and duplicate_issue_id:
-            embed.add_field(
-                name="🔍 Duplicate Analysis",
-                value=f"**Duplicate Found ({similarity_score:.1%} Similarity)**\n"
-                      f"Similar to Issue #{duplicate_issue_id}\n"
-                      f"💡 *Recommend closing as duplicate*",
-                inline=False
-            )
-            ai_text = f"This issue appears to be a duplicate of #{duplicate_issue_id} with {similarity_score:.1%} similarity. Consider closing this issue and directing the user to the original issue for updates."
+        if stored and stored.message_id and stored.expires_at > time.time():
+            # Still open from before a restart; TriageButton still routes its clicks
+            logger.info("Resuming triage request for issue #%s", issue_number)
+            message = channel.get_partial_message(stored.message_id)
+            expires_at = stored.expires_at
         else:
-            embed.add_field(
-                name="📝 Detailed AI Analysis",
-                value=ai_summary[:800] + ("..." if len(ai_summary) > 800 else ""),
-                inline=False
-            )
-            ai_text = ai_summary
+            embed, ai_text = _build_triage_embed(issue_data)
+            severity = issue_data.get('severity', 'Medium')
+            is_duplicate = issue_data.get('is_duplicate', False)
+            issue_title = issue_data.get('issue_title', 'Unknown')
             
-        # Add recommended actions
-        if is_duplicate:
-            recommended_actions = "🔄 Close as duplicate\n📝 Add explanatory comment\n🔗 Link to original issue"
-        elif severity in ["Critical", "High"]:
-            recommended_actions = f"🏷️ Add '{severity}' severity label\n📝 Post AI analysis\n🔔 Notify relevant team\n📊 Track in knowledge base"
-        else:
-            recommended_actions = f"🏷️ Add '{severity}' severity label\n📝 Post AI analysis\n📊 Add to knowledge base"
+            # Create view with buttons
+            view = TriageView(issue_number)
             
-        embed.add_field(
-            name="Recommended Actions",
-            value=recommended_actions,
-            inline=False
-        )
-        
-        embed.set_footer(text="⏱️ Action required within 1 hour • Built with Portia AI")
-        
-        # Create view with buttons
-        view = TriageView(issue_number, issue_title, severity, ai_text, is_duplicate)
-        
-        # Send message
-        message = await channel.send(embed=embed, view=view)
-        
-        # Create future for waiting for response
-        decision_key = f"issue_{issue_number}"
-        pending_decisions[decision_key] = asyncio.Future()
-        
-        logger.info(f"Sent interactive triage request for issue #{issue_number}")
-        
-        # Wait for human decision (with manual timeout handling)
-        start_time = asyncio.get_event_loop().time()
-        timeout_duration = 3700  # Just over 1 hour
+            # Persist before sending so a restart can pick the request back up
+            expires_at = time.time() + DECISION_TIMEOUT
+            decision_store.add_pending(issue_number, issue_title, severity, ai_text, is_duplicate, expires_at)
+            
+            # Send message
+            message = await queue_send(channel, embed=embed, view=view)
+            decision_store.set_message(issue_number, channel.id, message.id)
+            
+            logger.info("Sent interactive triage request for issue #%s", issue_number)
         
-        while True:
-            try:
-                # Check if the future is done
-                if pending_decisions[decision_key].done():
-                    response = pending_decisions[decision_key].result()
-                    break
-                    
-                # Check timeout manually
-                if asyncio.get_event_loop().time() - start_time > timeout_duration:
-                    logger.warning(f"Triage request timed out for issue #{issue_number}")
-                    return {"decision": "timeout", "data": {}}
-                
-                # Sleep briefly to avoid busy waiting
-                await asyncio.sleep(1)
-                
-            except Exception as e:
-                logger.error(f"Error while waiting for decision: {e}")
-                return {"decision": "timeout", "data": {}}
+        # Wait for human decision
+        try:
+            response = await asyncio.wait_for(decision, timeout=max(expires_at - time.time(), 0))
+        except asyncio.TimeoutError:
+            logger.warning("Triage action expired for issue #%s", issue_number)
+            decision_store.delete(issue_number)
+            return {"decision": "timeout", "data": {}}
+        decision_store.delete(issue_number)
         
         # Send completion message
-        await send_completion_message(channel, message.id, "Discord User", issue_number, response)
+        await send_completion_message(channel, message, "Discord User", issue_number, response)
         
         return response
         
     except Exception as e:
-        logger.error(f"Failed to send interactive triage request: {e}")
+        # Cancellation (bot shutdown) is deliberately not caught, so the
+        # stored request survives for the next start
+        decision_store.delete(issue_number)
+        logger.error("Failed to send interactive triage request: %s", e)
         # DO NOT AUTO-APPROVE - Re-raise the error instead
         raise Exception(f"Discord integration failed: {e} - HUMAN INPUT REQUIRED")
         
     finally:
         # Clean up
-        if decision_key in pending_decisions:
-            del pending_decisions[decision_key]
+        pending_decisions.pop(issue_number, None)
 
 
 async def send_completion_message(channel, original_message, approver_name: str, issue_number: int, response: Dict[str, Any]):
@@ -443,10 +567,10 @@ async def send_completion_message(channel, original_message, approver_name: str,
         embed.set_footer(text=f"Audit Trail • triage-{issue_number}")
         
         # Send as reply to original message
-        await original_message.reply(embed=embed)
+        await _rate_limited(original_message.channel.id, lambda: original_message.reply(embed=embed))
         
     except Exception as e:
-        logger.error(f"Failed to send completion message: {e}")
+        logger.error("Failed to send completion message: %s", e)
 
 
 # Function to start the bot
@@ -456,5 +580,11 @@ async def start_bot():
 
 
 if __name__ == "__main__":
+    try:
+        import uvloop
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    except ImportError:
+        pass
+    
     # Run the bot
     asyncio.run(start_bot())
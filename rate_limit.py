@@ -0,0 +1,45 @@
+"""
+Client-side rate limiting for Support-Triage Ninja.
+Keeps outbound API traffic under provider quotas instead of relying on 429 retries.
+"""
+import asyncio
+import threading
+import time
+
+
+class RateLimiter:
+    """Thread-safe token bucket allowing `rate` acquisitions per `period` seconds."""
+
+    def __init__(self, rate: int, period: float = 60.0):
+        self.capacity = float(rate)
+        self.fill_rate = rate / period
+        self._tokens = float(rate)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reserve(self) -> float:
+        """Take a token if available; otherwise return the seconds until one is."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.fill_rate)
+            self._updated = now
+            if self._tokens >= 1.0:
+                self._tokens -= 1.0
+                return 0.0
+            return (1.0 - self._tokens) / self.fill_rate
+
+    def acquire(self) -> None:
+        """Block until a token is available."""
+        while True:
+            wait = self._reserve()
+            if wait <= 0.0:
+                return
+            time.sleep(wait)
+
+    async def acquire_async(self) -> None:
+        """Wait without blocking the event loop until a token is available."""
+        while True:
+            wait = self._reserve()
+            if wait <= 0.0:
+                return
+            await asyncio.sleep(wait)
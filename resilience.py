@@ -0,0 +1,120 @@
+"""
+Failure handling for outbound API calls in Support-Triage Ninja.
+Provides a per-provider circuit breaker and bounded retries with jittered
+exponential backoff, so a failing service is skipped quickly instead of
+every caller waiting on it.
+"""
+import asyncio
+import logging
+import random
+import threading
+import time
+from typing import Any, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a service whose circuit is open."""
+
+
+class CircuitBreaker:
+    """
+    Thread-safe circuit breaker.
+
+    After `failure_threshold` consecutive failures the circuit opens and calls
+    fail fast with CircuitOpenError. Once `recovery_timeout` seconds pass, one
+    trial call is let through: success closes the circuit, failure reopens it.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = 5, recovery_timeout: float = 30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._trial_in_progress = False
+        self._lock = threading.Lock()
+
+    def before_call(self) -> None:
+        """Raise CircuitOpenError unless a call may go through now."""
+        with self._lock:
+            if self._opened_at is None:
+                return
+            if self._trial_in_progress or time.monotonic() - self._opened_at < self.recovery_timeout:
+                raise CircuitOpenError(f"{self.name} circuit is open")
+            self._trial_in_progress = True
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self._opened_at is not None:
+                logger.info(f"{self.name} circuit closed")
+            self._failures = 0
+            self._opened_at = None
+            self._trial_in_progress = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            self._trial_in_progress = False
+            if self._opened_at is not None or self._failures >= self.failure_threshold:
+                if self._opened_at is None:
+                    logger.warning(f"{self.name} circuit opened after {self._failures} failures")
+                self._opened_at = time.monotonic()
+
+
+def _backoff(attempt: int, base: float, max_backoff: float) -> float:
+    """Full-jitter exponential backoff for the given 1-based attempt."""
+    return random.uniform(0, min(max_backoff, base * 2 ** (attempt - 1)))
+
+
+def call_with_retry(breaker: CircuitBreaker, is_transient: Callable[[BaseException], bool],
+                    func: Callable[..., Any], *args, max_attempts: int = 4,
+                    base: float = 0.1, max_backoff: float = 5.0, **kwargs) -> Any:
+    """
+    Call func through the breaker, retrying transient errors with backoff.
+
+    Only errors for which is_transient returns True are retried or counted
+    against the breaker; others (bad requests, auth failures) are raised
+    immediately.
+    """
+    for attempt in range(1, max_attempts + 1):
+        breaker.before_call()
+        try:
+            result = func(*args, **kwargs)
+        except Exception as e:
+            if not is_transient(e):
+                breaker.record_success()
+                raise
+            breaker.record_failure()
+            if attempt == max_attempts:
+                raise
+            delay = _backoff(attempt, base, max_backoff)
+            logger.warning(f"{breaker.name} call failed ({e}), retry {attempt}/{max_attempts - 1} in {delay:.2f}s")
+            time.sleep(delay)
+        else:
+            breaker.record_success()
+            return result
+
+
+async def call_with_retry_async(breaker: CircuitBreaker, is_transient: Callable[[BaseException], bool],
+                                func: Callable[..., Any], *args, max_attempts: int = 4,
+                                base: float = 0.1, max_backoff: float = 5.0, **kwargs) -> Any:
+    """Coroutine version of call_with_retry; func must return an awaitable."""
+    for attempt in range(1, max_attempts + 1):
+        breaker.before_call()
+        try:
+            result = await func(*args, **kwargs)
+        except Exception as e:
+            if not is_transient(e):
+                breaker.record_success()
+                raise
+            breaker.record_failure()
+            if attempt == max_attempts:
+                raise
+            delay = _backoff(attempt, base, max_backoff)
+            logger.warning(f"{breaker.name} call failed ({e}), retry {attempt}/{max_attempts - 1} in {delay:.2f}s")
+            await asyncio.sleep(delay)
+        else:
+            breaker.record_success()
+            return result
@@ -0,0 +1,33 @@
+"""
+Severity levels for Support-Triage Ninja.
+Labels, descriptions, colours and impact text shared by the Discord bot and
+the Discord tools, so both render a severity the same way.
+"""
+import discord
+
+# (label, description, emoji) for each severity level
+SEVERITY_OPTIONS = (
+    ("Critical", "System down, data loss, security vulnerability", "🔴"),
+    ("High", "Major functionality broken, performance issues", "🟠"),
+    ("Medium", "Minor bugs with workarounds, feature requests", "🟡"),
+    ("Low", "Cosmetic issues, typos, documentation", "🟢"),
+    ("Info", "Questions, discussions, feedback", "🔵"),
+)
+
+SEVERITY_COLORS = {
+    "Critical": discord.Color.red(),
+    "High": discord.Color.orange(),
+    "Medium": discord.Color.yellow(),
+    "Low": discord.Color.green(),
+    "Info": discord.Color.blue()
+}
+
+SEVERITY_DESCRIPTIONS = {label: f"{emoji} {description}" for label, description, emoji in SEVERITY_OPTIONS}
+
+IMPACT_LEVEL = {
+    "Critical": "🔥 Immediate action required",
+    "High": "⚡ High priority - address soon",
+    "Medium": "📋 Standard workflow",
+    "Low": "📝 Low priority - can be scheduled",
+    "Info": "💬 Informational - review when convenient"
+}
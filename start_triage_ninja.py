@@ -1,8 +1,6 @@
 #!/usr/bin/env python3
 import asyncio
 import logging
-import threading
-import time
 
 logging.basicConfig(
     level=logging.INFO,
@@ -10,19 +8,49 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+def install_uvloop():
+    """Use uvloop's event loop when it's installed (not available on Windows)."""
+    try:
+        import uvloop
+    except ImportError:
+        return
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    logger.info("Using uvloop event loop")
+
 def run_webhook_server():
     logger.info("Starting webhook server...")
+    install_uvloop()
     try:
+        from aiohttp import web
+        import config
         import webhook_server
-        webhook_server.app.run(host='0.0.0.0', port=5000)
+        web.run_app(webhook_server.create_aiohttp_app(), host=config.FLASK_HOST, port=config.FLASK_PORT, print=None)
     except Exception as e:
         logger.error(f"Webhook server failed: {e}")
 
-def run_discord_bot():
+async def run_services():
+    """Serve webhooks and run the Discord bot on one event loop."""
+    from aiohttp import web
+    import config
+    import webhook_server
+    from discord_bot import start_bot
+    
+    runner = web.AppRunner(webhook_server.create_aiohttp_app())
+    await runner.setup()
+    site = web.TCPSite(runner, host=config.FLASK_HOST, port=config.FLASK_PORT)
+    await site.start()
+    logger.info(f"Webhook server started on http://localhost:{config.FLASK_PORT}")
+    
     logger.info("Starting Discord bot...")
     try:
-        from discord_bot import start_bot
-        asyncio.run(start_bot())
+        await start_bot()
+    finally:
+        await runner.cleanup()
+
+def run_discord_bot():
+    install_uvloop()
+    try:
+        asyncio.run(run_services())
     except Exception as e:
         logger.error(f"Discord bot failed: {e}")
 
@@ -42,12 +70,6 @@ def main():
     logger.info("Discord configuration found")
     logger.info("Starting both webhook server and Discord bot...")
     
-    webhook_thread = threading.Thread(target=run_webhook_server, daemon=True)
-    webhook_thread.start()
-    
-    time.sleep(2)
-    logger.info("Webhook server started on http://localhost:5000")
-    
     try:
         run_discord_bot()
     except KeyboardInterrupt:
@@ -0,0 +1,168 @@
+import numpy as np
+import pytest
+
+import cache
+from cache import SQLiteVectorCache, TTLCache, VectorCache, VectorIndex
+
+
+class FakeClock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(cache.time, "monotonic", fake)
+    return fake
+
+
+def _unit(dim: int, index: int) -> list:
+    vector = [0.0] * dim
+    vector[index] = 1.0
+    return vector
+
+
+# TTLCache
+
+def test_ttl_cache_evicts_least_recently_used():
+    c = TTLCache(maxsize=2, ttl=60)
+    c.set("a", 1)
+    c.set("b", 2)
+    assert c.get("a") == 1  # "b" is now least recently used
+    c.set("c", 3)
+    assert c.get("b") is None
+    assert c.get("a") == 1
+    assert c.get("c") == 3
+
+
+def test_ttl_cache_expires_entries(clock):
+    c = TTLCache(maxsize=4, ttl=10)
+    c.set("a", 1)
+    clock.now += 9
+    assert c.get("a") == 1
+    clock.now += 2
+    assert c.get("a") is None
+    assert (c.hits, c.misses) == (1, 1)
+
+
+# VectorCache
+
+def test_vector_cache_lookup_respects_threshold():
+    c = VectorCache(max_entries=4, dim=3)
+    c.add([1.0, 0.0, 0.0], "x")
+    assert c.lookup([2.0, 0.1, 0.0], 0.99) == "x"
+    assert c.lookup([0.0, 1.0, 0.0], 0.5) is None
+    assert c.lookup([0.0, 0.0, 0.0], 0.0) is None
+
+
+def test_vector_cache_evicts_least_recently_used():
+    c = VectorCache(max_entries=2, dim=3)
+    c.add(_unit(3, 0), "a")
+    c.add(_unit(3, 1), "b")
+    assert c.lookup(_unit(3, 0), 0.99) == "a"  # "b" is now least recently used
+    c.add(_unit(3, 2), "c")
+    assert len(c) == 2
+    assert c.lookup(_unit(3, 1), 0.99) is None
+    assert c.lookup(_unit(3, 0), 0.99) == "a"
+    assert c.lookup(_unit(3, 2), 0.99) == "c"
+
+
+def test_vector_cache_disabled_with_zero_entries():
+    c = VectorCache(max_entries=0, dim=3)
+    c.add(_unit(3, 0), "a")
+    assert len(c) == 0
+    assert c.lookup(_unit(3, 0), 0.5) is None
+
+
+# VectorIndex
+
+def _backends():
+    backends = ["numpy"]
+    if cache.NUMBA_AVAILABLE:
+        backends.append("numba")
+    if cache.SIMSIMD_AVAILABLE:
+        backends.append("simsimd")
+    return backends
+
+
+def _nearest_with(index: VectorIndex, query, backend: str, monkeypatch):
+    with monkeypatch.context() as m:
+        m.setattr(cache, "SIMSIMD_AVAILABLE", backend == "simsimd")
+        if backend == "numpy":
+            m.setattr(index, "_kernel", None)
+        return index.nearest(query)
+
+
+def test_vector_index_backends_agree(monkeypatch):
+    rng = np.random.default_rng(0)
+    dim = 64
+    index = VectorIndex(capacity=50, dim=dim)
+    vectors = rng.standard_normal((50, dim)).astype(np.float32)
+    for i, vector in enumerate(vectors):
+        index.add(vector, i)
+
+    for target in (3, 17, 42):
+        query = vectors[target] + 0.05 * rng.standard_normal(dim).astype(np.float32)
+        expected = float(query @ vectors[target] / (np.linalg.norm(query) * np.linalg.norm(vectors[target])))
+        results = {backend: _nearest_with(index, query, backend, monkeypatch) for backend in _backends()}
+        for backend, (item_id, similarity) in results.items():
+            assert item_id == target, backend
+            assert similarity == pytest.approx(expected, abs=0.02), backend
+
+
+def test_vector_index_overwrites_oldest_when_full():
+    index = VectorIndex(capacity=2, dim=3)
+    index.add(_unit(3, 0), "a")
+    index.add(_unit(3, 1), "b")
+    index.add(_unit(3, 2), "c")
+    assert len(index) == 2
+    assert index.nearest(_unit(3, 0))[0] != "a"
+    assert index.nearest(_unit(3, 2)) == ("c", pytest.approx(1.0))
+
+
+def test_vector_index_empty_and_zero_vectors():
+    index = VectorIndex(capacity=2, dim=3)
+    assert index.nearest(_unit(3, 0)) is None
+    index.add([0.0, 0.0, 0.0], "zero")
+    assert len(index) == 0
+    index.add(_unit(3, 0), "a")
+    index.clear()
+    assert index.nearest(_unit(3, 0)) is None
+
+
+# SQLiteVectorCache
+
+@pytest.fixture(params=["brute_force", "sqlite_vec"])
+def sqlite_cache(request, monkeypatch, tmp_path):
+    if request.param == "brute_force":
+        monkeypatch.setattr(cache, "SQLITE_VEC_AVAILABLE", False)
+    store = SQLiteVectorCache(str(tmp_path / "cache.db"), dim=3, max_entries=2)
+    if request.param == "sqlite_vec" and not store.use_vec:
+        pytest.skip("sqlite-vec can't be loaded here")
+    return store
+
+
+def test_sqlite_cache_lookup(sqlite_cache):
+    sqlite_cache.add([1.0, 0.0, 0.0], {"id": 1})
+    assert sqlite_cache.lookup([1.0, 0.05, 0.0], 0.99) == {"id": 1}
+    assert sqlite_cache.lookup([0.0, 1.0, 0.0], 0.5) is None
+
+
+def test_sqlite_cache_drops_oldest_beyond_max_entries(sqlite_cache):
+    for i in range(3):
+        sqlite_cache.add(_unit(3, i), i)
+    assert len(sqlite_cache) == 2
+    assert sqlite_cache.lookup(_unit(3, 0), 0.99) is None
+    assert sqlite_cache.lookup(_unit(3, 2), 0.99) == 2
+
+
+def test_sqlite_cache_clear_bumps_generation(sqlite_cache):
+    sqlite_cache.add(_unit(3, 0), 0)
+    generation = sqlite_cache.generation()
+    sqlite_cache.clear()
+    assert sqlite_cache.generation() == generation + 1
+    assert sqlite_cache.lookup(_unit(3, 0), 0.5) is None
@@ -0,0 +1,46 @@
+import time
+
+from decision_store import DecisionStore
+
+
+def _store(tmp_path) -> DecisionStore:
+    return DecisionStore(str(tmp_path / "decisions.db"))
+
+
+def test_pending_lists_sent_undecided_requests(tmp_path):
+    store = _store(tmp_path)
+    store.add_pending(1, "Crash", "High", "summary", False, time.time() + 60)
+    store.add_pending(2, "Not sent yet", "Low", "summary", True, time.time() + 60)
+    store.set_message(1, channel_id=10, message_id=20)
+
+    pending = store.pending()
+    assert [p.issue_number for p in pending] == [1]
+    assert (pending[0].channel_id, pending[0].message_id) == (10, 20)
+    assert pending[0].is_duplicate is False
+
+
+def test_recorded_decision_round_trips(tmp_path):
+    store = _store(tmp_path)
+    store.add_pending(1, "Crash", "High", "summary", False, time.time() + 60)
+    store.set_message(1, 10, 20)
+    store.record_decision(1, {"decision": "modify", "data": {"severity": "Low"}})
+
+    assert store.get(1).decision == {"decision": "modify", "data": {"severity": "Low"}}
+    assert store.pending() == []
+    store.delete(1)
+    assert store.get(1) is None
+
+
+def test_pending_purges_expired_requests(tmp_path):
+    store = _store(tmp_path)
+    store.add_pending(1, "Old", "High", "summary", False, time.time() - 1)
+    store.set_message(1, 10, 20)
+    assert store.pending() == []
+    assert store.get(1) is None
+
+
+def test_store_survives_reopen(tmp_path):
+    store = _store(tmp_path)
+    store.add_pending(1, "Crash", "High", "summary", False, time.time() + 60)
+    store.set_message(1, 10, 20)
+    assert [p.issue_number for p in _store(tmp_path).pending()] == [1]
@@ -0,0 +1,53 @@
+import pytest
+
+import rate_limit
+from rate_limit import RateLimiter
+
+
+class FakeClock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(rate_limit.time, "monotonic", fake)
+    monkeypatch.setattr(rate_limit.time, "sleep", fake.sleep)
+    return fake
+
+
+def test_bucket_allows_burst_up_to_capacity(clock):
+    limiter = RateLimiter(rate=3, period=60)
+    assert [limiter._reserve() for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert limiter._reserve() == pytest.approx(20.0)
+
+
+def test_bucket_refills_over_time(clock):
+    limiter = RateLimiter(rate=2, period=10)
+    limiter._reserve()
+    limiter._reserve()
+    clock.now += 5
+    assert limiter._reserve() == 0.0
+    assert limiter._reserve() == pytest.approx(5.0)
+
+
+def test_bucket_never_exceeds_capacity(clock):
+    limiter = RateLimiter(rate=2, period=10)
+    clock.now += 1000
+    assert [limiter._reserve() for _ in range(2)] == [0.0, 0.0]
+    assert limiter._reserve() > 0.0
+
+
+def test_acquire_waits_for_a_token(clock):
+    limiter = RateLimiter(rate=1, period=4)
+    limiter.acquire()
+    start = clock.now
+    limiter.acquire()
+    assert clock.now - start == pytest.approx(4.0)
@@ -0,0 +1,152 @@
+import asyncio
+
+import pytest
+
+import resilience
+from resilience import CircuitBreaker, CircuitOpenError, call_with_retry, call_with_retry_async
+
+
+class FakeClock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(resilience.time, "monotonic", fake)
+    return fake
+
+
+@pytest.fixture(autouse=True)
+def no_sleep(monkeypatch):
+    monkeypatch.setattr(resilience.time, "sleep", lambda seconds: None)
+
+    async def _sleep(seconds):
+        return None
+    monkeypatch.setattr(resilience.asyncio, "sleep", _sleep)
+
+
+class Transient(Exception):
+    pass
+
+
+def _is_transient(error: BaseException) -> bool:
+    return isinstance(error, Transient)
+
+
+def _open(breaker: CircuitBreaker) -> None:
+    for _ in range(breaker.failure_threshold):
+        breaker.before_call()
+        breaker.record_failure()
+
+
+def test_breaker_opens_after_threshold(clock):
+    breaker = CircuitBreaker("test", failure_threshold=3, recovery_timeout=30)
+    for _ in range(2):
+        breaker.before_call()
+        breaker.record_failure()
+    breaker.before_call()  # still closed
+    breaker.record_failure()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+
+def test_breaker_success_resets_failure_count(clock):
+    breaker = CircuitBreaker("test", failure_threshold=2, recovery_timeout=30)
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    breaker.before_call()  # one failure since the success, still closed
+
+
+def test_breaker_half_opens_for_one_trial_call(clock):
+    breaker = CircuitBreaker("test", failure_threshold=2, recovery_timeout=30)
+    _open(breaker)
+    clock.now += 29
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    clock.now += 2
+    breaker.before_call()  # the trial call
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()  # only one trial at a time
+
+
+def test_breaker_trial_success_closes(clock):
+    breaker = CircuitBreaker("test", failure_threshold=2, recovery_timeout=30)
+    _open(breaker)
+    clock.now += 31
+    breaker.before_call()
+    breaker.record_success()
+    breaker.before_call()
+    breaker.before_call()
+
+
+def test_breaker_trial_failure_reopens(clock):
+    breaker = CircuitBreaker("test", failure_threshold=2, recovery_timeout=30)
+    _open(breaker)
+    clock.now += 31
+    breaker.before_call()
+    breaker.record_failure()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    clock.now += 31
+    breaker.before_call()
+
+
+def test_call_with_retry_retries_transient_errors(clock):
+    breaker = CircuitBreaker("test", failure_threshold=10)
+    calls = []
+
+    def flaky():
+        calls.append(1)
+        if len(calls) < 3:
+            raise Transient()
+        return "ok"
+
+    assert call_with_retry(breaker, _is_transient, flaky, max_attempts=4) == "ok"
+    assert len(calls) == 3
+
+
+def test_call_with_retry_raises_permanent_errors_at_once(clock):
+    breaker = CircuitBreaker("test", failure_threshold=1)
+    calls = []
+
+    def broken():
+        calls.append(1)
+        raise ValueError("bad request")
+
+    with pytest.raises(ValueError):
+        call_with_retry(breaker, _is_transient, broken)
+    assert len(calls) == 1
+    breaker.before_call()  # permanent errors don't count against the breaker
+
+
+def test_call_with_retry_gives_up_after_max_attempts(clock):
+    breaker = CircuitBreaker("test", failure_threshold=10)
+    calls = []
+
+    def down():
+        calls.append(1)
+        raise Transient()
+
+    with pytest.raises(Transient):
+        call_with_retry(breaker, _is_transient, down, max_attempts=3)
+    assert len(calls) == 3
+
+
+def test_call_with_retry_async(clock):
+    breaker = CircuitBreaker("test", failure_threshold=10)
+    calls = []
+
+    async def flaky():
+        calls.append(1)
+        if len(calls) < 2:
+            raise Transient()
+        return "ok"
+
+    assert asyncio.run(call_with_retry_async(breaker, _is_transient, flaky)) == "ok"
+    assert len(calls) == 2
@@ -1,47 +1,131 @@
+import asyncio
+import functools
+import json
 import logging
+import random
+import re
+import threading
+import time
 from typing import Dict, Any, Tuple, Optional
 
 import google.generativeai as genai
+from google.api_core import exceptions as google_exceptions
 from portia import ToolRunContext
 from portia.tool import Tool
 from pydantic import BaseModel, Field
 
 import config
+from cache import TTLCache, content_hash
+from rate_limit import RateLimiter
 
 logger = logging.getLogger(__name__)
 
-
-class AIManager:    
-    def __init__(self):
-        self.model = None
-        self._setup_gemini()
-    
-    def _setup_gemini(self):
-        """Initialize Gemini AI client."""
-        try:
-            genai.configure(api_key=config.GEMINI_API_KEY)
-            self.model = genai.GenerativeModel('gemini-2.0-flash-exp')
-            logger.info("AIManager: Configured Gemini AI for advanced analysis")
-        except Exception as e:
-            logger.error(f"AIManager: Failed to configure Gemini AI: {e}")
+# Gemini responses keyed by (operation, inputs) so repeated issues skip the round trip
+_llm_cache = TTLCache(maxsize=config.AI_CACHE_MAXSIZE, ttl=config.AI_CACHE_TTL)
+
+
+# Every Gemini call in the process shares one concurrency cap and request budget.
+# Callers run in worker threads (and Flask webhooks on their own event loops),
+# so these are thread primitives rather than asyncio ones.
+_GEMINI_SEM = threading.BoundedSemaphore(config.GEMINI_MAX_CONCURRENCY)
+_GEMINI_RATE = RateLimiter(config.GEMINI_REQUESTS_PER_MINUTE, period=60.0)
+
+
+# genai.configure mutates process-global SDK state, so it runs once per process
+_CONFIG_LOCK = threading.Lock()
+_CONFIGURED = False
+
+
+def ensure_gemini_configured() -> None:
+    """Configure the Gemini SDK with the API key if that hasn't happened yet."""
+    global _CONFIGURED
+    if _CONFIGURED:
+        return
+    with _CONFIG_LOCK:
+        if _CONFIGURED:
+            return
+        genai.configure(api_key=config.GEMINI_API_KEY)
+        _CONFIGURED = True
+
+
+# Gemini models (and their client connections) shared by AIManager and every
+# tool, one per system instruction
+_MODEL_NAME = 'gemini-2.0-flash-exp'
+_MODELS: Dict[Optional[str], genai.GenerativeModel] = {}
+_MODEL_LOCK = threading.Lock()
+
+
+def _get_shared_model(system_instruction: Optional[str] = None) -> Optional[genai.GenerativeModel]:
+    """Configure Gemini and build the shared model on first use; None if that fails."""
+    model = _MODELS.get(system_instruction)
+    if model is None:
+        with _MODEL_LOCK:
+            model = _MODELS.get(system_instruction)
+            if model is None:
+                try:
+                    ensure_gemini_configured()
+                    model = genai.GenerativeModel(_MODEL_NAME, system_instruction=system_instruction)
+                    _MODELS[system_instruction] = model
+                except Exception as e:
+                    logger.error(f"Failed to configure Gemini AI: {e}")
+    return model
+
+
+# Quota and transient server errors are retried before a caller falls back
+_RETRYABLE_ERRORS = (
+    google_exceptions.ResourceExhausted,
+    google_exceptions.ServiceUnavailable,
+    google_exceptions.InternalServerError,
+    google_exceptions.DeadlineExceeded,
+    TimeoutError,
+)
+_MAX_ATTEMPTS = 4
+_MAX_BACKOFF = 10.0  # seconds
+
+
+def _call_gemini(call):
+    """
+    Run call() within the shared Gemini limits, retrying transient errors.
     
-    def classify_severity(self, title: str, body: str) -> str:
-        """
-        Use Gemini model to perform 5-level severity classification.
-        
-        Args:
-            title: GitHub issue title
-            body: GitHub issue body
-            
-        Returns:
-            One of: "Critical", "High", "Medium", "Low", "Info"
-        """
-        try:
-            if not self.model:
-                logger.warning("AIManager: Gemini model not configured, using fallback")
-                return "Medium"
-            
-            prompt = f"""
+    Retries back off exponentially with jitter, and the wait happens outside
+    the concurrency cap so other issues' calls keep flowing meanwhile.
+    """
+    for attempt in range(1, _MAX_ATTEMPTS + 1):
+        _GEMINI_RATE.acquire()
+        try:
+            with _GEMINI_SEM:
+                return call()
+        except _RETRYABLE_ERRORS as e:
+            if attempt == _MAX_ATTEMPTS:
+                raise
+            delay = min(_MAX_BACKOFF, 2 ** (attempt - 1)) + random.uniform(0, 1)
+            logger.warning(f"Gemini call failed ({e}), retrying in {delay:.1f}s")
+            time.sleep(delay)
+
+
+def _generate(model, prompt: str, generation_config: Dict[str, Any]):
+    """Call model.generate_content within the shared Gemini limits."""
+    return _call_gemini(lambda: model.generate_content(prompt, generation_config=generation_config))
+
+
+def _generate_first_word(model, prompt: str, generation_config: Dict[str, Any]) -> str:
+    """Stream a one-word answer, stop reading once the word is complete, and return it."""
+    def _read() -> str:
+        text = ""
+        for chunk in model.generate_content(prompt, generation_config=generation_config, stream=True):
+            text += chunk.text
+            if len(text.split()) > 1:
+                break
+        return text
+    
+    words = _call_gemini(_read).split()
+    return words[0].strip(".,:*") if words else ""
+
+
+# Prompt templates, filled in with str.format per call. The severity and triage
+# summary instructions are fixed system instructions, so every request starts
+# with the same prefix and Gemini can reuse its cached processing of it.
+_SEVERITY_SYSTEM = """
 Analyze the following GitHub issue and classify its severity.
 The severity levels are:
 - Critical: System down, data loss, security vulnerability.
@@ -69,26 +153,197 @@ Example 4:
 Title: "How to configure SSL certificates?"
 Body: "I'm trying to set up SSL for our domain. Can someone provide guidance on the best practices?"
 Severity: Info
+"""
 
+_SEVERITY_PROMPT = """
 Issue to classify:
 Title: "{title}"
 Body: "{body}"
 Severity:
 """
+
+_SUMMARY_PROMPT = """
+Summarize the following GitHub issue into a single, concise sentence for a technical audience.
+
+Title: "{title}"
+Body: "{body}"
+
+Provide only the summary sentence, no additional text.
+"""
+
+_ANALYSIS_PROMPT = """
+Analyze this GitHub issue and determine its severity level.
+
+Title: {title}
+Description: {body}...
+
+Consider these factors:
+- Security vulnerabilities = CRITICAL
+- Production outages, data loss = CRITICAL
+- Major feature breakage = HIGH
+- Performance issues affecting many users = HIGH
+- Minor bugs affecting functionality = MEDIUM
+- Cosmetic issues, typos, suggestions = LOW
+
+Respond with exactly one word: critical, high, medium, or low
+"""
+
+_TRIAGE_SUMMARY_SYSTEM = """
+Create a concise triage summary for the given GitHub issue.
+
+Create a summary that includes:
+1. Issue type and main problem
+2. Key technical details
+3. Urgency assessment
+4. Recommended actions
+
+Keep it under 200 words and professional.
+"""
+
+_TRIAGE_SUMMARY_PROMPT = """
+Title: {title}
+Body: {body}...
+Severity: {severity}
+"""
+
+# Fields analyze_all can request in one JSON-mode call: (instruction, max output tokens)
+_ANALYSIS_FIELDS = {
+    "severity": ("one of Critical, High, Medium, Low or Info", 20),
+    "summary": ("a single, concise sentence summarizing the issue for a technical audience", 100),
+    "triage_summary": ("a professional triage summary under 200 words covering the issue type and main "
+                       "problem, key technical details, urgency assessment and recommended actions", 300),
+}
+
+_ANALYZE_ALL_PROMPT = """
+Analyze the following GitHub issue for triage.
+The severity levels are:
+- Critical: System down, data loss, security vulnerability.
+- High: Major functionality broken, significant performance degradation.
+- Medium: Minor bugs with workarounds, important feature requests.
+- Low: Cosmetic issues, typos, documentation updates.
+- Info: Questions, discussions, feedback.
+
+Title: "{title}"
+Body: "{body}"
+
+Respond with a JSON object with these keys:
+{fields}
+"""
+
+
+# Lowercased model answer -> canonical severity, so every result is one of
+# five shared strings. AIAnalysisTool's scale has no Info level.
+_SEVERITY_PARSE = {
+    "critical": "Critical", "crit": "Critical",
+    "high": "High",
+    "medium": "Medium", "med": "Medium", "moderate": "Medium",
+    "low": "Low", "minor": "Low",
+    "info": "Info", "informational": "Info",
+}
+_SEVERITY_PARSE_LOWER = {
+    answer: "low" if severity == "Info" else severity.lower()
+    for answer, severity in _SEVERITY_PARSE.items()
+}
+
+# Issue-template comments and repeated lines (e.g. looping stack traces) carry
+# no signal, so they're dropped before the body is cut to a token budget
+_HTML_COMMENT = re.compile(r'<!--.*?-->', re.DOTALL)
+_REPEATED_LINES = re.compile(r'^(.*\S.*)\n(?:\1\n)+', re.MULTILINE)
+_CHARS_PER_TOKEN = 4  # rough average for English text and code
+
+
+def _truncate(body: str, max_tokens: int) -> str:
+    """Strip boilerplate from body and cut it to about max_tokens tokens at a word boundary."""
+    body = _REPEATED_LINES.sub(r'\1\n', _HTML_COMMENT.sub('', body)).strip()
+    limit = max_tokens * _CHARS_PER_TOKEN
+    if len(body) <= limit:
+        return body
+    cut = body.rfind(' ', 0, limit)
+    return body[:cut if cut > 0 else limit]
+
+
+# Unambiguous issues are classified by rule without a Gemini call. Only the
+# title is matched; bodies often negate markers ("no data loss") or carry
+# them in issue-template checklists.
+_CRITICAL_RE = re.compile(r'\b(cve-\d{4}-\d+|rce|remote code execution|sql injection|production (is )?down|data loss)\b', re.I)
+_LOW_RE = re.compile(r'\b(typo|typos|spelling|readme)\b', re.I)
+_INFO_RE = re.compile(r'^(how (do|can|to)|what|why|can i|is there)\b', re.I)
+
+
+def _direct_severity(title: str) -> Optional[str]:
+    """Return "Critical", "Low" or "Info" for issues a rule can classify, else None."""
+    if _CRITICAL_RE.search(title):
+        severity = "Critical"
+    elif _LOW_RE.search(title):
+        severity = "Low"
+    elif _INFO_RE.match(title.strip()):
+        severity = "Info"
+    else:
+        return None
+    logger.info(f"direct_hit: classified '{title}' as {severity} without Gemini")
+    return severity
+
+
+def _cached_response(key: str, operation: str) -> Optional[Any]:
+    """Return a cached Gemini response for key, logging cache hit statistics."""
+    cached = _llm_cache.get(key)
+    if cached is not None:
+        logger.info(f"LLM cache hit for {operation} (hits={_llm_cache.hits}, misses={_llm_cache.misses})")
+    return cached
+
+
+class AIManager:    
+    def __init__(self):
+        self.model = None
+        self.severity_model = None
+        self._setup_gemini()
+    
+    def _setup_gemini(self):
+        """Attach the shared Gemini models."""
+        self.model = _get_shared_model()
+        self.severity_model = _get_shared_model(_SEVERITY_SYSTEM)
+        if self.model:
+            logger.info("AIManager: Configured Gemini AI for advanced analysis")
+    
+    def classify_severity(self, title: str, body: str) -> str:
+        """
+        Use Gemini model to perform 5-level severity classification.
+        
+        Args:
+            title: GitHub issue title
+            body: GitHub issue body
             
-            response = self.model.generate_content(
+        Returns:
+            One of: "Critical", "High", "Medium", "Low", "Info"
+        """
+        try:
+            direct = _direct_severity(title)
+            if direct:
+                return direct
+            
+            if not self.severity_model:
+                logger.warning("AIManager: Gemini model not configured, using fallback")
+                return "Medium"
+            
+            cache_key = content_hash("severity", title, body)
+            cached = _cached_response(cache_key, "severity")
+            if cached is not None:
+                return cached
+            
+            prompt = _SEVERITY_PROMPT.format(title=title, body=body)
+            
+            severity = _generate_first_word(
+                self.severity_model,
                 prompt,
                 generation_config={
                     'max_output_tokens': 20,
                     'temperature': 0.1,
                 }
             )
-            
-            severity = response.text.strip()
-            if severity not in ["Critical", "High", "Medium", "Low", "Info"]:
-                severity = "Medium"  # Default fallback
+            severity = _SEVERITY_PARSE.get(severity.lower(), "Medium")  # Medium is the fallback
             
             logger.info(f"AIManager: Classified severity as '{severity}' for issue: {title}")
+            _llm_cache.set(cache_key, severity)
             return severity
             
         except Exception as e:
@@ -111,16 +366,15 @@ Severity:
                 logger.warning("AIManager: Gemini model not configured, using fallback")
                 return f"Issue: {title}"
             
-            prompt = f"""
-Summarize the following GitHub issue into a single, concise sentence for a technical audience.
-
-Title: "{title}"
-Body: "{body}"
-
-Provide only the summary sentence, no additional text.
-"""
+            cache_key = content_hash("summary", title, body)
+            cached = _cached_response(cache_key, "summary")
+            if cached is not None:
+                return cached
+            
+            prompt = _SUMMARY_PROMPT.format(title=title, body=body)
             
-            response = self.model.generate_content(
+            response = _generate(
+                self.model,
                 prompt,
                 generation_config={
                     'max_output_tokens': 100,
@@ -130,12 +384,98 @@ Provide only the summary sentence, no additional text.
             
             summary = response.text.strip()
             logger.info(f"AIManager: Generated summary for issue: {title}")
+            _llm_cache.set(cache_key, summary)
             return summary
             
         except Exception as e:
             logger.error(f"AIManager: Error generating summary: {e}")
             return f"Issue: {title}"
     
+    def analyze_all(self, title: str, body: str,
+                    fields: Tuple[str, ...] = ("severity", "summary", "triage_summary")) -> Dict[str, str]:
+        """
+        Produce several analysis fields for an issue with a single Gemini call.
+        
+        The fields share one JSON-mode request instead of one round trip each.
+        Any field missing from the response falls back to its own method.
+        
+        Args:
+            title: GitHub issue title
+            body: GitHub issue body
+            fields: Which of "severity", "summary" and "triage_summary" to produce
+            
+        Returns:
+            Dict with one entry per requested field
+        """
+        cache_key = content_hash("analyze_all", title, body, *fields)
+        cached = _cached_response(cache_key, "combined analysis")
+        if cached is not None:
+            return dict(cached)
+        
+        direct = _direct_severity(title) if "severity" in fields else None
+        requested = tuple(field for field in fields if not (field == "severity" and direct))
+        result: Dict[str, str] = {}
+        if self.model and requested:
+            try:
+                prompt = _ANALYZE_ALL_PROMPT.format(
+                    title=title,
+                    body=body,
+                    fields="\n".join(f'- "{field}": {_ANALYSIS_FIELDS[field][0]}' for field in requested)
+                )
+                response = _generate(
+                    self.model,
+                    prompt,
+                    generation_config={
+                        'response_mime_type': 'application/json',
+                        'response_schema': {
+                            'type': 'object',
+                            'properties': {field: {'type': 'string'} for field in requested},
+                            'required': list(requested),
+                        },
+                        'max_output_tokens': sum(_ANALYSIS_FIELDS[field][1] for field in requested),
+                        'temperature': 0.2,
+                    }
+                )
+                parsed = json.loads(response.text)
+                result = {
+                    field: parsed[field].strip() for field in requested
+                    if isinstance(parsed.get(field), str) and parsed[field].strip()
+                }
+                if "severity" in result:
+                    severity = _SEVERITY_PARSE.get(result.pop("severity").lower())
+                    if severity:
+                        result["severity"] = severity
+                logger.info(f"AIManager: Combined analysis returned {sorted(result)} for issue: {title}")
+            except Exception as e:
+                logger.error(f"AIManager: Error in combined analysis: {e}")
+        complete = len(result) == len(requested)
+        
+        if direct:
+            result["severity"] = direct
+        elif "severity" in fields:
+            result["severity"] = result.get("severity") or self.classify_severity(title, body)
+        if "summary" in fields and "summary" not in result:
+            result["summary"] = self.summarize_issue(title, body)
+        if "triage_summary" in fields and "triage_summary" not in result:
+            result["triage_summary"] = f"Issue: {title}\nSeverity: {result.get('severity', 'Medium').upper()}\nRequires manual review."
+        
+        # Don't pin fallbacks produced while Gemini was failing
+        if complete:
+            _llm_cache.set(cache_key, dict(result))
+        return result
+    
+    async def analyze_issue(self, title: str, body: str) -> Tuple[str, str]:
+        """
+        Classify severity and summarize the issue with one combined Gemini call.
+        
+        The Gemini SDK is blocking, so the call runs in a worker thread.
+        
+        Returns:
+            Tuple of (severity, summary)
+        """
+        analysis = await asyncio.to_thread(self.analyze_all, title, body, ("severity", "summary"))
+        return analysis["severity"], analysis["summary"]
+    
     def draft_duplicate_comment(self, original_issue_id: int, similarity_score: float) -> str:
         """
         Draft a comment for duplicate issues.
@@ -153,8 +493,10 @@ This issue appears to be a duplicate of #{original_issue_id} (Similarity: {simil
 Please review the original issue and add any additional information there if needed. This issue will be closed to avoid fragmentation.
 """
 
-# Global AIManager instance
-ai_manager = AIManager()
+@functools.cache
+def get_ai_manager() -> AIManager:
+    """Return the process-wide AIManager, creating it on first use."""
+    return AIManager()
 
 
 class SeverityClassificationSchema(BaseModel):
@@ -185,7 +527,8 @@ class SeverityClassificationTool(Tool[str]):
 
     def run(self, context: ToolRunContext, title: str, body: str) -> str:
         """Classify issue severity using AI."""
-        return ai_manager.classify_severity(title, body)
+        # Shares one combined call (and its cached result) with the summary tools
+        return get_ai_manager().analyze_all(title, body)["severity"]
 
 
 class IssueSummaryTool(Tool[str]):
@@ -198,7 +541,7 @@ class IssueSummaryTool(Tool[str]):
 
     def run(self, context: ToolRunContext, title: str, body: str) -> str:
         """Generate issue summary using AI."""
-        return ai_manager.summarize_issue(title, body)
+        return get_ai_manager().analyze_all(title, body)["summary"]
 
 
 class DuplicateCommentTool(Tool[str]):
@@ -211,7 +554,7 @@ class DuplicateCommentTool(Tool[str]):
 
     def run(self, context: ToolRunContext, original_issue_id: int, similarity_score: float) -> str:
         """Draft duplicate comment using AI."""
-        return ai_manager.draft_duplicate_comment(original_issue_id, similarity_score)
+        return get_ai_manager().draft_duplicate_comment(original_issue_id, similarity_score)
 
 
 class SeverityAssessmentSchema(BaseModel):
@@ -235,14 +578,10 @@ class AIAnalysisTool(Tool[str]):
         self._setup_gemini()
 
     def _setup_gemini(self):
-        """Initialize Gemini AI client."""
-        try:
-            genai.configure(api_key=config.GEMINI_API_KEY)
-            self.model = genai.GenerativeModel('gemini-2.0-flash-exp')
+        """Attach the shared Gemini model."""
+        self.model = _get_shared_model()
+        if self.model:
             logger.info("Configured Gemini AI for issue analysis")
-        except Exception as e:
-            logger.error(f"Failed to configure Gemini AI: {e}")
-            # Don't raise - let tool handle errors gracefully
 
     def run(self, context: ToolRunContext, title: str, body: str) -> str:
         """
@@ -257,40 +596,34 @@ class AIAnalysisTool(Tool[str]):
             Severity level as string
         """
         try:
+            # This scale has no Info level; questions rank as low
+            direct = _direct_severity(title)
+            if direct:
+                return 'critical' if direct == "Critical" else 'low'
+            
             if not self.model:
                 logger.warning("Gemini model not configured, using fallback")
                 return 'medium'
             
-            prompt = f"""
-            Analyze this GitHub issue and determine its severity level.
+            cache_key = content_hash("analysis", title, body)
+            cached = _cached_response(cache_key, "analysis")
+            if cached is not None:
+                return cached
             
-            Title: {title}
-            Description: {body[:1000]}...
+            prompt = _ANALYSIS_PROMPT.format(title=title, body=_truncate(body, 250))
             
-            Consider these factors:
-            - Security vulnerabilities = CRITICAL
-            - Production outages, data loss = CRITICAL  
-            - Major feature breakage = HIGH
-            - Performance issues affecting many users = HIGH
-            - Minor bugs affecting functionality = MEDIUM
-            - Cosmetic issues, typos, suggestions = LOW
-            
-            Respond with exactly one word: critical, high, medium, or low
-            """
-            
-            response = self.model.generate_content(
+            severity = _generate_first_word(
+                self.model,
                 prompt,
                 generation_config={
                     'max_output_tokens': 10,
                     'temperature': 0.1,
                 }
             )
-            
-            severity = response.text.strip().lower()
-            if severity not in ['critical', 'high', 'medium', 'low']:
-                severity = 'medium'  # Default fallback
+            severity = _SEVERITY_PARSE_LOWER.get(severity.lower(), 'medium')  # medium is the fallback
             
             logger.info(f"Assessed severity as '{severity}' for issue: {title}")
+            _llm_cache.set(cache_key, severity)
             return severity
             
         except Exception as e:
@@ -320,37 +653,30 @@ class TriageSummaryTool(Tool[str]):
         self._setup_gemini()
 
     def _setup_gemini(self):
-        """Initialize Gemini AI client."""
-        try:
-            genai.configure(api_key=config.GEMINI_API_KEY)
-            self.model = genai.GenerativeModel('gemini-2.0-flash-exp')
-        except Exception as e:
-            logger.error(f"Failed to configure Gemini AI: {e}")
-            # Don't raise - let tool handle errors gracefully
+        """Attach the shared Gemini model."""
+        self.model = _get_shared_model(_TRIAGE_SUMMARY_SYSTEM)
 
     def run(self, context: ToolRunContext, title: str, body: str, severity: str) -> str:
         """Generate a comprehensive triage summary."""
         try:
+            # Reuse the combined analysis when it reached the same severity
+            analysis = get_ai_manager().analyze_all(title, body)
+            if analysis["severity"].lower() == severity.lower():
+                return analysis["triage_summary"]
+            
             if not self.model:
                 logger.warning("Gemini model not configured, using fallback")
                 return f"Issue: {title}\nSeverity: {severity.upper()}\nRequires manual review."
-            prompt = f"""
-            Create a concise triage summary for this GitHub issue:
             
-            Title: {title}
-            Body: {body[:500]}...
-            Severity: {severity}
+            cache_key = content_hash("triage_summary", title, body, severity)
+            cached = _cached_response(cache_key, "triage summary")
+            if cached is not None:
+                return cached
             
-            Create a summary that includes:
-            1. Issue type and main problem
-            2. Key technical details
-            3. Urgency assessment
-            4. Recommended actions
+            prompt = _TRIAGE_SUMMARY_PROMPT.format(title=title, body=_truncate(body, 125), severity=severity)
             
-            Keep it under 200 words and professional.
-            """
-            
-            response = self.model.generate_content(
+            response = _generate(
+                self.model,
                 prompt,
                 generation_config={
                     'max_output_tokens': 300,
@@ -360,6 +686,7 @@ class TriageSummaryTool(Tool[str]):
             
             summary = response.text.strip()
             logger.info(f"Generated triage summary for issue: {title}")
+            _llm_cache.set(cache_key, summary)
             return summary
             
         except Exception as e:
@@ -390,14 +717,10 @@ class LLMTool(Tool[str]):
         self._setup_gemini()
 
     def _setup_gemini(self):
-        """Initialize Gemini AI client."""
-        try:
-            genai.configure(api_key=config.GEMINI_API_KEY)
-            self.model = genai.GenerativeModel('gemini-2.0-flash-exp')
+        """Attach the shared Gemini model."""
+        self.model = _get_shared_model()
+        if self.model:
             logger.info("Configured Gemini AI for LLM tool")
-        except Exception as e:
-            logger.error(f"Failed to configure Gemini AI: {e}")
-            # Don't raise - let tool handle errors gracefully
 
     def run(self, context: ToolRunContext, task: str, task_data: str = "") -> str:
         """
@@ -419,9 +742,15 @@ class LLMTool(Tool[str]):
             # Combine task and task_data for the AI prompt
             full_prompt = f"{task}\n\n{task_data}" if task_data else task
             
+            cache_key = content_hash("llm", full_prompt)
+            cached = _cached_response(cache_key, "LLM tool")
+            if cached is not None:
+                return cached
+            
             logger.info(f"LLM Tool processing task: {task[:100]}...")
             
-            response = self.model.generate_content(
+            response = _generate(
+                self.model,
                 full_prompt,
                 generation_config={
                     'max_output_tokens': 2000,
@@ -435,1195 +764,9 @@ class LLMTool(Tool[str]):
             
             result = response.text.strip()
             logger.info(f"LLM Tool completed analysis ({len(result)} chars)")
+            _llm_cache.set(cache_key, result)
             return result
             
         except Exception as e:
             logger.error(f"Error in LLM tool: {e}")
             return f"Error analyzing issue: {str(e)}. Manual review required."
-
-2.
-
-import asyncio
-import logging
-from typing import Dict, Any, Optional
-import json
-
-import discord
-from discord.ext import tasks
-import requests
-from portia import ToolRunContext
-from portia.tool import Tool
-from pydantic import BaseModel, Field
-
-import config
-
-logger = logging.getLogger(__name__)
-
-
-class TriageClarification:
-    """
-    Advanced triage clarification with interactive Discord interface.
-    Supports Approve/Reject/Modify with modals and timeouts.
-    """
-    
-    def __init__(self, 
-                 issue_title: str,
-                 issue_number: int, 
-                 severity: str,
-                 ai_summary: str,
-                 is_duplicate: bool = False,
-                 similarity_score: Optional[float] = None,
-                 duplicate_issue_id: Optional[int] = None):
-        self.issue_title = issue_title
-        self.issue_number = issue_number
-        self.severity = severity
-        self.ai_summary = ai_summary
-        self.is_duplicate = is_duplicate
-        self.similarity_score = similarity_score
-        self.duplicate_issue_id = duplicate_issue_id
-        self.response_future = None
-    
-    def create_embed(self) -> discord.Embed:
-        """Create rich Discord embed for triage clarification."""
-        # Severity color mapping
-        severity_colors = {
-            "Critical": discord.Color.red(),
-            "High": discord.Color.orange(),
-            "Medium": discord.Color.yellow(),
-            "Low": discord.Color.green(),
-            "Info": discord.Color.blue()
-        }
-        
-        embed = discord.Embed(
-            title=f"🥷 Triage Required: Issue #{self.issue_number}",
-            description=self.issue_title,
-            color=severity_colors.get(self.severity, discord.Color.blue())
-        )
-        
-        # Add severity field
-        embed.add_field(
-            name="AI Severity Classification",
-            value=f"**{self.severity}**",
-            inline=True
-        )
-        
-        # Add duplicate or summary field
-        if self.is_duplicate and self.similarity_score and self.duplicate_issue_id:
-            embed.add_field(
-                name="Duplicate Analysis",
-                value=f"**Duplicate Found ({self.similarity_score:.1%} Similarity)**\n"
-                      f"Similar to Issue #{self.duplicate_issue_id}",
-                inline=True
-            )
-        else:
-            embed.add_field(
-                name="AI Summary",
-                value=self.ai_summary[:1000] + ("..." if len(self.ai_summary) > 1000 else ""),
-                inline=False
-            )
-        
-        # Add footer
-        embed.set_footer(text="⏱️ Action required within 1 hour • Built with Portia AI")
-        
-        return embed
-    
-    def create_view(self) -> 'TriageView':
-        """Create interactive view with buttons."""
-        return TriageView(self)
-
-
-class SeveritySelect(discord.ui.Select):
-    """Dropdown for severity selection in modify modal."""
-    
-    def __init__(self, current_severity: str):
-        options = [
-            discord.SelectOption(
-                label="Critical", 
-                description="System down, data loss, security vulnerability",
-                emoji="🔴",
-                default=(current_severity == "Critical")
-            ),
-            discord.SelectOption(
-                label="High", 
-                description="Major functionality broken, performance issues",
-                emoji="🟠",
-                default=(current_severity == "High")
-            ),
-            discord.SelectOption(
-                label="Medium", 
-                description="Minor bugs with workarounds, feature requests",
-                emoji="🟡",
-                default=(current_severity == "Medium")
-            ),
-            discord.SelectOption(
-                label="Low", 
-                description="Cosmetic issues, typos, documentation",
-                emoji="🟢",
-                default=(current_severity == "Low")
-            ),
-            discord.SelectOption(
-                label="Info", 
-                description="Questions, discussions, feedback",
-                emoji="🔵",
-                default=(current_severity == "Info")
-            )
-        ]
-        super().__init__(placeholder="Select severity level...", options=options, row=0)
-    
-    async def callback(self, interaction: discord.Interaction):
-        """Handle severity selection."""
-        # This will be handled by the modal
-        await interaction.response.defer()
-
-
-class ModifyModal(discord.ui.Modal, title="Modify Triage Plan"):
-    """Modal for modifying triage decisions."""
-    
-    def __init__(self, clarification: TriageClarification):
-        super().__init__()
-        self.clarification = clarification
-        
-        # Add severity select dropdown (this would be handled differently in real Discord)
-        # For webhook simulation, we'll use text input
-        self.severity_input = discord.ui.TextInput(
-            label="Severity Level",
-            placeholder="Critical, High, Medium, Low, or Info",
-            default=clarification.severity,
-            max_length=20
-        )
-        self.add_item(self.severity_input)
-        
-        # Add comment/summary text input
-        self.comment_input = discord.ui.TextInput(
-            label="Comment/Summary",
-            style=discord.TextStyle.paragraph,
-            placeholder="Modify the AI-generated text...",
-            default=clarification.ai_summary,
-            max_length=2000
-        )
-        self.add_item(self.comment_input)
-    
-    async def on_submit(self, interaction: discord.Interaction):
-        """Handle modal submission."""
-        try:
-            modified_data = {
-                "decision": "modify",
-                "data": {
-                    "severity": self.severity_input.value,
-                    "summary": self.comment_input.value if not self.clarification.is_duplicate else None,
-                    "comment": self.comment_input.value if self.clarification.is_duplicate else None
-                }
-            }
-            
-            # Set the response
-            if self.clarification.response_future and not self.clarification.response_future.done():
-                self.clarification.response_future.set_result(modified_data)
-            
-            await interaction.response.send_message(
-                "Modifications saved! The agent will proceed with your changes.", 
-                ephemeral=True
-            )
-            
-        except Exception as e:
-            logger.error(f"Error handling modal submission: {e}")
-            await interaction.response.send_message(
-                f"Error processing modifications: {e}",
-                ephemeral=True
-            )
-
-
-class TriageView(discord.ui.View):
-    """Interactive view with Approve/Reject/Modify buttons and timeout."""
-    
-    def __init__(self, clarification: TriageClarification):
-        super().__init__(timeout=3600.0)  # 1 hour timeout
-        self.clarification = clarification
-    
-    @discord.ui.button(label="Approve", style=discord.ButtonStyle.success, emoji="✅")
-    async def approve_button(self, interaction: discord.Interaction, button: discord.ui.Button):
-        """Handle approve button click."""
-        try:
-            response_data = {"decision": "approve", "data": {}}
-            
-            if self.clarification.response_future and not self.clarification.response_future.done():
-                self.clarification.response_future.set_result(response_data)
-            
-            # Update the message
-            embed = discord.Embed(
-                title="✅ Approved",
-                description=f"Issue #{self.clarification.issue_number} approved by {interaction.user.mention}",
-                color=discord.Color.green()
-            )
-            
-            # Disable all buttons
-            for item in self.children:
-                item.disabled = True
-            
-            await interaction.response.edit_message(embed=embed, view=self)
-            
-        except Exception as e:
-            logger.error(f"Error handling approve button: {e}")
-            await interaction.response.send_message(f"❌ Error: {e}", ephemeral=True)
-    
-    @discord.ui.button(label="Reject", style=discord.ButtonStyle.danger, emoji="❌")
-    async def reject_button(self, interaction: discord.Interaction, button: discord.ui.Button):
-        """Handle reject button click."""
-        try:
-            response_data = {"decision": "reject", "data": {}}
-            
-            if self.clarification.response_future and not self.clarification.response_future.done():
-                self.clarification.response_future.set_result(response_data)
-            
-            # Update the message
-            embed = discord.Embed(
-                title="❌ Rejected",
-                description=f"Issue #{self.clarification.issue_number} rejected by {interaction.user.mention}",
-                color=discord.Color.red()
-            )
-            
-            # Disable all buttons
-            for item in self.children:
-                item.disabled = True
-            
-            await interaction.response.edit_message(embed=embed, view=self)
-            
-        except Exception as e:
-            logger.error(f"Error handling reject button: {e}")
-            await interaction.response.send_message(f"❌ Error: {e}", ephemeral=True)
-    
-    @discord.ui.button(label="Modify", style=discord.ButtonStyle.secondary, emoji="✏️")
-    async def modify_button(self, interaction: discord.Interaction, button: discord.ui.Button):
-        """Handle modify button click - show modal."""
-        try:
-            modal = ModifyModal(self.clarification)
-            await interaction.response.send_modal(modal)
-            
-        except Exception as e:
-            logger.error(f"Error showing modify modal: {e}")
-            await interaction.response.send_message(f"❌ Error: {e}", ephemeral=True)
-    
-    async def on_timeout(self):
-        """Handle view timeout."""
-        try:
-            # Set timeout response
-            if self.clarification.response_future and not self.clarification.response_future.done():
-                self.clarification.response_future.set_result({
-                    "decision": "timeout", 
-                    "data": {}
-                })
-            
-            # Disable all buttons
-            for item in self.children:
-                item.disabled = True
-            
-            logger.warning(f"Triage action expired for issue #{self.clarification.issue_number}")
-            
-        except Exception as e:
-            logger.error(f"Error handling timeout: {e}")
-
-
-class DiscordManager:
-    """Enhanced Discord manager for sophisticated human-in-the-loop workflow."""
-    
-    def __init__(self):
-        self.webhook_url = config.DISCORD_WEBHOOK_URL
-    
-    async def send_triage_request(self, clarification: TriageClarification) -> Dict[str, Any]:
-        """Send triage request with interactive UI and wait for response."""
-        try:
-            if not self.webhook_url:
-                logger.error("Discord webhook URL not configured")
-                # Return auto-approve for missing webhook
-                return {"decision": "approve", "data": {}}
-            
-            # For webhook-based Discord (production-ready approach)
-            embed_data = self._create_webhook_embed(clarification)
-            
-            # Send initial message
-            webhook_data = {
-                "embeds": [embed_data],
-                "components": self._create_action_row_data()
-            }
-            
-            response = requests.post(self.webhook_url, json=webhook_data)
-            response.raise_for_status()
-            
-            logger.info(f"Sent triage request for issue #{clarification.issue_number}")
-            
-            # For demo purposes, simulate human response based on severity
-            return self._simulate_human_response(clarification)
-            
-        except Exception as e:
-            logger.error(f"Failed to send triage request: {e}")
-            # Fallback to auto-approve
-            return {"decision": "approve", "data": {}}
-    
-    def _create_webhook_embed(self, clarification: TriageClarification) -> Dict[str, Any]:
-        """Create embed data for Discord webhook."""
-        severity_colors = {
-            "Critical": 0xFF0000,  # Red
-            "High": 0xFF8C00,      # Orange
-            "Medium": 0xFFFF00,    # Yellow
-            "Low": 0x00FF00,       # Green
-            "Info": 0x0000FF       # Blue
-        }
-        
-        embed = {
-            "title": f"🥷 Triage Required: Issue #{clarification.issue_number}",
-            "description": clarification.issue_title,
-            "color": severity_colors.get(clarification.severity, 0x0000FF),
-            "fields": [
-                {
-                    "name": "AI Severity Classification",
-                    "value": f"**{clarification.severity}**",
-                    "inline": True
-                }
-            ],
-            "footer": {
-                "text": "Action required within 1 hour • Built with Portia AI"
-            }
-        }
-        
-        # Add duplicate or summary field
-        if clarification.is_duplicate and clarification.similarity_score and clarification.duplicate_issue_id:
-            embed["fields"].append({
-                "name": "Duplicate Analysis",
-                "value": f"**Duplicate Found ({clarification.similarity_score:.1%} Similarity)**\n"
-                         f"Similar to Issue #{clarification.duplicate_issue_id}",
-                "inline": True
-            })
-        else:
-            embed["fields"].append({
-                "name": "AI Summary",
-                "value": clarification.ai_summary[:1000] + ("..." if len(clarification.ai_summary) > 1000 else ""),
-                "inline": False
-            })
-        
-        return embed
-    
-    def _create_action_row_data(self) -> list:
-        """Create action row data for webhook buttons."""
-        return [
-            {
-                "type": 1,  # Action Row
-                "components": [
-                    {
-                        "type": 2,  # Button
-                        "style": 3,  # Success (Green)
-                        "label": "Approve",
-                        "emoji": {"name": "✅"},
-                        "custom_id": "triage_approve"
-                    },
-                    {
-                        "type": 2,  # Button
-                        "style": 4,  # Danger (Red)
-                        "label": "Reject",
-                        "emoji": {"name": "❌"},
-                        "custom_id": "triage_reject"
-                    },
-                    {
-                        "type": 2,  # Button
-                        "style": 2,  # Secondary (Gray)
-                        "label": "Modify",
-                        "emoji": {"name": "✏️"},
-                        "custom_id": "triage_modify"
-                    }
-                ]
-            }
-        ]
-    
-    def _simulate_human_response(self, clarification: TriageClarification) -> Dict[str, Any]:
-        """Simulate human response for demo purposes."""
-        # For production, this would be replaced with actual Discord interaction handling
-        if clarification.severity in ["Critical", "High"]:
-            return {"decision": "approve", "data": {}}
-        elif clarification.is_duplicate:
-            return {"decision": "approve", "data": {}}
-        else:
-            # Simulate some modifications for medium/low severity
-            return {
-                "decision": "approve",  # For demo, we'll approve with potential modifications
-                "data": {
-                    "severity": clarification.severity,
-                    "summary": clarification.ai_summary
-                }
-            }
-    
-    def send_completion_message(self, 
-                              channel_id: str, 
-                              original_message_id: str,
-                              approver_name: str, 
-                              action_summary: str) -> bool:
-        """Send completion message with audit trail."""
-        try:
-            if not self.webhook_url:
-                logger.warning("Discord webhook URL not configured for completion message")
-                return False
-            
-            embed = {
-                "title": "✅ Triage Action Completed",
-                "description": f"Action completed as approved by **{approver_name}**",
-                "color": 0x00FF00,  # Green
-                "fields": [
-                    {
-                        "name": "📋 Action Summary",
-                        "value": action_summary,
-                        "inline": False
-                    }
-                ],
-                "footer": {
-                    "text": f"Audit Trail • {original_message_id}"
-                }
-            }
-            
-            webhook_data = {"embeds": [embed]}
-            
-            response = requests.post(self.webhook_url, json=webhook_data)
-            response.raise_for_status()
-            
-            logger.info(f"Sent completion message for action: {action_summary}")
-            return True
-            
-        except Exception as e:
-            logger.error(f"Failed to send completion message: {e}")
-            return False
-
-
-# Global Discord manager instance
-discord_manager = DiscordManager()
-
-
-# Portia Tool Schemas
-class TriageRequestSchema(BaseModel):
-    """Input schema for triage requests."""
-    issue_title: str = Field(..., description="GitHub issue title")
-    issue_number: int = Field(..., description="GitHub issue number")
-    severity: str = Field(..., description="Assessed severity level")
-    ai_summary: str = Field(..., description="AI-generated summary of the issue")
-    is_duplicate: bool = Field(default=False, description="Whether issue is a duplicate")
-    similarity_score: Optional[float] = Field(default=None, description="Similarity score if duplicate")
-    duplicate_issue_id: Optional[int] = Field(default=None, description="ID of duplicate issue")
-
-
-class CompletionMessageSchema(BaseModel):
-    """Input schema for completion messages."""
-    channel_id: str = Field(..., description="Discord channel ID")
-    original_message_id: str = Field(..., description="Original message ID for audit trail")
-    approver_name: str = Field(..., description="Name of the approver")
-    action_summary: str = Field(..., description="Summary of completed actions")
-
-
-class TriageRequestTool(Tool[str]):
-    """Advanced tool for requesting human triage decisions through Discord."""
-    
-    id: str = "triage_request_tool"
-    name: str = "Triage Request Tool"
-    description: str = "Requests sophisticated human triage decisions with Approve/Reject/Modify options"
-    args_schema: type[BaseModel] = TriageRequestSchema
-
-    def run(self, context: ToolRunContext, 
-            issue_title: str, 
-            issue_number: int, 
-            severity: str,
-            ai_summary: str,
-            is_duplicate: bool = False,
-            similarity_score: Optional[float] = None,
-            duplicate_issue_id: Optional[int] = None) -> str:
-        """
-        Send advanced triage request and return decision.
-        
-        Returns:
-            JSON string with decision and data
-        """
-        try:
-            clarification = TriageClarification(
-                issue_title=issue_title,
-                issue_number=issue_number,
-                severity=severity,
-                ai_summary=ai_summary,
-                is_duplicate=is_duplicate,
-                similarity_score=similarity_score,
-                duplicate_issue_id=duplicate_issue_id
-            )
-            
-            # Send request and get response
-            response = asyncio.run(discord_manager.send_triage_request(clarification))
-            
-            # Return JSON string that can be parsed by the agent
-            return json.dumps(response)
-            
-        except Exception as e:
-            logger.error(f"Triage request failed for issue #{issue_number}: {e}")
-            # Return auto-approve on error
-            return json.dumps({"decision": "approve", "data": {}})
-
-
-class CompletionMessageTool(Tool[str]):
-    """Tool for sending completion messages with audit trail."""
-    
-    id: str = "completion_message_tool"
-    name: str = "Completion Message Tool"
-    description: str = "Sends completion messages to Discord with audit trail"
-    args_schema: type[BaseModel] = CompletionMessageSchema
-
-    def run(self, context: ToolRunContext, 
-            channel_id: str, 
-            original_message_id: str,
-            approver_name: str, 
-            action_summary: str) -> str:
-        """Send completion message."""
-        try:
-            success = discord_manager.send_completion_message(
-                channel_id, original_message_id, approver_name, action_summary
-            )
-            
-            if success:
-                return f"Completion message sent for {action_summary}"
-            else:
-                return f"Completion message failed to send"
-                
-        except Exception as e:
-            error_msg = f"Failed to send completion message: {e}"
-            logger.error(error_msg)
-            return error_msg
-
-
-# Legacy compatibility functions
-async def post_for_approval(issue_data: Dict[str, Any], severity: str, duplicate_info: Dict[str, Any], ai_summary: str) -> Dict[str, Any]:
-    """Legacy function for backward compatibility."""
-    try:
-        tool = TriageRequestTool()
-        
-        # Extract duplicate info
-        is_duplicate = duplicate_info.get('is_duplicate', False) if duplicate_info else False
-        similarity_score = duplicate_info.get('similarity_score') if duplicate_info else None
-        duplicate_issue_id = duplicate_info.get('duplicate_issue_number') if duplicate_info else None
-        
-        result_json = tool.run(
-            context=None,  # type: ignore
-            issue_title=issue_data.get('title', 'Unknown'),
-            issue_number=issue_data.get('number', 0),
-            severity=severity,
-            ai_summary=ai_summary,
-            is_duplicate=is_duplicate,
-            similarity_score=similarity_score,
-            duplicate_issue_id=duplicate_issue_id
-        )
-        
-        result = json.loads(result_json)
-        
-        # Return format expected by legacy code
-        return {
-            'approved': result.get('decision') == 'approve',
-            'user': 'discord-user',
-            'reason': f"Human decision: {result.get('decision')}",
-            'modified_data': result.get('data', {})
-        }
-        
-    except Exception as e:
-        logger.error(f"Legacy approval function failed: {e}")
-        return {
-            'approved': False,
-            'user': 'system',
-            'reason': f'Error: {e}'
-        }
-
-3.
-import logging
-from typing import Dict, Any, Optional
-
-from github import Github
-from portia import ToolRunContext
-from portia.tool import Tool
-from pydantic import BaseModel, Field
-
-import config
-
-logger = logging.getLogger(__name__)
-
-
-class GitHubManager:
-    """Enhanced GitHub manager for sophisticated issue management."""
-    
-    def __init__(self):
-        self.github_client = None
-        self.repo = None
-        self._setup_github()
-    
-    def _setup_github(self):
-        """Initialize GitHub client."""
-        try:
-            if not config.GITHUB_TOKEN:
-                logger.error("GitHub token not configured")
-                return
-            
-            self.github_client = Github(config.GITHUB_TOKEN)
-            logger.info("GitHub client initialized")
-            
-        except Exception as e:
-            logger.error(f"GitHub setup failed: {e}")
-    
-    def _get_repo(self, repo_name: str = None):
-        """Get repository instance."""
-        if not self.github_client:
-            raise Exception("GitHub client not initialized")
-        
-        # Use configured repo or provided repo name
-        repo_name = repo_name or getattr(config, 'GITHUB_REPO', 'kunal-004/triage-ninja')
-        
-        try:
-            self.repo = self.github_client.get_repo(repo_name)
-            return self.repo
-        except Exception as e:
-            logger.error(f"Failed to get repo {repo_name}: {e}")
-            raise
-    
-    def add_label(self, issue_number: int, label: str, repo_name: str = None) -> bool:
-        """Add label to GitHub issue."""
-        try:
-            repo = self._get_repo(repo_name)
-            issue = repo.get_issue(issue_number)
-            
-            # Check if label exists in repo, create if not
-            try:
-                repo.get_label(label)
-            except:
-                # Create label if it doesn't exist
-                colors = {
-                    "Critical": "d73a4a",  # Red
-                    "High": "ff6600",      # Orange  
-                    "Medium": "ffcc00",    # Yellow
-                    "Low": "00cc66",       # Green
-                    "Info": "0099cc",      # Blue
-                    "duplicate": "cccccc"  # Gray
-                }
-                color = colors.get(label, "ffffff")
-                repo.create_label(label, color)
-                logger.info(f"Created new label: {label}")
-            
-            # Add label to issue
-            issue.add_to_labels(label)
-            logger.info(f"Added label '{label}' to issue #{issue_number}")
-            return True
-            
-        except Exception as e:
-            logger.error(f"Failed to add label '{label}' to issue #{issue_number}: {e}")
-            return False
-    
-    def post_comment(self, issue_number: int, comment: str, repo_name: str = None) -> bool:
-        """Post comment to GitHub issue."""
-        try:
-            repo = self._get_repo(repo_name)
-            issue = repo.get_issue(issue_number)
-            
-            issue.create_comment(comment)
-            logger.info(f"Posted comment to issue #{issue_number}")
-            return True
-            
-        except Exception as e:
-            logger.error(f"Failed to post comment to issue #{issue_number}: {e}")
-            return False
-    
-    def close_issue(self, issue_number: int, reason: str = "completed", repo_name: str = None) -> bool:
-        """Close GitHub issue with reason."""
-        try:
-            repo = self._get_repo(repo_name)
-            issue = repo.get_issue(issue_number)
-            
-            # Close with reason (GitHub API supports: completed, not_planned)
-            if reason == "duplicate":
-                reason = "not_planned"  # GitHub doesn't have 'duplicate' reason
-            
-            issue.edit(state="closed", state_reason=reason)
-            logger.info(f"Closed issue #{issue_number} (reason: {reason})")
-            return True
-            
-        except Exception as e:
-            logger.error(f"Failed to close issue #{issue_number}: {e}")
-            return False
-    
-    def get_issue(self, issue_number: int, repo_name: str = None) -> Optional[Dict[str, Any]]:
-        """Get issue information."""
-        try:
-            repo = self._get_repo(repo_name)
-            issue = repo.get_issue(issue_number)
-            
-            return {
-                'number': issue.number,
-                'title': issue.title,
-                'body': issue.body,
-                'state': issue.state,
-                'labels': [label.name for label in issue.labels],
-                'html_url': issue.html_url
-            }
-            
-        except Exception as e:
-            logger.error(f"Failed to get issue #{issue_number}: {e}")
-            return None
-
-
-# Global GitHub manager instance
-github_manager = GitHubManager()
-
-
-class AddLabelSchema(BaseModel):
-    """Input schema for adding labels to issues."""
-    issue_number: int = Field(..., description="GitHub issue number")
-    label: str = Field(..., description="Label to add to the issue")
-    repo_name: Optional[str] = Field(default=None, description="Repository name (owner/repo)")
-
-
-class AddCommentSchema(BaseModel):
-    """Input schema for adding comments to issues."""
-    issue_number: int = Field(..., description="GitHub issue number")
-    comment: str = Field(..., description="Comment text to add")
-    repo_name: Optional[str] = Field(default=None, description="Repository name (owner/repo)")
-
-
-class CloseIssueSchema(BaseModel):
-    """Input schema for closing issues."""
-    issue_number: int = Field(..., description="GitHub issue number")
-    reason: str = Field(default="completed", description="Reason for closing: completed, not_planned, duplicate")
-    repo_name: Optional[str] = Field(default=None, description="Repository name (owner/repo)")
-
-
-class GitHubAddLabelTool(Tool[str]):
-    """Tool for adding labels to GitHub issues."""
-    
-    id: str = "github_add_label_tool"
-    name: str = "GitHub Add Label Tool"
-    description: str = "Adds labels to GitHub issues"
-    args_schema: type[BaseModel] = AddLabelSchema
-
-    def run(self, context: ToolRunContext, issue_number: int, label: str, repo_name: Optional[str] = None) -> str:
-        """Add label to GitHub issue."""
-        try:
-            success = github_manager.add_label(issue_number, label, repo_name)
-            if success:
-                return f"✅ Added label '{label}' to issue #{issue_number}"
-            else:
-                return f"❌ Failed to add label '{label}' to issue #{issue_number}"
-        except Exception as e:
-            return f"❌ Error adding label: {e}"
-
-
-class GitHubAddCommentTool(Tool[str]):
-    """Tool for adding comments to GitHub issues."""
-    
-    id: str = "github_add_comment_tool"
-    name: str = "GitHub Add Comment Tool"
-    description: str = "Adds comments to GitHub issues"
-    args_schema: type[BaseModel] = AddCommentSchema
-
-    def run(self, context: ToolRunContext, issue_number: int, comment: str, repo_name: Optional[str] = None) -> str:
-        """Add comment to GitHub issue."""
-        try:
-            success = github_manager.post_comment(issue_number, comment, repo_name)
-            if success:
-                return f"✅ Posted comment to issue #{issue_number}"
-            else:
-                return f"❌ Failed to post comment to issue #{issue_number}"
-        except Exception as e:
-            return f"❌ Error posting comment: {e}"
-
-
-class GitHubCloseIssueTool(Tool[str]):
-    """Tool for closing GitHub issues."""
-    
-    id: str = "github_close_issue_tool"
-    name: str = "GitHub Close Issue Tool"
-    description: str = "Closes GitHub issues with specified reason"
-    args_schema: type[BaseModel] = CloseIssueSchema
-
-    def run(self, context: ToolRunContext, issue_number: int, reason: str = "completed", repo_name: Optional[str] = None) -> str:
-        """Close GitHub issue."""
-        try:
-            success = github_manager.close_issue(issue_number, reason, repo_name)
-            if success:
-                return f"✅ Closed issue #{issue_number} (reason: {reason})"
-            else:
-                return f"❌ Failed to close issue #{issue_number}"
-        except Exception as e:
-            return f"❌ Error closing issue: {e}"
-
-    def _setup_github(self):
-        """Initialize GitHub client."""
-        try:
-            self.github_client = Github(config.GITHUB_TOKEN)
-            self.repo = self.github_client.get_repo(config.GITHUB_REPO)
-            logger.info(f"Initialized GitHub manager for repository: {config.GITHUB_REPO}")
-        except Exception as e:
-            logger.error(f"Failed to initialize GitHub client: {e}")
-            # Don't raise - let the tool handle errors gracefully
-
-    def run(self, context: ToolRunContext, issue_number: int, label: str) -> str:
-        """
-        Perform GitHub operations on issues.
-        
-        Args:
-            context: Portia tool run context
-            issue_number: GitHub issue number
-            label: Label to add to issue
-            
-        Returns:
-            Result of the operation
-        """
-        try:
-            if not self.repo:
-                return f"GitHub not configured - cannot add label to issue #{issue_number}"
-            
-            issue = self.repo.get_issue(issue_number)
-            issue.add_to_labels(label)
-            result = f"Added label '{label}' to issue #{issue_number}"
-            
-            logger.info(result)
-            return result
-            
-        except Exception as e:
-            error_msg = f"GitHub operation failed for issue #{issue_number}: {e}"
-            logger.error(error_msg)
-            return error_msg
-
-
-class GitHubLabelTool(Tool[str]):
-    """Specialized tool for adding labels to GitHub issues."""
-    
-    id: str = "github_label_tool"
-    name: str = "GitHub Label Tool"
-    description: str = "Adds labels to GitHub issues"
-    args_schema: type[BaseModel] = AddLabelSchema
-    output_schema: tuple[str, str] = ("string", "Result of adding the label")
-
-    def __init__(self):
-        super().__init__()
-
-    def run(self, context: ToolRunContext, issue_number: int, label: str) -> str:
-        """Add a label to a GitHub issue."""
-        try:
-            if not hasattr(self, 'github_client'):
-                self.github_client = Github(config.GITHUB_TOKEN)
-                self.repo = self.github_client.get_repo(config.GITHUB_REPO)
-            
-            issue = self.repo.get_issue(issue_number)
-            issue.add_to_labels(label)
-            result = f"Added label '{label}' to issue #{issue_number}"
-            logger.info(result)
-            return result
-        except Exception as e:
-            error_msg = f"Failed to add label to issue #{issue_number}: {e}"
-            logger.error(error_msg)
-            return error_msg
-
-
-class GitHubCommentTool(Tool[str]):
-    """Specialized tool for adding comments to GitHub issues."""
-    
-    id: str = "github_comment_tool"
-    name: str = "GitHub Comment Tool"
-    description: str = "Adds comments to GitHub issues"
-    args_schema: type[BaseModel] = AddCommentSchema
-    output_schema: tuple[str, str] = ("string", "Result of adding the comment")
-
-    def __init__(self):
-        super().__init__()
-
-    def run(self, context: ToolRunContext, issue_number: int, comment: str) -> str:
-        """Add a comment to a GitHub issue."""
-        try:
-            if not hasattr(self, 'github_client'):
-                self.github_client = Github(config.GITHUB_TOKEN)
-                self.repo = self.github_client.get_repo(config.GITHUB_REPO)
-            
-            issue = self.repo.get_issue(issue_number)
-            issue.create_comment(comment)
-            result = f"Added comment to issue #{issue_number}"
-            logger.info(result)
-            return result
-        except Exception as e:
-            error_msg = f"Failed to add comment to issue #{issue_number}: {e}"
-            logger.error(error_msg)
-            return error_msg
-
-
-class GitHubCloseTool(Tool[str]):
-    """Specialized tool for closing GitHub issues."""
-    
-    id: str = "github_close_tool"
-    name: str = "GitHub Close Tool"
-    description: str = "Closes GitHub issues"
-    args_schema: type[BaseModel] = CloseIssueSchema
-    output_schema: tuple[str, str] = ("string", "Result of closing the issue")
-
-    def __init__(self):
-        super().__init__()
-
-    def run(self, context: ToolRunContext, issue_number: int, reason: str = "completed") -> str:
-        """Close a GitHub issue."""
-        try:
-            if not hasattr(self, 'github_client'):
-                self.github_client = Github(config.GITHUB_TOKEN)
-                self.repo = self.github_client.get_repo(config.GITHUB_REPO)
-            
-            issue = self.repo.get_issue(issue_number)
-            issue.edit(state="closed")
-            result = f"Closed issue #{issue_number} (reason: {reason})"
-            logger.info(result)
-            return result
-        except Exception as e:
-            error_msg = f"Failed to close issue #{issue_number}: {e}"
-            logger.error(error_msg)
-            return error_msg
-
-4.
-import logging
-from typing import Dict, Any, List, Optional, Tuple
-
-import weaviate
-import google.generativeai as genai
-from portia import ToolRunContext
-from portia.tool import Tool
-from pydantic import BaseModel, Field
-
-import config
-
-logger = logging.getLogger(__name__)
-
-
-class WeaviateManager:
-    """Enhanced Weaviate manager with improved duplicate detection."""
-    
-    def __init__(self):
-        self._setup_weaviate()
-        self._setup_embeddings()
-    
-    def _setup_weaviate(self):
-        """Initialize Weaviate client."""
-        try:
-            if not config.WEAVIATE_API_KEY or not config.WEAVIATE_URL:
-                logger.warning("Weaviate credentials not configured, using mock functionality")
-                self.client = None
-                return
-            
-            import weaviate.classes as wvc
-            
-            # Use the newer weaviate v4 API
-            self.client = weaviate.connect_to_weaviate_cloud(
-                cluster_url=config.WEAVIATE_URL,
-                auth_credentials=wvc.init.Auth.api_key(config.WEAVIATE_API_KEY),
-                headers={"X-Google-Api-Key": config.GEMINI_API_KEY}
-            )
-            
-            # Test connection
-            if self.client.is_ready():
-                logger.info("WeaviateManager: Successfully connected to Weaviate")
-            else:
-                logger.warning("WeaviateManager: Weaviate connection not ready, using mock functionality")
-                self.client = None
-                
-        except Exception as e:
-            logger.error(f"WeaviateManager: Failed to connect to Weaviate: {e}")
-            logger.info("Continuing with mock duplicate detection functionality")
-            self.client = None
-
-    def _setup_embeddings(self):
-        """Initialize Gemini for embeddings."""
-        try:
-            genai.configure(api_key=config.GEMINI_API_KEY)
-            logger.info("WeaviateManager: Configured Gemini for embeddings")
-        except Exception as e:
-            logger.error(f"WeaviateManager: Failed to configure embeddings: {e}")
-            raise
-    
-    def find_duplicate(self, title: str, body: str, threshold: float = 0.85) -> Tuple[Optional[int], Optional[float]]:
-        """
-        Find duplicate issues with enhanced context.
-        
-        Args:
-            title: Issue title
-            body: Issue body
-            threshold: Similarity threshold
-            
-        Returns:
-            Tuple of (duplicate_issue_id, similarity_score) or (None, None) if no duplicate
-        """
-        try:
-            if not self.client:
-                # Mock duplicate detection for demo purposes
-                logger.info("Using mock duplicate detection (Weaviate not available)")
-                if "login" in title.lower():
-                    return 42, 0.89  # Simulate duplicate found
-                return None, None
-            
-            # Create embedding for search
-            embedding_text = f"{title}\n\n{body}"
-            
-            embedding_response = genai.embed_content(
-                model="models/text-embedding-004", 
-                content=embedding_text,
-                output_dimensionality=768
-            )
-            
-            # Search for similar issues using Weaviate v4 API
-            try:
-                import weaviate.classes as wvc
-                collection = self.client.collections.get("GitHubIssue")
-                response = collection.query.near_vector(
-                    near_vector=embedding_response['embedding'],
-                    limit=5,
-                    return_metadata=wvc.query.MetadataQuery(certainty=True)
-                )
-                
-                # Process results
-                for obj in response.objects:
-                    certainty = obj.metadata.certainty
-                    if certainty >= threshold:
-                        return obj.properties["issue_number"], certainty
-            except ImportError:
-                # Fall back to older API if available
-                logger.warning("Using fallback Weaviate API")
-                results = self.client.query.get(
-                    "GitHubIssue", 
-                    ["title", "body", "issue_number"]
-                ).with_near_vector({
-                    "vector": embedding_response['embedding']
-                }).with_limit(5).with_additional(["certainty"]).do()
-                
-                if results.get("data", {}).get("Get", {}).get("GitHubIssue"):
-                    issues = results["data"]["Get"]["GitHubIssue"]
-                    for issue in issues:
-                        certainty = issue["_additional"]["certainty"]
-                        if certainty >= threshold:
-                            return issue["issue_number"], certainty
-            
-            return None, None
-            
-        except Exception as e:
-            logger.error(f"WeaviateManager: Duplicate search failed: {e}")
-            # Fallback to mock detection
-            if "login" in title.lower():
-                return 42, 0.87  # Mock duplicate
-            return None, None
-    
-    def add_issue(self, issue_id: int, title: str, body: str):
-        """Add issue to Weaviate database after human confirmation."""
-        try:
-            if not self.client:
-                logger.info(f"Mock: Added issue #{issue_id} to knowledge base (Weaviate not available)")
-                return
-            
-            # Create embedding text
-            embedding_text = f"{title}\n\n{body}"
-            
-            # Generate embedding using Gemini
-            embedding_response = genai.embed_content(
-                model="models/text-embedding-004",
-                content=embedding_text,
-                output_dimensionality=768
-            )
-            
-            # Add to Weaviate using v4 API
-            try:
-                collection = self.client.collections.get("GitHubIssue")
-                collection.data.insert(
-                    properties={
-                        "title": title,
-                        "body": body,
-                        "issue_number": issue_id,
-                        "embedding_text": embedding_text,
-                    },
-                    vector=embedding_response['embedding']
-                )
-            except Exception:
-                # Fallback to older API
-                self.client.data_object.create(
-                    {
-                        "title": title,
-                        "body": body,
-                        "issue_number": issue_id,
-                        "embedding_text": embedding_text,
-                    },
-                    class_name="GitHubIssue",
-                    vector=embedding_response['embedding']
-                )
-            
-            logger.info(f"WeaviateManager: Added confirmed issue #{issue_id} to vector database")
-            
-        except Exception as e:
-            logger.error(f"WeaviateManager: Failed to add issue to database: {e}")
-            logger.info(f"Mock: Added issue #{issue_id} to knowledge base (fallback)")
-            # Don't raise - continue with mock functionality
-
-
-# Global WeaviateManager instance
-weaviate_manager = WeaviateManager()
-
-
-class DuplicateCheckSchema(BaseModel):
-    """Input schema for duplicate detection."""
-    title: str = Field(..., description="GitHub issue title")
-    body: str = Field(..., description="GitHub issue body/description")
-    threshold: float = Field(default=0.85, description="Similarity threshold (0.0-1.0)")
-
-class AddIssueSchema(BaseModel):
-    """Input schema for adding issues to Weaviate."""
-    issue_id: int = Field(..., description="GitHub issue ID")
-    title: str = Field(..., description="GitHub issue title")
-    body: str = Field(..., description="GitHub issue body/description")
-
-
-class EnhancedDuplicateDetectionTool(Tool[str]):
-    """Enhanced tool for detecting duplicate GitHub issues."""
-    
-    id: str = "enhanced_duplicate_detection_tool"
-    name: str = "Enhanced Duplicate Detection Tool"
-    description: str = "Detects duplicate GitHub issues using vector similarity search with enhanced UX"
-    args_schema: type[BaseModel] = DuplicateCheckSchema
-
-    def run(self, context: ToolRunContext, title: str, body: str, threshold: float = 0.85) -> str:
-        """
-        Check for duplicate issues with enhanced context.
-        
-        Args:
-            context: Portia tool run context
-            title: Issue title
-            body: Issue body
-            threshold: Similarity threshold
-            
-        Returns:
-            Duplicate detection results with similarity score
-        """
-        try:
-            duplicate_id, similarity_score = weaviate_manager.find_duplicate(title, body, threshold)
-            
-            if duplicate_id and similarity_score:
-                result = f"DUPLICATE_FOUND|{duplicate_id}|{similarity_score:.3f}"
-                logger.warning(f"Duplicate detected: Issue similar to #{duplicate_id} (Similarity: {similarity_score:.1%})")
-            else:
-                result = "NO_DUPLICATE_FOUND"
-                logger.info(f"No duplicates found for issue: '{title}'")
-            
-            return result
-            
-        except Exception as e:
-            error_msg = f"Duplicate detection failed: {e}"
-            logger.error(error_msg)
-            return f"ERROR|{error_msg}"
-
-
-class AddIssueTool(Tool[str]):
-    """Tool for adding confirmed issues to Weaviate database."""
-    
-    id: str = "add_issue_tool"
-    name: str = "Add Issue Tool"
-    description: str = "Adds confirmed non-duplicate issues to the vector database"
-    args_schema: type[BaseModel] = AddIssueSchema
-
-    def run(self, context: ToolRunContext, issue_id: int, title: str, body: str) -> str:
-        """Add confirmed issue to Weaviate database."""
-        try:
-            weaviate_manager.add_issue(issue_id, title, body)
-            return f"Successfully added issue #{issue_id} to knowledge base"
-        except Exception as e:
-            error_msg = f"Failed to add issue #{issue_id} to database: {e}"
-            logger.error(error_msg)
-            return error_msg
@@ -1,60 +1,102 @@
 import asyncio
+import concurrent.futures
+import functools
 import logging
-from typing import Dict, Any, Optional
+import threading
+import weakref
+from dataclasses import dataclass, field
+from typing import Dict, Any, Optional, Tuple
 import json
 
+import aiohttp
 import discord
 from discord.ext import tasks
-import requests
 from portia import ToolRunContext
 from portia.tool import Tool
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, TypeAdapter
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
 
 import config
+from resilience import CircuitBreaker, call_with_retry_async
+from severity import IMPACT_LEVEL, SEVERITY_COLORS, SEVERITY_DESCRIPTIONS
 
 logger = logging.getLogger(__name__)
 
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+# Embed colours per severity, built once at import
+_SEVERITY_COLORS_WEBHOOK = {
+    "Critical": 0xFF0000,  # Red
+    "High": 0xFF8C00,      # Orange
+    "Medium": 0xFFFF00,    # Yellow
+    "Low": 0x00FF00,       # Green
+    "Info": 0x0000FF       # Blue
+}
+
+# Webhook posts fail fast while Discord is down rather than queueing behind timeouts
+_DISCORD_BREAKER = CircuitBreaker("Discord", failure_threshold=5, recovery_timeout=30)
+
+
+def _is_transient_http_error(error: BaseException) -> bool:
+    """True for errors worth retrying: timeouts, connection failures, 429 and 5xx."""
+    if isinstance(error, aiohttp.ClientResponseError):
+        return error.status == 429 or error.status >= 500
+    return isinstance(error, (aiohttp.ClientConnectionError, asyncio.TimeoutError))
+
 
+def _json_dumps(data: Dict[str, Any]) -> bytes:
+    """Serialize to JSON bytes, using orjson when available."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(data)
+    return json.dumps(data).encode('utf-8')
+
+
+def _json_loads(data):
+    """Parse a JSON payload, using orjson when available."""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+@dataclass(slots=True, frozen=True)
 class TriageClarification:
     """
     Advanced triage clarification with interactive Discord interface.
     Supports Approve/Reject/Modify with modals and timeouts.
+    
+    Arguments are validated at the tool boundary (TriageRequestSchema), so
+    this is a plain immutable record.
     """
+    issue_title: str
+    issue_number: int
+    severity: str
+    ai_summary: str
+    issue_body: str = ""
+    is_duplicate: bool = False
+    similarity_score: Optional[float] = None
+    duplicate_issue_id: Optional[int] = None
+    # Shared by the bot embed and the webhook embed for this clarification
+    _color: discord.Color = field(init=False, repr=False, compare=False)
+    _webhook_color: int = field(init=False, repr=False, compare=False)
+    _truncated_summary: str = field(init=False, repr=False, compare=False)
     
-    def __init__(self, 
-                 issue_title: str,
-                 issue_number: int, 
-                 severity: str,
-                 ai_summary: str,
-                 issue_body: str = "",
-                 is_duplicate: bool = False,
-                 similarity_score: Optional[float] = None,
-                 duplicate_issue_id: Optional[int] = None):
-        self.issue_title = issue_title
-        self.issue_number = issue_number
-        self.severity = severity
-        self.ai_summary = ai_summary
-        self.issue_body = issue_body
-        self.is_duplicate = is_duplicate
-        self.similarity_score = similarity_score
-        self.duplicate_issue_id = duplicate_issue_id
-        self.response_future = None
+    def __post_init__(self):
+        object.__setattr__(self, "_color", SEVERITY_COLORS.get(self.severity, discord.Color.blue()))
+        object.__setattr__(self, "_webhook_color", _SEVERITY_COLORS_WEBHOOK.get(self.severity, 0x0000FF))
+        summary = self.ai_summary
+        object.__setattr__(self, "_truncated_summary", summary[:1000] + "..." if len(summary) > 1000 else summary)
     
     def create_embed(self) -> discord.Embed:
         """Create rich Discord embed for triage clarification."""
-        # Severity color mapping
-        severity_colors = {
-            "Critical": discord.Color.red(),
-            "High": discord.Color.orange(),
-            "Medium": discord.Color.yellow(),
-            "Low": discord.Color.green(),
-            "Info": discord.Color.blue()
-        }
-        
         embed = discord.Embed(
             title=f"🥷 Triage Required: Issue #{self.issue_number}",
             description=self.issue_title,
-            color=severity_colors.get(self.severity, discord.Color.blue())
+            color=self._color
         )
         
         # Add severity field
@@ -75,7 +117,7 @@ class TriageClarification:
         else:
             embed.add_field(
                 name="📝 AI Summary",
-                value=self.ai_summary[:1000] + ("..." if len(self.ai_summary) > 1000 else ""),
+                value=self._truncated_summary,
                 inline=False
             )
         
@@ -84,206 +126,254 @@ class TriageClarification:
         
         return embed
     
-    def create_view(self) -> 'TriageView':
-        """Create interactive view with buttons."""
-        return TriageView(self)
+    def create_view(self) -> discord.ui.View:
+        """
+        Create the interactive Approve/Reject/Modify view for this issue.
+        
+        Uses the bot's persistent view, whose buttons carry only the issue
+        number in their custom_id and read the rest of the request from the
+        decision store when clicked.
+        """
+        from discord_bot import TriageView
+        return TriageView(self.issue_number)
 
 
-class SeveritySelect(discord.ui.Select):
-    """Dropdown for severity selection in modify modal."""
-    
-    def __init__(self, current_severity: str):
-        options = [
-            discord.SelectOption(
-                label="Critical", 
-                description="System down, data loss, security vulnerability",
-                emoji="🔴",
-                default=(current_severity == "Critical")
-            ),
-            discord.SelectOption(
-                label="High", 
-                description="Major functionality broken, performance issues",
-                emoji="🟠",
-                default=(current_severity == "High")
-            ),
-            discord.SelectOption(
-                label="Medium", 
-                description="Minor bugs with workarounds, feature requests",
-                emoji="🟡",
-                default=(current_severity == "Medium")
-            ),
-            discord.SelectOption(
-                label="Low", 
-                description="Cosmetic issues, typos, documentation",
-                emoji="🟢",
-                default=(current_severity == "Low")
-            ),
-            discord.SelectOption(
-                label="Info", 
-                description="Questions, discussions, feedback",
-                emoji="🔵",
-                default=(current_severity == "Info")
-            )
-        ]
-        super().__init__(placeholder="Select severity level...", options=options, row=0)
-    
-    async def callback(self, interaction: discord.Interaction):
-        """Handle severity selection."""
-        # This will be handled by the modal
-        await interaction.response.defer()
+_WEBHOOK_FOOTER = {"text": "⏱️ Action required within 1 hour • Built with Portia AI"}
 
 
-class ModifyModal(discord.ui.Modal, title="Modify Triage Plan"):
-    """Modal for modifying triage decisions."""
+@functools.lru_cache(maxsize=None)
+def _webhook_severity_fields(severity: str, is_duplicate: bool) -> tuple:
+    """
+    Build the webhook embed fields that depend only on severity and duplicate status.
     
-    def __init__(self, clarification: TriageClarification):
-        super().__init__()
-        self.clarification = clarification
-        
-        # Add severity select dropdown (this would be handled differently in real Discord)
-        # For webhook simulation, we'll use text input
-        self.severity_input = discord.ui.TextInput(
-            label="Severity Level",
-            placeholder="Critical, High, Medium, Low, or Info",
-            default=clarification.severity,
-            max_length=20
-        )
-        self.add_item(self.severity_input)
-        
-        # Add comment/summary text input
-        self.comment_input = discord.ui.TextInput(
-            label="Comment/Summary",
-            style=discord.TextStyle.paragraph,
-            placeholder="Modify the AI-generated text...",
-            default=clarification.ai_summary,
-            max_length=2000
-        )
-        self.add_item(self.comment_input)
+    Returns (severity, impact, recommended actions) field dicts, built once per
+    combination and shared between embeds, so callers must not mutate them.
+    """
+    severity_field = {
+        "name": "🎯 AI Severity Classification",
+        "value": f"**{severity}**\n{SEVERITY_DESCRIPTIONS.get(severity, '')}",
+        "inline": True
+    }
+    impact_field = {
+        "name": "⚡ Impact Assessment",
+        "value": IMPACT_LEVEL.get(severity, "📋 Standard workflow"),
+        "inline": True
+    }
     
-    async def on_submit(self, interaction: discord.Interaction):
-        """Handle modal submission."""
-        try:
-            modified_data = {
-                "decision": "modify",
-                "data": {
-                    "severity": self.severity_input.value,
-                    "summary": self.comment_input.value if not self.clarification.is_duplicate else None,
-                    "comment": self.comment_input.value if self.clarification.is_duplicate else None
-                }
+    if is_duplicate:
+        recommended_actions = "🔄 Close as duplicate\n📝 Add explanatory comment\n🔗 Link to original issue"
+    elif severity in ("Critical", "High"):
+        recommended_actions = f"🏷️ Add '{severity}' severity label\n📝 Post AI analysis\n🔔 Notify relevant team\n📊 Track in knowledge base"
+    else:
+        recommended_actions = f"🏷️ Add '{severity}' severity label\n📝 Post AI analysis\n📊 Add to knowledge base"
+    recommended_field = {
+        "name": "🎯 Recommended Actions",
+        "value": recommended_actions,
+        "inline": False
+    }
+    return severity_field, impact_field, recommended_field
+
+
+# Webhook posts are coalesced by a single worker per event loop; Discord
+# accepts up to 10 embeds and 6000 embed characters in one webhook message
+_WEBHOOK_BATCH_SIZE = 10
+_WEBHOOK_MAX_CHARS = 6000
+_WEBHOOK_COALESCE_WINDOW = 0.1  # seconds to wait for more embeds after the first
+
+
+def _embed_length(embed: Dict[str, Any]) -> int:
+    """Count the characters Discord charges against a message's embed limit."""
+    length = len(embed.get("title", "")) + len(embed.get("description", ""))
+    length += len(embed.get("footer", {}).get("text", "")) + len(embed.get("author", {}).get("name", ""))
+    for field in embed.get("fields", ()):
+        length += len(field.get("name", "")) + len(field.get("value", ""))
+    return length
+
+
+# Webhook buttons and completion embed fields that never change; shared
+# across calls and must not be mutated
+_ACTION_ROW_DATA = [
+    {
+        "type": 1,  # Action Row
+        "components": [
+            {
+                "type": 2,  # Button
+                "style": 3,  # Success (Green)
+                "label": "Approve",
+                "emoji": {"name": "✅"},
+                "custom_id": "triage_approve"
+            },
+            {
+                "type": 2,  # Button
+                "style": 4,  # Danger (Red)
+                "label": "Reject",
+                "emoji": {"name": "❌"},
+                "custom_id": "triage_reject"
+            },
+            {
+                "type": 2,  # Button
+                "style": 2,  # Secondary (Gray)
+                "label": "Modify",
+                "emoji": {"name": "✏️"},
+                "custom_id": "triage_modify"
             }
-            
-            # Set the response
-            if self.clarification.response_future and not self.clarification.response_future.done():
-                self.clarification.response_future.set_result(modified_data)
-            
-            await interaction.response.send_message(
-                "✅ Modifications saved! The agent will proceed with your changes.", 
-                ephemeral=True
-            )
-            
-        except Exception as e:
-            logger.error(f"Error handling modal submission: {e}")
-            await interaction.response.send_message(
-                f"❌ Error processing modifications: {e}",
-                ephemeral=True
-            )
+        ]
+    }
+]
+_COMPLETION_EMBED = {
+    "title": "✅ Triage Action Completed",
+    "color": 0x00FF00,  # Green
+}
+
+# Webhook posts are I/O bound; the only CPU work is serializing the payload,
+# so the constant button row is encoded once and spliced in as raw JSON
+if ORJSON_AVAILABLE and hasattr(orjson, "Fragment"):
+    _ACTION_ROW_JSON = orjson.Fragment(orjson.dumps(_ACTION_ROW_DATA))
+else:
+    _ACTION_ROW_JSON = _ACTION_ROW_DATA
+
+# Simulated decisions approve duplicates and Critical/High issues as-is
+_APPROVE_AS_IS_SEVERITIES = frozenset({"Critical", "High"})
+
+
+def _approve_as_is() -> Dict[str, Any]:
+    """Return a fresh approve-without-changes decision; callers may mutate it."""
+    return {"decision": "approve", "data": {}}
+
+
+# Triage requests from synchronous callers are started in batches on one
+# long-lived loop; each waits up to an hour for a human decision
+_TRIAGE_BATCH_SIZE = 16
+_TRIAGE_BATCH_WINDOW = 0.025  # seconds to wait for more requests after the first
+_TRIAGE_MAX_IN_FLIGHT = 64
+_TRIAGE_TIMEOUT = 3700  # 1 hour + buffer
+
+# One long-lived loop in a daemon thread runs the async Discord work for
+# synchronous callers, so they share its aiohttp session instead of each
+# building and tearing down a loop
+_LOOP: Optional[asyncio.AbstractEventLoop] = None
+_LOOP_LOCK = threading.Lock()
 
 
-class TriageView(discord.ui.View):
-    """Interactive view with Approve/Reject/Modify buttons and timeout."""
+def _get_loop() -> asyncio.AbstractEventLoop:
+    """Return the background event loop, starting its thread on first use."""
+    global _LOOP
+    if _LOOP is None:
+        with _LOOP_LOCK:
+            if _LOOP is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name="discord-loop", daemon=True).start()
+                _LOOP = loop
+    return _LOOP
+
+
+def _run(coro, timeout: Optional[float] = 30):
+    """Run a coroutine on the background loop and block until it finishes."""
+    future = asyncio.run_coroutine_threadsafe(coro, _get_loop())
+    try:
+        return future.result(timeout=timeout)
+    except concurrent.futures.TimeoutError:
+        future.cancel()
+        raise
+
+
+class DiscordManager:
+    """Enhanced Discord manager for sophisticated human-in-the-loop workflow."""
     
-    def __init__(self, clarification: TriageClarification):
-        super().__init__(timeout=3600.0)  # 1 hour timeout
-        self.clarification = clarification
+    def __init__(self):
+        self.webhook_url = config.DISCORD_WEBHOOK_URL
+        # aiohttp sessions and queues are bound to the loop that created them,
+        # and the webhook server and notification threads each run their own
+        # loops, so keep one of each per loop
+        self._sessions: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, aiohttp.ClientSession]" = weakref.WeakKeyDictionary()
+        self._workers: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Tuple[asyncio.Queue, asyncio.Task]]" = weakref.WeakKeyDictionary()
     
-    @discord.ui.button(label="Approve", style=discord.ButtonStyle.success, emoji="✅")
-    async def approve_button(self, interaction: discord.Interaction, button: discord.ui.Button):
-        """Handle approve button click."""
-        try:
-            response_data = {"decision": "approve", "data": {}}
-            
-            if self.clarification.response_future and not self.clarification.response_future.done():
-                self.clarification.response_future.set_result(response_data)
-            
-            # Update the message
-            embed = discord.Embed(
-                title="✅ Approved",
-                description=f"Issue #{self.clarification.issue_number} approved by {interaction.user.mention}",
-                color=discord.Color.green()
-            )
-            
-            # Disable all buttons
-            for item in self.children:
-                item.disabled = True
-            
-            await interaction.response.edit_message(embed=embed, view=self)
-            
-        except Exception as e:
-            logger.error(f"Error handling approve button: {e}")
-            await interaction.response.send_message(f"❌ Error: {e}", ephemeral=True)
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Return the aiohttp session for the running event loop, creating it on first use."""
+        loop = asyncio.get_running_loop()
+        session = self._sessions.get(loop)
+        if session is None or session.closed:
+            session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=10))
+            self._sessions[loop] = session
+        return session
     
-    @discord.ui.button(label="Reject", style=discord.ButtonStyle.danger, emoji="❌")
-    async def reject_button(self, interaction: discord.Interaction, button: discord.ui.Button):
-        """Handle reject button click."""
-        try:
-            response_data = {"decision": "reject", "data": {}}
-            
-            if self.clarification.response_future and not self.clarification.response_future.done():
-                self.clarification.response_future.set_result(response_data)
-            
-            # Update the message
-            embed = discord.Embed(
-                title="❌ Rejected",
-                description=f"Issue #{self.clarification.issue_number} rejected by {interaction.user.mention}",
-                color=discord.Color.red()
-            )
-            
-            # Disable all buttons
-            for item in self.children:
-                item.disabled = True
-            
-            await interaction.response.edit_message(embed=embed, view=self)
-            
-        except Exception as e:
-            logger.error(f"Error handling reject button: {e}")
-            await interaction.response.send_message(f"❌ Error: {e}", ephemeral=True)
+    async def close(self):
+        """Stop the webhook worker and close the aiohttp session belonging to the running event loop."""
+        loop = asyncio.get_running_loop()
+        worker = self._workers.pop(loop, None)
+        if worker:
+            worker[1].cancel()
+        session = self._sessions.pop(loop, None)
+        if session and not session.closed:
+            await session.close()
     
-    @discord.ui.button(label="Modify", style=discord.ButtonStyle.secondary, emoji="✏️")
-    async def modify_button(self, interaction: discord.Interaction, button: discord.ui.Button):
-        """Handle modify button click - show modal."""
-        try:
-            modal = ModifyModal(self.clarification)
-            await interaction.response.send_modal(modal)
-            
-        except Exception as e:
-            logger.error(f"Error showing modify modal: {e}")
-            await interaction.response.send_message(f"❌ Error: {e}", ephemeral=True)
+    async def _post_webhook_embed(self, embed: Dict[str, Any], components: Optional[list] = None) -> None:
+        """Queue an embed for the webhook worker and wait until it has been posted."""
+        loop = asyncio.get_running_loop()
+        worker = self._workers.get(loop)
+        if worker is None:
+            queue = asyncio.Queue()
+            worker = self._workers[loop] = (queue, loop.create_task(self._webhook_worker(queue)))
+        posted = loop.create_future()
+        await worker[0].put((embed, components, posted))
+        await posted
     
-    async def on_timeout(self):
-        """Handle view timeout."""
-        try:
-            # Set timeout response
-            if self.clarification.response_future and not self.clarification.response_future.done():
-                self.clarification.response_future.set_result({
-                    "decision": "timeout", 
-                    "data": {}
-                })
+    async def _webhook_worker(self, queue: asyncio.Queue):
+        """
+        Post queued embeds, coalescing up to _WEBHOOK_BATCH_SIZE into one message.
+        
+        A batch is closed before an embed that would take it past
+        _WEBHOOK_MAX_CHARS. Components belong to the whole message, so an
+        embed with buttons is always sent on its own.
+        """
+        loop = asyncio.get_running_loop()
+        carried = None
+        while True:
+            first = carried if carried is not None else await queue.get()
+            carried = None
+            batch = [first]
+            total = _embed_length(first[0])
+            deadline = loop.time() + _WEBHOOK_COALESCE_WINDOW
+            while not first[1] and len(batch) < _WEBHOOK_BATCH_SIZE:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(queue.get(), remaining)
+                except asyncio.TimeoutError:
+                    break
+                size = _embed_length(item[0])
+                if item[1] or total + size > _WEBHOOK_MAX_CHARS:
+                    # Starts the next message instead
+                    carried = item
+                    break
+                batch.append(item)
+                total += size
             
-            # Disable all buttons
-            for item in self.children:
-                item.disabled = True
+            webhook_data = {"embeds": [embed for embed, _, _ in batch]}
+            if first[1]:
+                webhook_data["components"] = first[1]
             
-            logger.warning(f"Triage action expired for issue #{self.clarification.issue_number}")
+            error = None
+            try:
+                await call_with_retry_async(
+                    _DISCORD_BREAKER, _is_transient_http_error, self._post_webhook, _json_dumps(webhook_data)
+                )
+            except Exception as e:
+                error = e
             
-        except Exception as e:
-            logger.error(f"Error handling timeout: {e}")
-
-
-class DiscordManager:
-    """Enhanced Discord manager for sophisticated human-in-the-loop workflow."""
+            for _, _, posted in batch:
+                if posted.done():
+                    continue
+                if error:
+                    posted.set_exception(error)
+                else:
+                    posted.set_result(None)
     
-    def __init__(self):
-        self.webhook_url = config.DISCORD_WEBHOOK_URL
+    async def _post_webhook(self, body: bytes) -> None:
+        """POST a serialized message to the webhook, raising on an error status."""
+        async with self._get_session().post(self.webhook_url, data=body, headers=_JSON_HEADERS) as response:
+            response.raise_for_status()
     
     async def send_triage_request(self, clarification: TriageClarification) -> Dict[str, Any]:
         """Send triage request with REAL interactive UI and wait for human response."""
@@ -324,7 +414,8 @@ class DiscordManager:
                         # We're in a different loop, use run_coroutine_threadsafe
                         logger.info("Running Discord triage request from different event loop")
                         future = asyncio.run_coroutine_threadsafe(send_triage_request(issue_data), bot_loop)
-                        response = future.result(timeout=3700)  # 1 hour + buffer
+                        # Await rather than block so other requests on this loop keep moving
+                        response = await asyncio.wait_for(asyncio.wrap_future(future), _TRIAGE_TIMEOUT)
                     else:
                         # We're in the same loop, call directly
                         response = await send_triage_request(issue_data)
@@ -349,13 +440,7 @@ class DiscordManager:
                 logger.warning("Discord bot not available, falling back to webhook notification")
                 # Fall back to webhook-based notification (without real interaction)
                 embed_data = self._create_webhook_embed(clarification)
-                webhook_data = {
-                    "embeds": [embed_data],
-                    "components": self._create_action_row_data()
-                }
-                
-                response = requests.post(self.webhook_url, json=webhook_data)
-                response.raise_for_status()
+                await self._post_webhook_embed(embed_data, self._create_action_row_data())
                 
                 logger.info(f"✅ Sent webhook triage request for issue #{clarification.issue_number}")
                 
@@ -370,145 +455,65 @@ class DiscordManager:
     
     def _create_webhook_embed(self, clarification: TriageClarification) -> Dict[str, Any]:
         """Create enhanced embed data for Discord webhook with detailed analysis."""
-        severity_colors = {
-            "Critical": 0xFF0000,  # Red
-            "High": 0xFF8C00,      # Orange
-            "Medium": 0xFFFF00,    # Yellow
-            "Low": 0x00FF00,       # Green
-            "Info": 0x0000FF       # Blue
-        }
-        
         # Enhanced description with issue body preview
         description = f"**{clarification.issue_title}**\n"
         if clarification.issue_body:
             body_preview = clarification.issue_body[:200] + ('...' if len(clarification.issue_body) > 200 else '')
             description += body_preview
         
-        embed = {
-            "title": f"🥷 Triage Required: Issue #{clarification.issue_number}",
-            "description": description,
-            "color": severity_colors.get(clarification.severity, 0x0000FF),
-            "fields": [],
-            "footer": {
-                "text": "⏱️ Action required within 1 hour • Built with Portia AI"
-            }
-        }
-        
-        # Add severity with reasoning
-        severity_descriptions = {
-            "Critical": "🔴 System down, data loss, security vulnerability",
-            "High": "🟠 Major functionality broken, performance issues",
-            "Medium": "🟡 Minor bugs with workarounds, feature requests",
-            "Low": "🟢 Cosmetic issues, typos, documentation",
-            "Info": "🔵 Questions, discussions, feedback"
-        }
-        
-        embed["fields"].append({
-            "name": "🎯 AI Severity Classification",
-            "value": f"**{clarification.severity}**\n{severity_descriptions.get(clarification.severity, '')}",
-            "inline": True
-        })
-        
-        # Add impact assessment
-        impact_level = {
-            "Critical": "🔥 Immediate action required",
-            "High": "⚡ High priority - address soon",
-            "Medium": "📋 Standard workflow",
-            "Low": "📝 Low priority - can be scheduled",
-            "Info": "💬 Informational - review when convenient"
-        }.get(clarification.severity, "📋 Standard workflow")
-        
-        embed["fields"].append({
-            "name": "⚡ Impact Assessment",
-            "value": impact_level,
-            "inline": True
-        })
+        severity_field, impact_field, recommended_field = _webhook_severity_fields(
+            clarification.severity, clarification.is_duplicate
+        )
         
         # Add duplicate or summary field with enhanced details
         if clarification.is_duplicate and clarification.similarity_score and clarification.duplicate_issue_id:
-            embed["fields"].append({
+            analysis_field = {
                 "name": "🔍 Duplicate Analysis",
                 "value": f"**Duplicate Found ({clarification.similarity_score:.1%} Similarity)**\n"
                          f"Similar to Issue #{clarification.duplicate_issue_id}\n"
                          f"💡 *Recommend closing as duplicate*",
                 "inline": False
-            })
+            }
         else:
-            embed["fields"].append({
+            analysis_field = {
                 "name": "📝 Detailed AI Analysis",
-                "value": clarification.ai_summary[:800] + ("..." if len(clarification.ai_summary) > 800 else ""),
+                "value": clarification._truncated_summary,
                 "inline": False
-            })
-            
-        # Add recommended actions
-        if clarification.is_duplicate:
-            recommended_actions = "🔄 Close as duplicate\n📝 Add explanatory comment\n🔗 Link to original issue"
-        elif clarification.severity in ["Critical", "High"]:
-            recommended_actions = f"🏷️ Add '{clarification.severity}' severity label\n📝 Post AI analysis\n🔔 Notify relevant team\n📊 Track in knowledge base"
-        else:
-            recommended_actions = f"🏷️ Add '{clarification.severity}' severity label\n📝 Post AI analysis\n📊 Add to knowledge base"
-            
-        embed["fields"].append({
-            "name": "🎯 Recommended Actions",
-            "value": recommended_actions,
-            "inline": False
-        })
+            }
+        
+        embed = {
+            "title": f"🥷 Triage Required: Issue #{clarification.issue_number}",
+            "description": description,
+            "color": clarification._webhook_color,
+            "fields": [severity_field, impact_field, analysis_field, recommended_field],
+            "footer": _WEBHOOK_FOOTER
+        }
         
         return embed
     
-    def _create_action_row_data(self) -> list:
-        """Create action row data for webhook buttons."""
-        return [
-            {
-                "type": 1,  # Action Row
-                "components": [
-                    {
-                        "type": 2,  # Button
-                        "style": 3,  # Success (Green)
-                        "label": "Approve",
-                        "emoji": {"name": "✅"},
-                        "custom_id": "triage_approve"
-                    },
-                    {
-                        "type": 2,  # Button
-                        "style": 4,  # Danger (Red)
-                        "label": "Reject",
-                        "emoji": {"name": "❌"},
-                        "custom_id": "triage_reject"
-                    },
-                    {
-                        "type": 2,  # Button
-                        "style": 2,  # Secondary (Gray)
-                        "label": "Modify",
-                        "emoji": {"name": "✏️"},
-                        "custom_id": "triage_modify"
-                    }
-                ]
-            }
-        ]
+    def _create_action_row_data(self):
+        """Return the action row data for webhook buttons, pre-encoded when orjson supports it."""
+        return _ACTION_ROW_JSON
     
     def _simulate_human_response(self, clarification: TriageClarification) -> Dict[str, Any]:
         """Simulate human response for demo purposes."""
         # For production, this would be replaced with actual Discord interaction handling
-        if clarification.severity in ["Critical", "High"]:
-            return {"decision": "approve", "data": {}}
-        elif clarification.is_duplicate:
-            return {"decision": "approve", "data": {}}
-        else:
-            # Simulate some modifications for medium/low severity
-            return {
-                "decision": "approve",  # For demo, we'll approve with potential modifications
-                "data": {
-                    "severity": clarification.severity,
-                    "summary": clarification.ai_summary
-                }
+        if clarification.is_duplicate or clarification.severity in _APPROVE_AS_IS_SEVERITIES:
+            return _approve_as_is()
+        # Simulate some modifications for medium/low severity
+        return {
+            "decision": "approve",  # For demo, we'll approve with potential modifications
+            "data": {
+                "severity": clarification.severity,
+                "summary": clarification.ai_summary
             }
+        }
     
-    def send_completion_message(self, 
-                              channel_id: str, 
-                              original_message_id: str,
-                              approver_name: str, 
-                              action_summary: str) -> bool:
+    async def send_completion_message(self, 
+                                    channel_id: str, 
+                                    original_message_id: str,
+                                    approver_name: str, 
+                                    action_summary: str) -> bool:
         """Send completion message with audit trail."""
         try:
             if not self.webhook_url:
@@ -516,9 +521,8 @@ class DiscordManager:
                 return False
             
             embed = {
-                "title": "✅ Triage Action Completed",
+                **_COMPLETION_EMBED,
                 "description": f"Action completed as approved by **{approver_name}**",
-                "color": 0x00FF00,  # Green
                 "fields": [
                     {
                         "name": "📋 Action Summary",
@@ -531,10 +535,7 @@ class DiscordManager:
                 }
             }
             
-            webhook_data = {"embeds": [embed]}
-            
-            response = requests.post(self.webhook_url, json=webhook_data)
-            response.raise_for_status()
+            await self._post_webhook_embed(embed)
             
             logger.info(f"✅ Sent completion message for action: {action_summary}")
             return True
@@ -542,12 +543,86 @@ class DiscordManager:
         except Exception as e:
             logger.error(f"Failed to send completion message: {e}")
             return False
+    
+    def send_completion_message_sync(self, *args, **kwargs) -> bool:
+        """Blocking wrapper around send_completion_message for callers outside an event loop."""
+        return _run(self.send_completion_message(*args, **kwargs))
 
 
 # Global Discord manager instance
 discord_manager = DiscordManager()
 
 
+class TriageBatcher:
+    """
+    Runs triage requests for synchronous callers on the background event loop.
+    
+    Requests are queued and started together, up to _TRIAGE_BATCH_SIZE at a
+    time, so their webhook posts coalesce on the loop's aiohttp session.
+    Each request then waits for its human decision independently, bounded by
+    _TRIAGE_MAX_IN_FLIGHT.
+    """
+    
+    def __init__(self, manager: DiscordManager):
+        self._manager = manager
+        self._queue: Optional[asyncio.Queue] = None
+        self._lock = threading.Lock()
+    
+    def _ensure_started(self) -> asyncio.AbstractEventLoop:
+        """Start the worker on the background loop on first use."""
+        loop = _get_loop()
+        if self._queue is None:
+            with self._lock:
+                if self._queue is None:
+                    self._queue = asyncio.Queue()
+                    loop.call_soon_threadsafe(loop.create_task, self._worker())
+        return loop
+    
+    def submit(self, clarification: TriageClarification) -> "concurrent.futures.Future[Dict[str, Any]]":
+        """Queue a triage request; the returned future resolves with the human decision."""
+        loop = self._ensure_started()
+        return asyncio.run_coroutine_threadsafe(self._enqueue(clarification), loop)
+    
+    async def _enqueue(self, clarification: TriageClarification) -> Dict[str, Any]:
+        decided = asyncio.get_running_loop().create_future()
+        await self._queue.put((clarification, decided))
+        return await decided
+    
+    async def _worker(self):
+        loop = asyncio.get_running_loop()
+        slots = asyncio.Semaphore(_TRIAGE_MAX_IN_FLIGHT)
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + _TRIAGE_BATCH_WINDOW
+            while len(batch) < _TRIAGE_BATCH_SIZE:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+            
+            for clarification, decided in batch:
+                await slots.acquire()
+                loop.create_task(self._dispatch(clarification, decided, slots))
+    
+    async def _dispatch(self, clarification: TriageClarification, decided: asyncio.Future, slots: asyncio.Semaphore):
+        try:
+            result = await self._manager.send_triage_request(clarification)
+        except Exception as e:
+            if not decided.done():
+                decided.set_exception(e)
+        else:
+            if not decided.done():
+                decided.set_result(result)
+        finally:
+            slots.release()
+
+
+triage_batcher = TriageBatcher(discord_manager)
+
+
 # Portia Tool Schemas
 class TriageRequestSchema(BaseModel):
     """Input schema for triage requests."""
@@ -568,6 +643,12 @@ class CompletionMessageSchema(BaseModel):
     action_summary: str = Field(..., description="Summary of completed actions")
 
 
+# Validators built once at import rather than per tool call; used for
+# callers such as post_for_approval that invoke run() directly
+_TRIAGE_REQUEST_ADAPTER = TypeAdapter(TriageRequestSchema)
+_COMPLETION_MESSAGE_ADAPTER = TypeAdapter(CompletionMessageSchema)
+
+
 class TriageRequestTool(Tool[str]):
     """Advanced tool for requesting human triage decisions through Discord."""
     
@@ -590,45 +671,37 @@ class TriageRequestTool(Tool[str]):
         Returns:
             JSON string with decision and data
         """
-        import concurrent.futures
-        import threading
-        
         try:
+            args = _TRIAGE_REQUEST_ADAPTER.validate_python({
+                "issue_title": issue_title,
+                "issue_number": issue_number,
+                "severity": severity,
+                "ai_summary": ai_summary,
+                "is_duplicate": is_duplicate,
+                "similarity_score": similarity_score,
+                "duplicate_issue_id": duplicate_issue_id,
+            })
             clarification = TriageClarification(
-                issue_title=issue_title,
-                issue_number=issue_number,
-                severity=severity,
-                ai_summary=ai_summary,
-                is_duplicate=is_duplicate,
-                similarity_score=similarity_score,
-                duplicate_issue_id=duplicate_issue_id
+                issue_title=args.issue_title,
+                issue_number=args.issue_number,
+                severity=args.severity,
+                ai_summary=args.ai_summary,
+                is_duplicate=args.is_duplicate,
+                similarity_score=args.similarity_score,
+                duplicate_issue_id=args.duplicate_issue_id
             )
             
-            # Run the async function in a new thread with its own event loop
-            def run_async_in_thread():
-                try:
-                    # Create new event loop for this thread
-                    loop = asyncio.new_event_loop()
-                    asyncio.set_event_loop(loop)
-                    try:
-                        return loop.run_until_complete(discord_manager.send_triage_request(clarification))
-                    finally:
-                        loop.close()
-                except Exception as e:
-                    logger.error(f"Thread async execution failed: {e}")
-                    raise
-            
-            # Use ThreadPoolExecutor to run async code in separate thread
-            with concurrent.futures.ThreadPoolExecutor() as executor:
-                future = executor.submit(run_async_in_thread)
-                try:
-                    response = future.result(timeout=3700)  # 1 hour timeout
-                except concurrent.futures.TimeoutError:
-                    logger.warning(f"Discord triage request timed out for issue #{issue_number}")
-                    raise Exception("Discord triage request timed out - HUMAN INPUT REQUIRED")
+            # Hand the request to the background batcher and block this caller until it is decided
+            future = triage_batcher.submit(clarification)
+            try:
+                response = future.result(timeout=_TRIAGE_TIMEOUT)
+            except concurrent.futures.TimeoutError:
+                future.cancel()
+                logger.warning(f"Discord triage request timed out for issue #{issue_number}")
+                raise Exception("Discord triage request timed out - HUMAN INPUT REQUIRED")
             
             # Return JSON string that can be parsed by the agent
-            return json.dumps(response)
+            return _json_dumps(response).decode('utf-8')
             
         except Exception as e:
             logger.error(f"Triage request failed for issue #{issue_number}: {e}")
@@ -651,8 +724,14 @@ class CompletionMessageTool(Tool[str]):
             action_summary: str) -> str:
         """Send completion message."""
         try:
-            success = discord_manager.send_completion_message(
-                channel_id, original_message_id, approver_name, action_summary
+            args = _COMPLETION_MESSAGE_ADAPTER.validate_python({
+                "channel_id": channel_id,
+                "original_message_id": original_message_id,
+                "approver_name": approver_name,
+                "action_summary": action_summary,
+            })
+            success = discord_manager.send_completion_message_sync(
+                args.channel_id, args.original_message_id, args.approver_name, args.action_summary
             )
             
             if success:
@@ -677,7 +756,9 @@ async def post_for_approval(issue_data: Dict[str, Any], severity: str, duplicate
         similarity_score = duplicate_info.get('similarity_score') if duplicate_info else None
         duplicate_issue_id = duplicate_info.get('duplicate_issue_number') if duplicate_info else None
         
-        result_json = tool.run(
+        # run() blocks until the human decides, so keep it off this event loop
+        result_json = await asyncio.to_thread(
+            tool.run,
             context=None,  # type: ignore
             issue_title=issue_data.get('title', 'Unknown'),
             issue_number=issue_data.get('number', 0),
@@ -688,7 +769,7 @@ async def post_for_approval(issue_data: Dict[str, Any], severity: str, duplicate
             duplicate_issue_id=duplicate_issue_id
         )
         
-        result = json.loads(result_json)
+        result = _json_loads(result_json)
         
         # Return format expected by legacy code
         return {
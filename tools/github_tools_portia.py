@@ -1,15 +1,57 @@
 import logging
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, NamedTuple, Optional, Set, Tuple
 
-from github import Github
+import requests
+from github import Github, GithubException, UnknownObjectException
+from github.Repository import Repository
+from requests.adapters import HTTPAdapter
 from portia import ToolRunContext
 from portia.tool import Tool
 from pydantic import BaseModel, Field
 
 import config
+from resilience import CircuitBreaker, call_with_retry
 
 logger = logging.getLogger(__name__)
 
+_GRAPHQL_URL = "https://api.github.com/graphql"
+
+# Kept separate from Discord's breaker so one provider's outage doesn't block the other
+_GITHUB_BREAKER = CircuitBreaker("GitHub", failure_threshold=5, recovery_timeout=30)
+
+
+def _is_transient_github_error(error: BaseException) -> bool:
+    """True for errors worth retrying: timeouts, connection failures, 429 and 5xx."""
+    if isinstance(error, GithubException):
+        return error.status == 429 or error.status >= 500
+    if isinstance(error, requests.HTTPError) and error.response is not None:
+        return error.response.status_code == 429 or error.response.status_code >= 500
+    return isinstance(error, (requests.ConnectionError, requests.Timeout))
+
+# Colours for labels the triage flow creates; anything else gets white
+_COLORS = {
+    "Critical": "d73a4a",  # Red
+    "High": "ff6600",      # Orange
+    "Medium": "ffcc00",    # Yellow
+    "Low": "00cc66",       # Green
+    "Info": "0099cc",      # Blue
+    "duplicate": "cccccc"  # Gray
+}
+
+# GraphQL closeIssue state reasons for the REST-style reasons callers pass
+_CLOSE_REASONS = {
+    "completed": "COMPLETED",
+    "not_planned": "NOT_PLANNED",
+    "duplicate": "NOT_PLANNED",
+}
+
+
+class TriageAction(NamedTuple):
+    """One GitHub write for apply_triage_batch: a label, comment or close on an issue."""
+    kind: str  # "label", "comment" or "close"
+    issue_number: int
+    value: str  # label name, comment body or close reason
+
 
 class GitHubManager:
     """Enhanced GitHub manager for sophisticated issue management."""
@@ -17,7 +59,15 @@ class GitHubManager:
     def __init__(self):
         self.github_client = None
         self.repo = None
+        # Repositories and labels don't change under us during a session, so
+        # remember them instead of asking GitHub on every operation
+        self._repo_cache: Dict[str, Repository] = {}
+        self._known_labels: Set[Tuple[str, str]] = set()
+        # Repositories whose full label list is in _known_labels
+        self._labels_loaded: Set[str] = set()
+        self._graphql_session: Optional[requests.Session] = None
         self._setup_github()
+        self._default_repo = getattr(config, 'GITHUB_REPO', None) or 'kunal-004/triage-ninja'
     
     def _setup_github(self):
         """Initialize GitHub client."""
@@ -26,58 +76,87 @@ class GitHubManager:
                 logger.error("GitHub token not configured")
                 return
             
-            self.github_client = Github(config.GITHUB_TOKEN)
+            # Size the keep-alive pool for the agent's concurrent GitHub calls so
+            # connections are reused rather than dropped after each request
+            self.github_client = Github(config.GITHUB_TOKEN, pool_size=config.GITHUB_MAX_CONCURRENCY)
+            
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=config.GITHUB_MAX_CONCURRENCY)
+            session.mount("https://", adapter)
+            session.headers["Authorization"] = f"Bearer {config.GITHUB_TOKEN}"
+            self._graphql_session = session
             logger.info("✅ GitHub client initialized")
             
         except Exception as e:
             logger.error(f"GitHub setup failed: {e}")
     
+    def _call(self, func, *args, **kwargs):
+        """Call the GitHub API through the circuit breaker, retrying transient failures."""
+        return call_with_retry(_GITHUB_BREAKER, _is_transient_github_error, func, *args, **kwargs)
+    
     def _get_repo(self, repo_name: str = None):
         """Get repository instance."""
         if not self.github_client:
             raise Exception("GitHub client not initialized")
         
         # Use configured repo or provided repo name
-        repo_name = repo_name or getattr(config, 'GITHUB_REPO', 'kunal-004/triage-ninja')
+        repo_name = repo_name or self._default_repo
+        
+        repo = self._repo_cache.get(repo_name)
+        if repo is not None:
+            return repo
         
         try:
-            self.repo = self.github_client.get_repo(repo_name)
-            return self.repo
+            repo = self._call(self.github_client.get_repo, repo_name)
         except Exception as e:
             logger.error(f"Failed to get repo {repo_name}: {e}")
             raise
+        
+        # One paginated listing up front instead of a lookup per add_label
+        try:
+            self._known_labels.update((repo.full_name, label.name) for label in self._call(lambda: list(repo.get_labels())))
+            self._labels_loaded.add(repo.full_name)
+        except Exception as e:
+            logger.warning(f"Failed to preload labels for {repo_name}: {e}")
+        
+        self.repo = self._repo_cache[repo_name] = repo
+        return repo
     
     def add_label(self, issue_number: int, label: str, repo_name: str = None) -> bool:
         """Add label to GitHub issue."""
         try:
             repo = self._get_repo(repo_name)
-            issue = repo.get_issue(issue_number)
+            issue = self._call(repo.get_issue, issue_number)
+            label_key = (repo.full_name, label)
             
-            # Check if label exists in repo, create if not
-            try:
-                existing_label = repo.get_label(label)
-                logger.info(f"Label '{label}' already exists")
-            except Exception as label_error:
-                # Create label if it doesn't exist
-                logger.info(f"Creating new label: {label}")
-                colors = {
-                    "Critical": "d73a4a",  # Red
-                    "High": "ff6600",      # Orange  
-                    "Medium": "ffcc00",    # Yellow
-                    "Low": "00cc66",       # Green
-                    "Info": "0099cc",      # Blue
-                    "duplicate": "cccccc"  # Gray
-                }
-                color = colors.get(label, "ffffff")
-                try:
-                    repo.create_label(label, color)
-                    logger.info(f"✅ Created new label: {label}")
-                except Exception as create_error:
-                    logger.warning(f"Failed to create label '{label}': {create_error}")
-                    # Continue anyway - maybe label exists but get_label failed
+            # Check if label exists in repo, create if not. When the repo's
+            # labels were preloaded, a label we don't know about doesn't exist.
+            if label_key not in self._known_labels:
+                exists = False
+                if repo.full_name not in self._labels_loaded:
+                    try:
+                        self._call(repo.get_label, label)
+                        logger.info(f"Label '{label}' already exists")
+                        exists = True
+                    except Exception:
+                        pass
+                if not exists:
+                    logger.info(f"Creating new label: {label}")
+                    try:
+                        self._call(repo.create_label, label, _COLORS.get(label, "ffffff"))
+                        logger.info(f"✅ Created new label: {label}")
+                    except Exception as create_error:
+                        logger.warning(f"Failed to create label '{label}': {create_error}")
+                        # Continue anyway - maybe label exists but get_label failed
             
             # Add label to issue
-            issue.add_to_labels(label)
+            try:
+                self._call(issue.add_to_labels, label)
+            except UnknownObjectException:
+                # Label was deleted since we cached it; check again next time
+                self._known_labels.discard(label_key)
+                raise
+            self._known_labels.add(label_key)
             logger.info(f"✅ Added label '{label}' to issue #{issue_number}")
             return True
             
@@ -89,9 +168,9 @@ class GitHubManager:
         """Post comment to GitHub issue."""
         try:
             repo = self._get_repo(repo_name)
-            issue = repo.get_issue(issue_number)
+            issue = self._call(repo.get_issue, issue_number)
             
-            issue.create_comment(comment)
+            self._call(issue.create_comment, comment)
             logger.info(f"✅ Posted comment to issue #{issue_number}")
             return True
             
@@ -103,13 +182,13 @@ class GitHubManager:
         """Close GitHub issue with reason."""
         try:
             repo = self._get_repo(repo_name)
-            issue = repo.get_issue(issue_number)
+            issue = self._call(repo.get_issue, issue_number)
             
             # Close with reason (GitHub API supports: completed, not_planned)
             if reason == "duplicate":
                 reason = "not_planned"  # GitHub doesn't have 'duplicate' reason
             
-            issue.edit(state="closed", state_reason=reason)
+            self._call(issue.edit, state="closed", state_reason=reason)
             logger.info(f"✅ Closed issue #{issue_number} (reason: {reason})")
             return True
             
@@ -117,11 +196,100 @@ class GitHubManager:
             logger.error(f"Failed to close issue #{issue_number}: {e}")
             return False
     
+    def _graphql(self, query: str, variables: Dict[str, Any]) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+        """Run a GraphQL document, returning its (possibly partial) data and any errors."""
+        def _post():
+            response = self._graphql_session.post(_GRAPHQL_URL, json={"query": query, "variables": variables}, timeout=30)
+            response.raise_for_status()
+            return response.json()
+        payload = self._call(_post)
+        return payload.get("data") or {}, payload.get("errors") or []
+    
+    def _resolve_node_ids(self, repo, actions: List[TriageAction]) -> Tuple[Dict[int, str], Dict[str, str]]:
+        """Look up issue and label node IDs for a batch in a single query."""
+        issue_numbers = sorted({action.issue_number for action in actions})
+        labels = sorted({action.value for action in actions if action.kind == "label"})
+        
+        variables: Dict[str, Any] = {"owner": repo.owner.login, "name": repo.name}
+        declarations = ["$owner: String!", "$name: String!"]
+        fields = [f"i{n}: issue(number: {n}) {{ id }}" for n in issue_numbers]
+        for i, label in enumerate(labels):
+            variables[f"l{i}"] = label
+            declarations.append(f"$l{i}: String!")
+            fields.append(f"l{i}: label(name: $l{i}) {{ id }}")
+        
+        query = (
+            f"query({', '.join(declarations)}) {{ repository(owner: $owner, name: $name) {{ "
+            + " ".join(fields) + " } }"
+        )
+        data, _ = self._graphql(query, variables)
+        found = data.get("repository") or {}
+        issue_ids = {n: found[f"i{n}"]["id"] for n in issue_numbers if found.get(f"i{n}")}
+        label_ids = {label: found[f"l{i}"]["id"] for i, label in enumerate(labels) if found.get(f"l{i}")}
+        return issue_ids, label_ids
+    
+    def apply_triage_batch(self, actions: List[TriageAction], repo_name: str = None) -> List[bool]:
+        """
+        Apply label, comment and close actions in one GraphQL mutation.
+        
+        Mutation fields run in order, so a comment listed before a close lands
+        first. Actions GraphQL couldn't apply (unknown labels, field errors, or
+        a failed request) fall back to the REST methods one by one.
+        
+        Returns:
+            Success flag for each action, in order
+        """
+        results: List[Optional[bool]] = [None] * len(actions)
+        try:
+            repo = self._get_repo(repo_name)
+            issue_ids, label_ids = self._resolve_node_ids(repo, actions)
+            
+            variables: Dict[str, Any] = {}
+            declarations = []
+            operations = []
+            for i, action in enumerate(actions):
+                issue_id = issue_ids.get(action.issue_number)
+                if issue_id is None or (action.kind == "label" and action.value not in label_ids):
+                    continue
+                variables[f"s{i}"] = issue_id
+                declarations.append(f"$s{i}: ID!")
+                if action.kind == "label":
+                    variables[f"v{i}"] = label_ids[action.value]
+                    declarations.append(f"$v{i}: ID!")
+                    operations.append(f"op{i}: addLabelsToLabelable(input: {{labelableId: $s{i}, labelIds: [$v{i}]}}) {{ clientMutationId }}")
+                elif action.kind == "comment":
+                    variables[f"v{i}"] = action.value
+                    declarations.append(f"$v{i}: String!")
+                    operations.append(f"op{i}: addComment(input: {{subjectId: $s{i}, body: $v{i}}}) {{ clientMutationId }}")
+                elif action.kind == "close":
+                    reason = _CLOSE_REASONS.get(action.value, "COMPLETED")
+                    operations.append(f"op{i}: closeIssue(input: {{issueId: $s{i}, stateReason: {reason}}}) {{ clientMutationId }}")
+            
+            if operations:
+                mutation = f"mutation({', '.join(declarations)}) {{ " + " ".join(operations) + " }"
+                data, errors = self._graphql(mutation, variables)
+                for error in errors:
+                    logger.warning(f"GraphQL triage action failed: {error.get('message')}")
+                for i, action in enumerate(actions):
+                    if data.get(f"op{i}") is not None:
+                        results[i] = True
+                        if action.kind == "label":
+                            self._known_labels.add((repo.full_name, action.value))
+                        logger.info(f"✅ Applied {action.kind} to issue #{action.issue_number} via GraphQL")
+        except Exception as e:
+            logger.warning(f"GraphQL triage batch failed, falling back to REST: {e}")
+        
+        rest = {"label": self.add_label, "comment": self.post_comment, "close": self.close_issue}
+        for i, action in enumerate(actions):
+            if results[i] is None:
+                results[i] = rest[action.kind](action.issue_number, action.value, repo_name)
+        return results
+    
     def get_issue(self, issue_number: int, repo_name: str = None) -> Optional[Dict[str, Any]]:
         """Get issue information."""
         try:
             repo = self._get_repo(repo_name)
-            issue = repo.get_issue(issue_number)
+            issue = self._call(repo.get_issue, issue_number)
             
             return {
                 'number': issue.number,
@@ -275,11 +443,7 @@ class GitHubLabelTool(Tool[str]):
     def run(self, context: ToolRunContext, issue_number: int, label: str) -> str:
         """Add a label to a GitHub issue."""
         try:
-            if not hasattr(self, 'github_client'):
-                self.github_client = Github(config.GITHUB_TOKEN)
-                self.repo = self.github_client.get_repo(config.GITHUB_REPO)
-            
-            issue = self.repo.get_issue(issue_number)
+            issue = github_manager._get_repo().get_issue(issue_number)
             issue.add_to_labels(label)
             result = f"Added label '{label}' to issue #{issue_number}"
             logger.info(result)
@@ -305,11 +469,7 @@ class GitHubCommentTool(Tool[str]):
     def run(self, context: ToolRunContext, issue_number: int, comment: str) -> str:
         """Add a comment to a GitHub issue."""
         try:
-            if not hasattr(self, 'github_client'):
-                self.github_client = Github(config.GITHUB_TOKEN)
-                self.repo = self.github_client.get_repo(config.GITHUB_REPO)
-            
-            issue = self.repo.get_issue(issue_number)
+            issue = github_manager._get_repo().get_issue(issue_number)
             issue.create_comment(comment)
             result = f"Added comment to issue #{issue_number}"
             logger.info(result)
@@ -335,11 +495,7 @@ class GitHubCloseTool(Tool[str]):
     def run(self, context: ToolRunContext, issue_number: int, reason: str = "completed") -> str:
         """Close a GitHub issue."""
         try:
-            if not hasattr(self, 'github_client'):
-                self.github_client = Github(config.GITHUB_TOKEN)
-                self.repo = self.github_client.get_repo(config.GITHUB_REPO)
-            
-            issue = self.repo.get_issue(issue_number)
+            issue = github_manager._get_repo().get_issue(issue_number)
             issue.edit(state="closed")
             result = f"Closed issue #{issue_number} (reason: {reason})"
             logger.info(result)
@@ -1,23 +1,100 @@
+import asyncio
+import atexit
+import hashlib
 import logging
+import queue
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Any, List, Optional, Tuple
 
 import weaviate
+from weaviate.exceptions import WeaviateConnectionError, WeaviateTimeoutError
 import google.generativeai as genai
 from portia import ToolRunContext
 from portia.tool import Tool
 from pydantic import BaseModel, Field
 
 import config
+from cache import SQLiteVectorCache, TTLCache, VectorCache, VectorIndex
+from tools.ai_tools_portia import ensure_gemini_configured
 
 logger = logging.getLogger(__name__)
 
+_EMBEDDING_MODEL = "models/text-embedding-004"
+
+# Exact repeats of a duplicate check (agent retries, replays) skip embedding
+# and search entirely for this long
+_RESULT_CACHE_SIZE = 1024
+_RESULT_CACHE_TTL = 300.0
+
+# AddIssueTool writes are queued and flushed to Weaviate in batches
+_INGEST_QUEUE_SIZE = 4096
+_INGEST_BATCH_SIZE = 128
+_INGEST_FLUSH_INTERVAL = 1.0  # seconds
+_INGEST_STOP = None  # queued by flush to make the worker write its batch and exit
+
+# Backoff between attempts to reconnect a lost Weaviate client
+_RECONNECT_BASE_DELAY = 1.0  # seconds
+_RECONNECT_MAX_DELAY = 60.0
+
+# Issues per embedding request and concurrent search round in find_duplicates_batch
+_DUPLICATE_BATCH_SIZE = 16
+_WHITESPACE = re.compile(r'\s+')
+
+# Issues with less text than this, or only a link, are never worth searching
+_MIN_DUPLICATE_CHECK_CHARS = 20
+_URL_ONLY = re.compile(r'https?://\S+')
+
+
+class IndexConfigError(ValueError):
+    """Raised at startup when WEAVIATE_INDEX_TYPE can't be honoured."""
+
+
+def _embedding_key(text: str) -> bytes:
+    """Hash embedding text, ignoring case and whitespace differences."""
+    normalized = _WHITESPACE.sub(' ', text).strip().lower()
+    return hashlib.blake2b(normalized.encode('utf-8'), digest_size=16).digest()
+
 
 class WeaviateManager:
-    """Enhanced Weaviate manager with improved duplicate detection."""
+    """
+    Enhanced Weaviate manager with improved duplicate detection.
+    
+    Uses the synchronous v4 client. Async callers run these methods in worker
+    threads (see agent._call_limited), which overlaps them with the Gemini,
+    GitHub and Discord calls of the same triage without tying the client to
+    one event loop.
+    """
     
     def __init__(self):
+        # Recent query embeddings -> find_duplicate result, so near-identical
+        # queries skip the Weaviate round trip
+        self._query_cache = VectorCache(max_entries=config.DUPLICATE_CACHE_MAX_ENTRIES, dim=768)
+        # Embeddings by text hash, so re-triaged or retried issues skip the embedding call
+        self._embedding_cache = TTLCache(maxsize=config.AI_CACHE_MAXSIZE, ttl=config.AI_CACHE_TTL)
+        # (text hash, threshold) -> (duplicate_id, similarity_score, embedding)
+        self._result_cache = TTLCache(maxsize=_RESULT_CACHE_SIZE, ttl=_RESULT_CACHE_TTL)
+        # Embeddings of issues this process added, so an obvious duplicate of a
+        # recent issue is caught locally without a Weaviate query
+        self._recent_index = VectorIndex(capacity=config.DUPLICATE_INDEX_MAX_ENTRIES, dim=768)
+        # Second tier on disk, shared by every worker and surviving restarts
+        try:
+            self._persistent_cache = SQLiteVectorCache(config.DUPLICATE_CACHE_DB, dim=768,
+                                                      max_entries=config.DUPLICATE_CACHE_MAX_ENTRIES)
+            self._cache_generation = self._persistent_cache.generation()
+        except Exception as e:
+            logger.warning(f"WeaviateManager: Persistent duplicate cache unavailable: {e}")
+            self._persistent_cache = None
+            self._cache_generation = 0
+        self._reconnect_lock = threading.Lock()
+        self._reconnect_at = 0.0
+        self._reconnect_delay = _RECONNECT_BASE_DELAY
+        self._check_index_type()
         self._setup_weaviate()
         self._setup_embeddings()
+        atexit.register(self.close)
     
     def _setup_weaviate(self):
         """Initialize Weaviate client with proper schema setup."""
@@ -44,20 +121,118 @@ class WeaviateManager:
                 logger.warning("⚠️ WeaviateManager: Weaviate connection not ready, using mock functionality")
                 self.client = None
                 
+        except IndexConfigError:
+            raise
         except Exception as e:
             logger.error(f"WeaviateManager: Failed to connect to Weaviate: {e}")
             logger.info("Continuing with mock duplicate detection functionality")
             self.client = None
 
+    def _ensure_client(self) -> bool:
+        """
+        Return True if a Weaviate client is available, reconnecting if it was lost.
+        
+        Reconnects are attempted at most once per backoff interval, which
+        doubles after each failure, so an unreachable cluster doesn't add a
+        connection attempt to every call.
+        """
+        if self.client:
+            return True
+        if not config.WEAVIATE_API_KEY or not config.WEAVIATE_URL:
+            return False
+        if time.monotonic() < self._reconnect_at or not self._reconnect_lock.acquire(blocking=False):
+            return False
+        try:
+            if self.client:
+                return True
+            self._setup_weaviate()
+            if self.client:
+                self._reconnect_delay = _RECONNECT_BASE_DELAY
+                return True
+            self._reconnect_at = time.monotonic() + self._reconnect_delay
+            self._reconnect_delay = min(self._reconnect_delay * 2, _RECONNECT_MAX_DELAY)
+            return False
+        finally:
+            self._reconnect_lock.release()
+    
+    def _check_connection(self, error: Exception):
+        """After a failed request, drop the client if Weaviate is unreachable so the next call reconnects."""
+        client = self.client
+        if client is None or isinstance(error, WeaviateTimeoutError):
+            return
+        if isinstance(error, WeaviateConnectionError):
+            healthy = False
+        else:
+            # Query, auth and schema errors usually leave the connection intact; probe to be sure
+            try:
+                healthy = client.is_ready()
+            except Exception:
+                healthy = False
+        if not healthy:
+            logger.warning("WeaviateManager: Lost connection to Weaviate, will reconnect")
+            self.client = None
+            try:
+                client.close()
+            except Exception:
+                pass
+    
+    def close(self):
+        """Close the Weaviate client's connections."""
+        client, self.client = self.client, None
+        if client is not None:
+            try:
+                client.close()
+            except Exception as e:
+                logger.warning(f"WeaviateManager: Failed to close Weaviate client: {e}")
+    
     def _setup_embeddings(self):
         """Initialize Gemini for embeddings."""
         try:
-            genai.configure(api_key=config.GEMINI_API_KEY)
+            ensure_gemini_configured()
             logger.info("WeaviateManager: Configured Gemini for embeddings")
         except Exception as e:
             logger.error(f"WeaviateManager: Failed to configure embeddings: {e}")
             raise
     
+    def _embed(self, embedding_text: str) -> List[float]:
+        """Embed text with Gemini, reusing the embedding of identical text."""
+        key = _embedding_key(embedding_text)
+        cached = self._embedding_cache.get(key)
+        if cached is not None:
+            return list(cached)
+        embedding_response = genai.embed_content(
+            model=_EMBEDDING_MODEL,
+            content=embedding_text,
+            output_dimensionality=768
+        )
+        embedding = embedding_response['embedding']
+        self._embedding_cache.set(key, tuple(embedding))
+        return embedding
+    
+    def _embed_many(self, texts: List[str]) -> List[List[float]]:
+        """Embed several texts, sending every cache miss in a single Gemini request."""
+        keys = [_embedding_key(text) for text in texts]
+        embeddings: List[Optional[List[float]]] = []
+        missing: Dict[bytes, List[int]] = {}
+        for i, key in enumerate(keys):
+            cached = self._embedding_cache.get(key)
+            embeddings.append(list(cached) if cached is not None else None)
+            if cached is None:
+                missing.setdefault(key, []).append(i)
+        
+        if missing:
+            positions = list(missing.values())
+            embedding_response = genai.embed_content(
+                model=_EMBEDDING_MODEL,
+                content=[texts[indices[0]] for indices in positions],
+                output_dimensionality=768
+            )
+            for (key, indices), embedding in zip(missing.items(), embedding_response['embedding']):
+                self._embedding_cache.set(key, tuple(embedding))
+                for i in indices:
+                    embeddings[i] = embedding
+        return embeddings
+    
     def _ensure_schema_exists(self):
         """Ensure the GitHubIssue schema exists with all required properties."""
         if not self.client:
@@ -87,6 +262,7 @@ class WeaviateManager:
                     # If this works, delete the test entry
                     logger.info("WeaviateManager: Schema validation successful")
                     # TODO: Could delete test entry here if needed
+                    self._ensure_quantized(collection)
                     return
                     
                 except Exception as schema_error:
@@ -106,24 +282,87 @@ class WeaviateManager:
             # Create the collection with correct schema
             logger.info("WeaviateManager: Creating GitHubIssue collection with proper schema")
             
-            self.client.collections.create(
-                name="GitHubIssue",
-                description="GitHub issue vectors for duplicate detection",
-                properties=[
-                    Property(name="title", data_type=DataType.TEXT, description="Issue title"),
-                    Property(name="body", data_type=DataType.TEXT, description="Issue body content"),
-                    Property(name="issue_number", data_type=DataType.INT, description="GitHub issue number"),
-                    Property(name="embedding_text", data_type=DataType.TEXT, description="Combined text for embedding"),
-                ],
-                vectorizer_config=wvc.config.Configure.Vectorizer.none(),  # We'll provide our own vectors
-            )
+            try:
+                self.client.collections.create(
+                    name="GitHubIssue",
+                    description="GitHub issue vectors for duplicate detection",
+                    properties=[
+                        Property(name="title", data_type=DataType.TEXT, description="Issue title"),
+                        Property(name="body", data_type=DataType.TEXT, description="Issue body content"),
+                        Property(name="issue_number", data_type=DataType.INT, description="GitHub issue number"),
+                        Property(name="embedding_text", data_type=DataType.TEXT, description="Combined text for embedding"),
+                    ],
+                    vectorizer_config=wvc.config.Configure.Vectorizer.none(),  # We'll provide our own vectors
+                    vector_index_config=self._vector_index_config(),
+                )
+            except Exception as create_error:
+                if config.WEAVIATE_INDEX_TYPE == "flat":
+                    # Don't fall back to running without the collection
+                    raise IndexConfigError(
+                        f"Weaviate rejected a flat index with RQ quantization ({create_error}); "
+                        f"upgrade the Weaviate server or unset WEAVIATE_INDEX_TYPE"
+                    ) from create_error
+                raise
             logger.info("✅ WeaviateManager: Created GitHubIssue collection with proper schema")
             
+        except IndexConfigError:
+            raise
         except Exception as e:
             logger.error(f"WeaviateManager: Failed to ensure schema exists: {e}")
             logger.info("Continuing with existing schema or fallback functionality")
     
-    def find_duplicate(self, title: str, body: str, threshold: float = 0.85) -> Tuple[Optional[int], Optional[float]]:
+    @staticmethod
+    def _check_index_type():
+        """Fail fast on a WEAVIATE_INDEX_TYPE this client can't create."""
+        from weaviate.classes.config import Configure
+        
+        if config.WEAVIATE_INDEX_TYPE not in ("hnsw", "flat"):
+            raise IndexConfigError(
+                f"WEAVIATE_INDEX_TYPE must be 'hnsw' or 'flat', not '{config.WEAVIATE_INDEX_TYPE}'"
+            )
+        if config.WEAVIATE_INDEX_TYPE == "flat" and not hasattr(Configure.VectorIndex.Quantizer, "rq"):
+            raise IndexConfigError(
+                f"WEAVIATE_INDEX_TYPE=flat needs weaviate-client>=4.16.0 for RQ quantization "
+                f"(installed: {getattr(weaviate, '__version__', 'unknown')})"
+            )
+    
+    @staticmethod
+    def _vector_index_config():
+        """Index config for a new GitHubIssue collection, per WEAVIATE_INDEX_TYPE."""
+        from weaviate.classes.config import Configure
+        
+        if config.WEAVIATE_INDEX_TYPE == "flat":
+            # Brute-force over 8-bit rotational-quantized vectors: no graph to
+            # build, and fast enough for a single repo's issues
+            return Configure.VectorIndex.flat(quantizer=Configure.VectorIndex.Quantizer.rq(bits=8))
+        # Scalar-quantize vectors to int8 in the HNSW index
+        return Configure.VectorIndex.hnsw(quantizer=Configure.VectorIndex.Quantizer.sq())
+    
+    def _ensure_quantized(self, collection):
+        """Enable int8 scalar quantization on a collection created before it was the default."""
+        try:
+            from weaviate.classes.config import Reconfigure
+            
+            collection_config = collection.config.get()
+            index_type = getattr(collection_config.vector_index_type, "value", collection_config.vector_index_type)
+            if index_type != config.WEAVIATE_INDEX_TYPE:
+                # The index type is fixed at creation; delete the collection and
+                # re-ingest to switch
+                logger.warning(f"WeaviateManager: GitHubIssue collection uses a {index_type} index, "
+                               f"not {config.WEAVIATE_INDEX_TYPE}; recreate it to switch")
+            if index_type != "hnsw" or collection_config.vector_index_config.quantizer is not None:
+                return
+            collection.config.update(
+                vector_index_config=Reconfigure.VectorIndex.hnsw(
+                    quantizer=Reconfigure.VectorIndex.Quantizer.sq(enabled=True)
+                )
+            )
+            logger.info("WeaviateManager: Enabled scalar quantization on GitHubIssue collection")
+        except Exception as e:
+            logger.warning(f"WeaviateManager: Could not enable scalar quantization: {e}")
+    
+    def find_duplicate(self, title: str, body: str, threshold: float = 0.85,
+                       embedding: Optional[List[float]] = None) -> Tuple[Optional[int], Optional[float]]:
         """
         Find duplicate issues with enhanced context.
         
@@ -131,12 +370,13 @@ class WeaviateManager:
             title: Issue title
             body: Issue body
             threshold: Similarity threshold
+            embedding: Embedding of the same title and body, if already computed
             
         Returns:
             Tuple of (duplicate_issue_id, similarity_score) or (None, None) if no duplicate
         """
         try:
-            if not self.client:
+            if not self._ensure_client():
                 # Enhanced mock duplicate detection for demo purposes
                 logger.info("Using enhanced mock duplicate detection (Weaviate not available)")
                 
@@ -159,70 +399,205 @@ class WeaviateManager:
                         similarity = intersection / union
                         
                         if similarity >= threshold:
-                            logger.warning(f"Mock duplicate detected: Issue similar to #{stored_issue['issue_id']} (Similarity: {similarity:.1%})")
+                            logger.warning("Mock duplicate detected: Issue similar to #%s (Similarity: %.3f)", stored_issue['issue_id'], similarity)
                             return stored_issue['issue_id'], similarity
                 
                 # Check for exact title matches (high likelihood of duplicate)
                 for stored_issue in self._mock_issues:
                     if title.strip().lower() == stored_issue['title'].strip().lower():
-                        logger.warning(f"Mock duplicate detected: Exact title match with issue #{stored_issue['issue_id']}")
+                        logger.warning("Mock duplicate detected: Exact title match with issue #%s", stored_issue['issue_id'])
                         return stored_issue['issue_id'], 0.95
                 
                 return None, None
             
-            # Create embedding for search
-            embedding_text = f"{title}\n\n{body}"
-            
-            try:
-                embedding_response = genai.embed_content(
-                    model="models/text-embedding-004", 
-                    content=embedding_text,
-                    output_dimensionality=768
-                )
-            except Exception as embed_error:
-                logger.warning(f"Embedding generation failed: {embed_error}")
-                # Fall back to simple text matching
-                return self._fallback_text_similarity(title, body, threshold)
-            
-            # Search for similar issues using Weaviate v4 API
-            try:
-                import weaviate.classes as wvc
-                collection = self.client.collections.get("GitHubIssue")
-                response = collection.query.near_vector(
-                    near_vector=embedding_response['embedding'],
-                    limit=5,
-                    return_metadata=wvc.query.MetadataQuery(certainty=True)
-                )
-                
-                # Process results
-                for obj in response.objects:
-                    certainty = obj.metadata.certainty
-                    if certainty >= threshold:
-                        return obj.properties["issue_number"], certainty
-            except ImportError:
-                # Fall back to older API if available
-                logger.warning("Using fallback Weaviate API")
-                results = self.client.query.get(
-                    "GitHubIssue", 
-                    ["title", "body", "issue_number"]
-                ).with_near_vector({
-                    "vector": embedding_response['embedding']
-                }).with_limit(5).with_additional(["certainty"]).do()
-                
-                if results.get("data", {}).get("Get", {}).get("GitHubIssue"):
-                    issues = results["data"]["Get"]["GitHubIssue"]
-                    for issue in issues:
-                        certainty = issue["_additional"]["certainty"]
-                        if certainty >= threshold:
-                            return issue["issue_number"], certainty
-            
-            return None, None
+            return self.find_duplicate_with_embedding(title, body, threshold, embedding=embedding)[:2]
             
+        except WeaviateTimeoutError:
+            raise
         except Exception as e:
             logger.error(f"WeaviateManager: Duplicate search failed: {e}")
             # Fallback to text-based similarity
             return self._fallback_text_similarity(title, body, threshold)
     
+    def find_duplicate_with_embedding(self, title: str, body: str, threshold: float = 0.85,
+                                      embedding: Optional[List[float]] = None) -> Tuple[Optional[int], Optional[float], Optional[List[float]]]:
+        """
+        Like find_duplicate, but also return the issue's embedding.
+        
+        Pass the embedding to add_issue for the same title and body so the
+        issue isn't embedded twice. A precomputed embedding may be passed in
+        the same way.
+        
+        Returns:
+            Tuple of (duplicate_issue_id, similarity_score, embedding); the
+            embedding is None when no embedding could be made
+        
+        Raises:
+            WeaviateTimeoutError: the search timed out; the caller may retry
+        """
+        if not self._ensure_client():
+            return (*self.find_duplicate(title, body, threshold), None)
+        
+        embedding_text = f"{title}\n\n{body}"
+        result_key = (_embedding_key(embedding_text), threshold)
+        cached = self._result_cache.get(result_key)
+        if cached is not None:
+            logger.info("WeaviateManager: Duplicate check served from result cache")
+            return cached
+        
+        # Create embedding for search
+        try:
+            query_vector = embedding if embedding is not None else self._embed(embedding_text)
+        except Exception as embed_error:
+            logger.warning(f"Embedding generation failed: {embed_error}")
+            # Fall back to simple text matching
+            return (*self._fallback_text_similarity(title, body, threshold), None)
+        
+        # One retry on a fresh connection if the first attempt lost it
+        for attempt in range(2):
+            try:
+                result = (*self._search_recent_or_remote(query_vector, threshold), query_vector)
+                break
+            except WeaviateTimeoutError:
+                raise
+            except Exception as e:
+                self._check_connection(e)
+                if attempt == 0 and isinstance(e, WeaviateConnectionError) and self._ensure_client():
+                    logger.warning(f"WeaviateManager: Reconnected after connection error, retrying search: {e}")
+                    continue
+                logger.error(f"WeaviateManager: Duplicate search failed: {e}")
+                return (*self._fallback_text_similarity(title, body, threshold), query_vector)
+        self._result_cache.set(result_key, result)
+        return result
+    
+    def _search_recent_or_remote(self, query_vector: List[float], threshold: float) -> Tuple[Optional[int], Optional[float]]:
+        """Check recently added issues locally, then search Weaviate."""
+        recent = self._recent_index.nearest(query_vector)
+        # Weaviate scores cosine matches as certainty = (1 + cosine) / 2, and
+        # the threshold is in those units
+        if recent is not None and (1.0 + recent[1]) / 2 >= threshold:
+            logger.info(f"WeaviateManager: Duplicate of recently added issue #{recent[0]} found locally")
+            return recent[0], (1.0 + recent[1]) / 2
+        return self._search_cached(query_vector, threshold)
+    
+    def find_duplicates_batch(self, items: List[Tuple[str, str]], threshold: float = 0.85) -> List[Tuple[Optional[int], Optional[float]]]:
+        """
+        Find duplicates for several (title, body) pairs at once.
+        
+        All texts are embedded in one Gemini request and the vector searches
+        run concurrently, so a queue of issues costs one embedding round trip
+        instead of one per issue.
+        
+        Returns:
+            One (duplicate_issue_id, similarity_score) tuple per item, in order
+        """
+        if not items or not self._ensure_client():
+            return [self.find_duplicate(title, body, threshold) for title, body in items]
+        if len(items) > _DUPLICATE_BATCH_SIZE:
+            results = []
+            for start in range(0, len(items), _DUPLICATE_BATCH_SIZE):
+                results.extend(self.find_duplicates_batch(items[start:start + _DUPLICATE_BATCH_SIZE], threshold))
+            return results
+        
+        try:
+            vectors = self._embed_many([f"{title}\n\n{body}" for title, body in items])
+        except Exception as embed_error:
+            logger.warning(f"Batch embedding generation failed: {embed_error}")
+            return [self._fallback_text_similarity(title, body, threshold) for title, body in items]
+        
+        def _search(i: int) -> Tuple[Optional[int], Optional[float]]:
+            # Same path as a single check (result cache, recent index, reconnect),
+            # minus the embedding call
+            title, body = items[i]
+            return self.find_duplicate_with_embedding(title, body, threshold, embedding=vectors[i])[:2]
+        
+        workers = min(len(items), config.WEAVIATE_MAX_CONCURRENCY)
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="weaviate-batch") as executor:
+            return list(executor.map(_search, range(len(items))))
+    
+    def _search_cached(self, query_vector: List[float], threshold: float) -> Tuple[Optional[int], Optional[float]]:
+        """Search for a duplicate of an embedded issue, consulting and filling the result caches."""
+        cached = self._cached_result(query_vector, threshold)
+        if cached is not None:
+            return cached
+        
+        result = self._search_similar(query_vector, threshold)
+        self._query_cache.add(query_vector, (threshold, result))
+        if self._persistent_cache is not None:
+            try:
+                self._persistent_cache.add(query_vector, [threshold, list(result)])
+            except Exception as e:
+                logger.warning(f"WeaviateManager: Failed to persist duplicate cache entry: {e}")
+        return result
+    
+    def _cached_result(self, query_vector: List[float], threshold: float) -> Optional[Tuple[Optional[int], Optional[float]]]:
+        """Look up a previous search result in the in-memory, then on-disk, cache."""
+        if self._persistent_cache is not None:
+            try:
+                # Another worker cleared the shared cache, so ours is stale too
+                generation = self._persistent_cache.generation()
+                if generation != self._cache_generation:
+                    self._query_cache.clear()
+                    self._cache_generation = generation
+            except Exception as e:
+                logger.warning(f"WeaviateManager: Persistent duplicate cache read failed: {e}")
+        
+        cached = self._query_cache.lookup(query_vector, config.DUPLICATE_CACHE_THRESHOLD)
+        if cached is not None and cached[0] == threshold:
+            logger.info("WeaviateManager: Duplicate search served from similarity cache")
+            return cached[1]
+        
+        if self._persistent_cache is None:
+            return None
+        try:
+            stored = self._persistent_cache.lookup(query_vector, config.DUPLICATE_CACHE_THRESHOLD)
+        except Exception as e:
+            logger.warning(f"WeaviateManager: Persistent duplicate cache read failed: {e}")
+            return None
+        if stored is None or stored[0] != threshold:
+            return None
+        result = tuple(stored[1])
+        self._query_cache.add(query_vector, (threshold, result))
+        logger.info("WeaviateManager: Duplicate search served from persistent cache")
+        return result
+    
+    def _search_similar(self, query_vector: List[float], threshold: float) -> Tuple[Optional[int], Optional[float]]:
+        """Run the vector search against Weaviate."""
+        # Search for similar issues using Weaviate v4 API. The server drops
+        # anything below the threshold, so the top hit (if any) is the answer.
+        try:
+            import weaviate.classes as wvc
+            collection = self.client.collections.get("GitHubIssue")
+            response = collection.query.near_vector(
+                near_vector=query_vector,
+                limit=1,
+                certainty=threshold,
+                return_properties=["issue_number"],
+                return_metadata=wvc.query.MetadataQuery(certainty=True)
+            )
+            
+            if not response.objects:
+                return None, None
+            best = response.objects[0]
+            return best.properties["issue_number"], best.metadata.certainty
+        except ImportError:
+                # Fall back to older API if available
+            logger.warning("Using fallback Weaviate API")
+            results = self.client.query.get(
+                "GitHubIssue", 
+                ["issue_number"]
+            ).with_near_vector({
+                "vector": query_vector,
+                "certainty": threshold
+            }).with_limit(1).with_additional(["certainty"]).do()
+            
+            issues = results.get("data", {}).get("Get", {}).get("GitHubIssue")
+            if issues:
+                issue = issues[0]
+                return issue["issue_number"], issue["_additional"]["certainty"]
+        
+        return None, None
+    
     def _fallback_text_similarity(self, title: str, body: str, threshold: float) -> Tuple[Optional[int], Optional[float]]:
         """Fallback text-based similarity when embedding fails."""
         try:
@@ -247,10 +622,15 @@ class WeaviateManager:
         
         return None, None
     
-    def add_issue(self, issue_id: int, title: str, body: str):
-        """Add issue to Weaviate database after human confirmation."""
+    def add_issue(self, issue_id: int, title: str, body: str, embedding: Optional[List[float]] = None):
+        """
+        Add issue to Weaviate database after human confirmation.
+        
+        embedding, if given, must be the one find_duplicate_with_embedding
+        returned for the same title and body; it is stored as-is.
+        """
         try:
-            if not self.client:
+            if not self._ensure_client():
                 # Initialize mock storage if not exists
                 if not hasattr(self, '_mock_issues'):
                     self._mock_issues = []
@@ -268,12 +648,9 @@ class WeaviateManager:
             embedding_text = f"{title}\n\n{body}"
             
             try:
-                # Generate embedding using Gemini
-                embedding_response = genai.embed_content(
-                    model="models/text-embedding-004",
-                    content=embedding_text,
-                    output_dimensionality=768
-                )
+                # Generate embedding using Gemini unless duplicate detection already did
+                if embedding is None:
+                    embedding = self._embed(embedding_text)
             except Exception as embed_error:
                 logger.warning(f"Embedding generation failed: {embed_error}, using mock storage")
                 # Fall back to mock storage
@@ -297,12 +674,15 @@ class WeaviateManager:
                         "issue_number": issue_id,
                         "embedding_text": embedding_text,
                     },
-                    vector=embedding_response['embedding']
+                    vector=embedding
                 )
                 logger.info(f"WeaviateManager: Added confirmed issue #{issue_id} to vector database")
+                self._recent_index.add(embedding, issue_id)
+                self._invalidate_duplicate_caches()
                 
             except Exception as v4_error:
                 logger.warning(f"WeaviateManager: V4 API failed: {v4_error}")
+                self._check_connection(v4_error)
                 # Use mock storage as fallback
                 if not hasattr(self, '_mock_issues'):
                     self._mock_issues = []
@@ -326,8 +706,152 @@ class WeaviateManager:
             logger.info(f"Mock fallback: Added issue #{issue_id} to knowledge base")
 
 
+    def add_issues_batch(self, items: List[Tuple[int, str, str]]) -> None:
+        """
+        Add several (issue_id, title, body) issues with one embedding request and one Weaviate batch.
+        
+        Issues the batch couldn't store are retried one at a time through add_issue.
+        """
+        if not items:
+            return
+        if not self._ensure_client():
+            for issue_id, title, body in items:
+                self.add_issue(issue_id, title, body)
+            return
+        
+        texts = [f"{title}\n\n{body}" for _, title, body in items]
+        try:
+            embeddings = self._embed_many(texts)
+            collection = self.client.collections.get("GitHubIssue")
+            with collection.batch.dynamic() as batch:
+                for (issue_id, title, body), text, embedding in zip(items, texts, embeddings):
+                    batch.add_object(
+                        properties={
+                            "title": title,
+                            "body": body,
+                            "issue_number": issue_id,
+                            "embedding_text": text,
+                        },
+                        vector=embedding
+                    )
+            failed = {obj.object_.properties["issue_number"] for obj in collection.batch.failed_objects}
+        except Exception as e:
+            logger.warning(f"WeaviateManager: Batch insert failed, adding issues individually: {e}")
+            self._check_connection(e)
+            for issue_id, title, body in items:
+                self.add_issue(issue_id, title, body)
+            return
+        
+        for (issue_id, title, body), embedding in zip(items, embeddings):
+            if issue_id in failed:
+                self.add_issue(issue_id, title, body, embedding=embedding)
+            else:
+                self._recent_index.add(embedding, issue_id)
+        logger.info(f"WeaviateManager: Added {len(items) - len(failed)} confirmed issues to vector database in one batch")
+        self._invalidate_duplicate_caches()
+    
+    def _invalidate_duplicate_caches(self):
+        """Drop cached duplicate answers; "no duplicate" results may be stale after an insert."""
+        self._result_cache.clear()
+        self._query_cache.clear()
+        if self._persistent_cache is not None:
+            try:
+                self._persistent_cache.clear()
+                self._cache_generation = self._persistent_cache.generation()
+            except Exception as e:
+                logger.warning(f"WeaviateManager: Failed to clear persistent duplicate cache: {e}")
+
+
+class IssueIngestQueue:
+    """
+    Bounded queue of issues waiting to be added to Weaviate.
+    
+    A daemon thread flushes up to _INGEST_BATCH_SIZE issues at a time through
+    add_issues_batch, at least every _INGEST_FLUSH_INTERVAL seconds. Anything
+    still queued at interpreter exit, including a batch the worker is holding,
+    is written by an atexit hook before WeaviateManager.close runs.
+    """
+    
+    def __init__(self, manager: WeaviateManager):
+        self._manager = manager
+        self._queue: "queue.Queue[Optional[Tuple[int, str, str]]]" = queue.Queue(maxsize=_INGEST_QUEUE_SIZE)
+        self._write_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._flush_registered = False
+    
+    def submit(self, issue_id: int, title: str, body: str) -> bool:
+        """Queue an issue for the next batch; returns False if the queue is full."""
+        if self._thread is None:
+            with self._start_lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="weaviate-ingest", daemon=True)
+                    self._thread.start()
+                    if not self._flush_registered:
+                        # Registered after WeaviateManager's close hook, so it runs first
+                        atexit.register(self.flush)
+                        self._flush_registered = True
+        try:
+            self._queue.put_nowait((issue_id, title, body))
+            return True
+        except queue.Full:
+            return False
+    
+    def flush(self) -> None:
+        """
+        Write everything queued, then stop the worker.
+        
+        The worker may be holding a drained batch while it waits for more
+        items, so it is told to stop and joined rather than the queue being
+        emptied from here. The next submit starts a new worker.
+        """
+        with self._start_lock:
+            thread = self._thread
+            if thread is None:
+                return
+            self._queue.put(_INGEST_STOP)
+            thread.join()
+            self._thread = None
+    
+    def _run(self):
+        while True:
+            first = self._queue.get()
+            if first is _INGEST_STOP:
+                return
+            batch, stopping = self._drain([first], _INGEST_BATCH_SIZE, deadline=time.monotonic() + _INGEST_FLUSH_INTERVAL)
+            self._write(batch)
+            if stopping:
+                return
+    
+    def _drain(self, batch: List[Tuple[int, str, str]], limit: int, deadline: float) -> Tuple[List[Tuple[int, str, str]], bool]:
+        """
+        Fill batch from the queue up to limit, waiting for more items until deadline.
+        
+        Returns the batch and whether the stop sentinel was taken; when it
+        is, the wait ends early so the batch is written straight away.
+        """
+        while len(batch) < limit:
+            remaining = deadline - time.monotonic()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is _INGEST_STOP:
+                return batch, True
+            batch.append(item)
+        return batch, False
+    
+    def _write(self, batch: List[Tuple[int, str, str]]):
+        with self._write_lock:
+            try:
+                self._manager.add_issues_batch(batch)
+            except Exception as e:
+                logger.error(f"WeaviateManager: Failed to flush {len(batch)} queued issues: {e}")
+
+
 # Global WeaviateManager instance
 weaviate_manager = WeaviateManager()
+issue_ingest_queue = IssueIngestQueue(weaviate_manager)
 
 
 class DuplicateCheckSchema(BaseModel):
@@ -336,6 +860,16 @@ class DuplicateCheckSchema(BaseModel):
     body: str = Field(..., description="GitHub issue body/description")
     threshold: float = Field(default=0.85, description="Similarity threshold (0.0-1.0)")
 
+class DuplicateCheckItem(BaseModel):
+    """One issue in a batch duplicate check."""
+    title: str = Field(..., description="GitHub issue title")
+    body: str = Field(..., description="GitHub issue body/description")
+
+class BatchDuplicateCheckSchema(BaseModel):
+    """Input schema for batch duplicate detection."""
+    items: List[DuplicateCheckItem] = Field(..., description="Issues to check")
+    threshold: float = Field(default=0.85, description="Similarity threshold (0.0-1.0)")
+
 class AddIssueSchema(BaseModel):
     """Input schema for adding issues to Weaviate."""
     issue_id: int = Field(..., description="GitHub issue ID")
@@ -343,7 +877,22 @@ class AddIssueSchema(BaseModel):
     body: str = Field(..., description="GitHub issue body/description")
 
 
-class EnhancedDuplicateDetectionTool(Tool[str]):
+def _is_trivial(title: str, body: str) -> bool:
+    """True for issue text too short or bare to produce a meaningful match."""
+    text = f"{title or ''}\n{body or ''}".strip()
+    return len(text) < _MIN_DUPLICATE_CHECK_CHARS or _URL_ONLY.fullmatch(text) is not None
+
+
+def _duplicate_result(duplicate_id: Optional[int], similarity_score: Optional[float], title: str) -> Dict[str, Any]:
+    """Build the result dict for one duplicate check."""
+    if duplicate_id and similarity_score:
+        logger.warning("Duplicate detected: Issue similar to #%s (Similarity: %.3f)", duplicate_id, similarity_score)
+        return {"status": "DUPLICATE_FOUND", "duplicate_id": duplicate_id, "similarity": similarity_score}
+    logger.info("No duplicates found for issue: '%s'", title)
+    return {"status": "NO_DUPLICATE_FOUND", "duplicate_id": None, "similarity": None}
+
+
+class EnhancedDuplicateDetectionTool(Tool[Dict[str, Any]]):
     """Enhanced tool for detecting duplicate GitHub issues."""
     
     id: str = "enhanced_duplicate_detection_tool"
@@ -351,7 +900,7 @@ class EnhancedDuplicateDetectionTool(Tool[str]):
     description: str = "Detects duplicate GitHub issues using vector similarity search with enhanced UX"
     args_schema: type[BaseModel] = DuplicateCheckSchema
 
-    def run(self, context: ToolRunContext, title: str, body: str, threshold: float = 0.85) -> str:
+    def run(self, context: ToolRunContext, title: str, body: str, threshold: float = 0.85) -> Dict[str, Any]:
         """
         Check for duplicate issues with enhanced context.
         
@@ -362,24 +911,74 @@ class EnhancedDuplicateDetectionTool(Tool[str]):
             threshold: Similarity threshold
             
         Returns:
-            Duplicate detection results with similarity score
+            Dict with "status" (DUPLICATE_FOUND, NO_DUPLICATE_FOUND, RETRY on a
+            Weaviate timeout, or ERROR), "duplicate_id" and "similarity", or
+            "error" on failure
         """
+        if _is_trivial(title, body):
+            logger.info("Skipping duplicate check for trivial issue: '%s'", title)
+            return {"status": "NO_DUPLICATE_FOUND", "duplicate_id": None, "similarity": None}
         try:
             duplicate_id, similarity_score = weaviate_manager.find_duplicate(title, body, threshold)
+            return _duplicate_result(duplicate_id, similarity_score, title)
             
-            if duplicate_id and similarity_score:
-                result = f"DUPLICATE_FOUND|{duplicate_id}|{similarity_score:.3f}"
-                logger.warning(f"Duplicate detected: Issue similar to #{duplicate_id} (Similarity: {similarity_score:.1%})")
-            else:
-                result = "NO_DUPLICATE_FOUND"
-                logger.info(f"No duplicates found for issue: '{title}'")
-            
-            return result
-            
+        except WeaviateTimeoutError as e:
+            logger.warning("Duplicate detection timed out: %s", e)
+            return {"status": "RETRY", "error": f"Duplicate detection timed out: {e}"}
         except Exception as e:
             error_msg = f"Duplicate detection failed: {e}"
             logger.error(error_msg)
-            return f"ERROR|{error_msg}"
+            return {"status": "ERROR", "error": error_msg}
+    
+    async def arun(self, context: ToolRunContext, title: str, body: str, threshold: float = 0.85) -> Dict[str, Any]:
+        """
+        Coroutine version of run for async callers.
+        
+        The Weaviate client and Gemini SDK are blocking, so the check runs in
+        a worker thread and concurrent checks overlap their network waits.
+        """
+        return await asyncio.to_thread(self.run, context, title, body, threshold)
+    
+    def run_batch(self, items: List[Tuple[str, str]], threshold: float = 0.85) -> List[Dict[str, Any]]:
+        """Check several (title, body) issues at once; results are in input order."""
+        searchable = [i for i, (title, body) in enumerate(items) if not _is_trivial(title, body)]
+        try:
+            matches = weaviate_manager.find_duplicates_batch([items[i] for i in searchable], threshold)
+        except WeaviateTimeoutError as e:
+            logger.warning("Batch duplicate detection timed out: %s", e)
+            return [{"status": "RETRY", "error": f"Duplicate detection timed out: {e}"} for _ in items]
+        except Exception as e:
+            error_msg = f"Duplicate detection failed: {e}"
+            logger.error(error_msg)
+            return [{"status": "ERROR", "error": error_msg} for _ in items]
+        
+        results: List[Dict[str, Any]] = [
+            {"status": "NO_DUPLICATE_FOUND", "duplicate_id": None, "similarity": None} for _ in items
+        ]
+        for i, (duplicate_id, similarity_score) in zip(searchable, matches):
+            results[i] = _duplicate_result(duplicate_id, similarity_score, items[i][0])
+        return results
+
+
+class BatchDuplicateDetectionTool(Tool[List[Dict[str, Any]]]):
+    """Tool for checking a batch of GitHub issues for duplicates in one pass."""
+    
+    id: str = "batch_duplicate_detection_tool"
+    name: str = "Batch Duplicate Detection Tool"
+    description: str = "Detects duplicates for several GitHub issues at once using batched embedding and vector search"
+    args_schema: type[BaseModel] = BatchDuplicateCheckSchema
+
+    def run(self, context: ToolRunContext, items: List[Dict[str, Any]], threshold: float = 0.85) -> List[Dict[str, Any]]:
+        """Return one duplicate detection result dict per item, in order."""
+        pairs = [
+            (item.title, item.body) if isinstance(item, DuplicateCheckItem) else (item["title"], item["body"])
+            for item in items
+        ]
+        return EnhancedDuplicateDetectionTool().run_batch(pairs, threshold)
+    
+    async def arun(self, context: ToolRunContext, items: List[Dict[str, Any]], threshold: float = 0.85) -> List[Dict[str, Any]]:
+        """Coroutine version of run; the batch runs in a worker thread."""
+        return await asyncio.to_thread(self.run, context, items, threshold)
 
 
 class AddIssueTool(Tool[str]):
@@ -393,10 +992,16 @@ class AddIssueTool(Tool[str]):
     def run(self, context: ToolRunContext, issue_id: int, title: str, body: str) -> str:
         """Add confirmed issue to Weaviate database."""
         try:
+            if issue_ingest_queue.submit(issue_id, title, body):
+                return f"Queued issue #{issue_id} for the knowledge base"
+            # Queue is full; write this one directly
             weaviate_manager.add_issue(issue_id, title, body)
             return f"Successfully added issue #{issue_id} to knowledge base"
         except Exception as e:
             error_msg = f"Failed to add issue #{issue_id} to database: {e}"
             logger.error(error_msg)
             return error_msg
-
+    
+    async def arun(self, context: ToolRunContext, issue_id: int, title: str, body: str) -> str:
+        """Coroutine version of run; a direct write when the queue is full runs in a worker thread."""
+        return await asyncio.to_thread(self.run, context, issue_id, title, body)
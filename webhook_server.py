@@ -1,14 +1,22 @@
 import asyncio
 import logging
 from datetime import datetime, timezone
-from typing import Dict, Any
-from flask import Flask, request, jsonify
+from typing import Dict, Any, Optional, Tuple
+from aiohttp import web
+from flask import Flask, Response, request, jsonify
 import hmac
 import hashlib
 import json
 
-from config import GITHUB_WEBHOOK_SECRET, FLASK_PORT
-from agent import process_webhook, get_agent
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+from config import GITHUB_WEBHOOK_SECRET, FLASK_HOST, FLASK_PORT
+from agent import TriageResult, process_webhook, get_agent
+from tools.discord_tools_portia import discord_manager
 
 logging.basicConfig(
     level=logging.INFO,
@@ -18,6 +26,28 @@ logger = logging.getLogger(__name__)
 
 app = Flask(__name__)
 
+
+def _json_loads(data: bytes) -> Any:
+    """Parse a JSON payload, using orjson when available."""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _json_dumps(data: Dict[str, Any]) -> bytes:
+    """Serialize to JSON bytes, using orjson when available."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(data)
+    return json.dumps(data).encode('utf-8')
+
+
+def _json_response(data: Dict[str, Any], status: int = 200):
+    """Serialize a JSON response, using orjson when available."""
+    if ORJSON_AVAILABLE:
+        return Response(orjson.dumps(data), status=status, mimetype='application/json')
+    return jsonify(data), status
+
+
 webhook_stats = {
     'total_received': 0,
     'issues_triaged': 0,
@@ -41,102 +71,129 @@ def verify_webhook_signature(payload_body: bytes, signature_header: str) -> bool
     expected_signature = "sha256=" + hash_object.hexdigest()
     return hmac.compare_digest(expected_signature, signature_header)
 
-@app.route('/')
-def health_check():
-    return jsonify({
+def _health_body() -> Dict[str, Any]:
+    return {
         'status': 'healthy',
         'service': 'Support-Triage Ninja',
         'version': '1.0.0',
         'timestamp': datetime.now(timezone.utc).isoformat()
-    })
+    }
 
-@app.route('/stats')
-def get_stats():
-    return jsonify({
+def _stats_body() -> Dict[str, Any]:
+    return {
         'stats': webhook_stats,
         'timestamp': datetime.now(timezone.utc).isoformat()
-    })
+    }
 
-@app.route('/webhook', methods=['POST'])
-def handle_webhook():
+def _prepare_webhook(payload_body: bytes, signature_header: str, event_type: str
+                     ) -> Tuple[Optional[Dict[str, Any]], Optional[Tuple[Dict[str, Any], int]]]:
+    """
+    Validate a webhook delivery.
+    
+    Returns (payload, None) when the issue should be triaged, or
+    (None, (body, status)) when the request should be answered immediately.
+    """
     webhook_stats['total_received'] += 1
     webhook_stats['last_webhook'] = datetime.now(timezone.utc).isoformat()
     
+    if not verify_webhook_signature(payload_body, signature_header):
+        logger.warning("Invalid webhook signature")
+        webhook_stats['errors'] += 1
+        return None, ({'error': 'Invalid signature'}, 401)
+    
     try:
-        payload_body = request.get_data()
-        signature_header = request.headers.get('X-Hub-Signature-256', '')
-        event_type = request.headers.get('X-GitHub-Event', '')
-        
-        if not verify_webhook_signature(payload_body, signature_header):
-            logger.warning("Invalid webhook signature")
-            webhook_stats['errors'] += 1
-            return jsonify({'error': 'Invalid signature'}), 401
+        payload = _json_loads(payload_body)
+    except json.JSONDecodeError as e:
+        logger.error(f"Invalid JSON payload: {e}")
+        webhook_stats['errors'] += 1
+        return None, ({'error': 'Invalid JSON payload'}, 400)
+    
+    if event_type != 'issues':
+        logger.info(f"Ignoring non-issue event: {event_type}")
+        return None, ({'message': f'Ignored event type: {event_type}'}, 200)
+    
+    action = payload.get('action', 'unknown')
+    issue = payload.get('issue', {})
+    repo = payload.get('repository', {})
+    
+    logger.info(f"Received {event_type} webhook: {action} for issue #{issue.get('number')} in {repo.get('full_name')}")
+    
+    # Only process 'opened' issues
+    if action != 'opened':
+        logger.info(f"Ignoring issue action: {action}")
+        return None, ({'message': f'Ignored action: {action}'}, 200)
+    
+    return payload, None
+
+def _webhook_result(payload: Dict[str, Any], result: TriageResult) -> Tuple[Dict[str, Any], int]:
+    """Record a triage outcome and build the response body and status."""
+    issue = payload.get('issue', {})
+    repo = payload.get('repository', {})
+    
+    if result.success:
+        webhook_stats['issues_triaged'] += 1
+        logger.info(f"Successfully triaged issue #{issue.get('number')}")
+        return {
+            'message': 'Issue triage initiated successfully',
+            'issue_number': issue.get('number'),
+            'repository': repo.get('full_name'),
+            'result': result.to_dict()
+        }, 200
+    
+    webhook_stats['errors'] += 1
+    logger.error(f"Failed to triage issue #{issue.get('number')}: {result.error or 'Unknown error'}")
+    return {
+        'message': 'Issue triage failed',
+        'issue_number': issue.get('number'),
+        'repository': repo.get('full_name'),
+        'error': result.error or 'Unknown error'
+    }, 500
+
+def _unexpected_error(e: Exception) -> TriageResult:
+    logger.error(f"💥 Unexpected error processing webhook: {e}")
+    import traceback
+    traceback.print_exc()
+    return TriageResult(success=False, error=str(e))
+
+@app.route('/')
+def health_check():
+    return jsonify(_health_body())
+
+@app.route('/stats')
+def get_stats():
+    return jsonify(_stats_body())
+
+async def _process_webhook_once(payload: Dict[str, Any]) -> TriageResult:
+    """Triage one webhook on a short-lived loop, closing its Discord session before the loop ends."""
+    try:
+        return await process_webhook(payload)
+    finally:
+        await discord_manager.close()
+
+@app.route('/webhook', methods=['POST'])
+def handle_webhook():
+    try:
+        payload, reply = _prepare_webhook(
+            request.get_data(),
+            request.headers.get('X-Hub-Signature-256', ''),
+            request.headers.get('X-GitHub-Event', '')
+        )
+        if reply:
+            return _json_response(*reply)
         
+        # Standalone Flask has no long-lived loop, so run the triage in a
+        # fresh one; start_triage_ninja serves webhooks on the bot's loop instead
         try:
-            payload = json.loads(payload_body)
-        except json.JSONDecodeError as e:
-            logger.error(f"Invalid JSON payload: {e}")
-            webhook_stats['errors'] += 1
-            return jsonify({'error': 'Invalid JSON payload'}), 400
-        
-        if event_type != 'issues':
-            logger.info(f"Ignoring non-issue event: {event_type}")
-            return jsonify({'message': f'Ignored event type: {event_type}'}), 200
-        
-        action = payload.get('action', 'unknown')
-        issue = payload.get('issue', {})
-        repo = payload.get('repository', {})
-        
-        logger.info(f"Received {event_type} webhook: {action} for issue #{issue.get('number')} in {repo.get('full_name')}")
+            result = asyncio.run(_process_webhook_once(payload))
+        except Exception as e:
+            result = _unexpected_error(e)
         
-        # Only process 'opened' issues
-        if action != 'opened':
-            logger.info(f"Ignoring issue action: {action}")
-            return jsonify({'message': f'Ignored action: {action}'}), 200
-        
-        # Process with triage agent synchronously 
-        # (Flask with async is complex - keeping simple for reliability)
-        def run_async_processing():
-            """Run the async processing in a proper event loop."""
-            try:
-                # Use asyncio.run for cleaner async handling
-                result = asyncio.run(process_webhook(payload))
-                if result.get('success'):
-                    webhook_stats['issues_triaged'] += 1
-                    logger.info(f"Successfully triaged issue #{issue.get('number')}")
-                else:
-                    webhook_stats['errors'] += 1
-                    logger.error(f"Failed to triage issue #{issue.get('number')}: {result.get('error', 'Unknown error')}")
-                return result
-            except Exception as e:
-                webhook_stats['errors'] += 1
-                logger.error(f"💥 Unexpected error processing webhook: {e}")
-                import traceback
-                traceback.print_exc()
-                return {'success': False, 'error': str(e)}
-        
-        result = run_async_processing()
-        
-        # Return response
-        if result.get('success'):
-            return jsonify({
-                'message': 'Issue triage initiated successfully',
-                'issue_number': issue.get('number'),
-                'repository': repo.get('full_name'),
-                'result': result
-            }), 200
-        else:
-            return jsonify({
-                'message': 'Issue triage failed',
-                'issue_number': issue.get('number'),
-                'repository': repo.get('full_name'),
-                'error': result.get('error', 'Unknown error')
-            }), 500
+        return _json_response(*_webhook_result(payload, result))
             
     except Exception as e:
         webhook_stats['errors'] += 1
         logger.error(f"💥 Webhook handler error: {e}")
-        return jsonify({'error': 'Internal server error'}), 500
+        return _json_response({'error': 'Internal server error'}, 500)
 
 @app.errorhandler(404)
 def not_found(error):
@@ -161,6 +218,54 @@ def create_app():
     
     return app
 
+def _aiohttp_json(data: Dict[str, Any], status: int = 200) -> web.Response:
+    return web.Response(body=_json_dumps(data), status=status, content_type='application/json')
+
+async def _aiohttp_health(request: web.Request) -> web.Response:
+    return _aiohttp_json(_health_body())
+
+async def _aiohttp_stats(request: web.Request) -> web.Response:
+    return _aiohttp_json(_stats_body())
+
+async def _aiohttp_webhook(request: web.Request) -> web.Response:
+    try:
+        payload, reply = _prepare_webhook(
+            await request.read(),
+            request.headers.get('X-Hub-Signature-256', ''),
+            request.headers.get('X-GitHub-Event', '')
+        )
+        if reply:
+            return _aiohttp_json(*reply)
+        
+        try:
+            result = await process_webhook(payload)
+        except Exception as e:
+            result = _unexpected_error(e)
+        
+        return _aiohttp_json(*_webhook_result(payload, result))
+    
+    except Exception as e:
+        webhook_stats['errors'] += 1
+        logger.error(f"💥 Webhook handler error: {e}")
+        return _aiohttp_json({'error': 'Internal server error'}, 500)
+
+async def _close_http_sessions(aio_app: web.Application):
+    await discord_manager.close()
+
+def create_aiohttp_app() -> web.Application:
+    """
+    Create the webhook routes as an aiohttp application.
+    
+    Served on the Discord bot's event loop, so triage awaits the human decision
+    directly instead of bouncing through run_coroutine_threadsafe.
+    """
+    aio_app = web.Application()
+    aio_app.router.add_get('/', _aiohttp_health)
+    aio_app.router.add_get('/stats', _aiohttp_stats)
+    aio_app.router.add_post('/webhook', _aiohttp_webhook)
+    aio_app.on_cleanup.append(_close_http_sessions)
+    return aio_app
+
 async def startup():
     """Initialize the agent before starting the server."""
     logger.info("Initializing Support-Triage Ninja webhook server...")
@@ -188,11 +293,7 @@ if __name__ == '__main__':
     finally:
         loop.close()
     
-    # Start Flask server
+    # Serve with aiohttp rather than the single-process Werkzeug dev server;
+    # the Flask app stays importable for WSGI servers
     logger.info(f"🌐 Starting webhook server on port {FLASK_PORT}")
-    app.run(
-        host='0.0.0.0',
-        port=FLASK_PORT,
-        debug=False,  # Set to True for development
-        threaded=True
-    )
+    web.run_app(create_aiohttp_app(), host=FLASK_HOST, port=FLASK_PORT, print=None)